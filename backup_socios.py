@@ -3,8 +3,19 @@
 """
 Script de Backup de Socios antes de Sincronización
 
-Este script crea una copia de seguridad de todos los socios en formato CSV
-antes de ejecutar la sincronización desde Excel.
+Este script crea una copia de seguridad de todos los socios antes de
+ejecutar la sincronización desde Excel.
+
+Las copias son incrementales y comprimidas (utils.backup_incremental):
+solo se guardan los socios dados de alta, modificados o eliminados desde
+la copia anterior, y cualquier copia se puede reconstruir completa.
+
+Uso:
+    python backup_socios.py                      Crear copia (incremental)
+    python backup_socios.py --completa           Forzar copia completa
+    python backup_socios.py --lista              Listar las copias
+    python backup_socios.py --reconstruir ID [fichero.csv]
+                                                 Reconstruir una copia en CSV
 
 Autor: Sistema de Gestión COJUB
 Fecha: 2024
@@ -12,71 +23,51 @@ Fecha: 2024
 
 import os
 import sys
-import csv
-from datetime import datetime
-from dotenv import load_dotenv
 import pyodbc
+from models.model import get_pool
+from utils.backup_incremental import crear_copia, leer_indice, exportar_csv
+
+BACKUP_DIR = "backups"
 
-def crear_backup():
-    """Crea un backup de todos los socios en formato CSV."""
+
+def crear_backup(completa=False):
+    """
+    Crea un backup de los socios.
+    
+    Args:
+        completa (bool): Forzar una copia completa en lugar de incremental
+    
+    Returns:
+        str: Ruta del fichero de la copia
+    """
     
     print("\n" + "="*70)
     print("💾 CREANDO BACKUP DE SOCIOS")
     print("="*70)
     
-    # Cargar variables de entorno
+    # Comprobar variables de entorno
     env_path = 'models/.env'
-    if os.path.exists(env_path):
-        load_dotenv(env_path)
-    else:
+    if not os.path.exists(env_path):
         print(f"❌ Error: No se encuentra el archivo {env_path}")
         sys.exit(1)
     
-    # Conectar a la base de datos
+    # Conectar a la base de datos (pool compartido de models.model)
     try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={os.getenv('SQL_SERVER')};"
-            f"DATABASE={os.getenv('SQL_DATABASE')};"
-            f"UID={os.getenv('SQL_USER')};"
-            f"PWD={os.getenv('SQL_PASSWORD')};"
-        )
-        conn = pyodbc.connect(conn_str)
+        pool = get_pool(env_path)
+        conn = pool.acquire()
         print("✅ Conexión a la base de datos establecida")
     except pyodbc.Error as ex:
         print(f"❌ Error al conectar a la base de datos: {ex}")
         sys.exit(1)
     
-    # Crear carpeta de backups si no existe
-    backup_dir = "backups"
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
-        print(f"📁 Carpeta '{backup_dir}' creada")
-    
-    # Nombre del archivo de backup con fecha y hora
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = os.path.join(backup_dir, f"backup_socios_{timestamp}.csv")
-    
-    # Obtener todos los socios
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM scazorla_sa.G_Socis")
-        
-        # Obtener nombres de columnas
-        columns = [column[0] for column in cursor.description]
+        copia = crear_copia(conn, BACKUP_DIR, completa=completa)
+        backup_file = os.path.join(BACKUP_DIR, copia['fichero'])
         
-        # Escribir al CSV
-        with open(backup_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(columns)  # Encabezados
-            
-            count = 0
-            for row in cursor.fetchall():
-                writer.writerow(row)
-                count += 1
-        
-        print(f"✅ Backup creado exitosamente: {backup_file}")
-        print(f"📊 Total de socios respaldados: {count}")
+        print(f"✅ Backup {copia['tipo']} creado: {backup_file}")
+        print(f"📊 Total de socios: {copia['filas']}")
+        print(f"   ➕ {copia['altas']}  🔄 {copia['cambios']}  ➖ {copia['bajas']}  "
+              f"({copia['bytes'] / 1024:.1f} KB)")
         print("="*70 + "\n")
         
         return backup_file
@@ -85,7 +76,42 @@ def crear_backup():
         print(f"❌ Error al crear backup: {e}")
         sys.exit(1)
     finally:
-        conn.close()
+        pool.release(conn)
+
+
+def listar_backups():
+    """Muestra las copias registradas en el índice."""
+    indice = leer_indice(BACKUP_DIR)
+    if not indice:
+        print("ℹ️ No hay copias registradas")
+        return
+    print(f"{'ID':<18} {'TIPO':<12} {'SOCIS':>6} {'ALTES':>6} {'CANVIS':>6} {'BAIXES':>6} {'KB':>8}")
+    for e in indice:
+        print(f"{e['id']:<18} {e['tipo']:<12} {e['filas']:>6} {e['altas']:>6} "
+              f"{e['cambios']:>6} {e['bajas']:>6} {e['bytes'] / 1024:>8.1f}")
+
+
+def reconstruir_backup(id_copia, destino=None):
+    """Reconstruye una copia completa en CSV."""
+    destino = destino or os.path.join(BACKUP_DIR, f"backup_socios_{id_copia}_completo.csv")
+    try:
+        total = exportar_csv(BACKUP_DIR, id_copia, destino)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        sys.exit(1)
+    print(f"✅ Copia {id_copia} reconstruida: {destino} ({total} socios)")
+    return destino
+
 
 if __name__ == "__main__":
-    crear_backup()
\ No newline at end of file
+    args = sys.argv[1:]
+    if '--lista' in args:
+        listar_backups()
+    elif '--reconstruir' in args:
+        i = args.index('--reconstruir')
+        if i + 1 >= len(args):
+            print("Uso: python backup_socios.py --reconstruir ID [fichero.csv]")
+            sys.exit(1)
+        reconstruir_backup(args[i + 1], args[i + 2] if i + 2 < len(args) else None)
+    else:
+        crear_backup(completa='--completa' in args)
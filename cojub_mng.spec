@@ -10,7 +10,16 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Paquetes que la aplicación no usa: menos que descomprimir en cada arranque.
+    # openpyxl solo lo usan los scripts de sincronización, que no van en el exe.
+    excludes=[
+        'tkinter', 'unittest', 'pydoc', 'doctest', 'pdb',
+        'numpy', 'pandas', 'matplotlib', 'IPython',
+        'openpyxl', 'et_xmlfile', 'fpdf',
+        'PyQt6.QtNetwork', 'PyQt6.QtQml', 'PyQt6.QtQuick', 'PyQt6.QtWebEngineCore',
+        'PyQt6.QtWebEngineWidgets', 'PyQt6.QtMultimedia', 'PyQt6.QtBluetooth',
+        'PyQt6.QtSql', 'PyQt6.QtTest', 'PyQt6.QtDesigner', 'PyQt6.Qt3DCore',
+    ],
     noarchive=False,
     optimize=0,
 )
@@ -26,7 +35,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # Sin UPX: el ejecutable ocupa más, pero no hay que descomprimir las DLL de Qt al arrancar
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de Diagnóstico: Tiempo de Importación al Arrancar
+
+Importa main.py en un intérprete nuevo (python -X importtime) y comprueba:
+1. Que el tiempo total de importación no supera el presupuesto
+2. Que los módulos pesados (ReportLab, SEPA, Excel, actividades) no se
+   cargan al arrancar, sino la primera vez que se usan
+3. Qué módulos son los más lentos de importar
+
+Devuelve código de salida 1 si alguna comprobación falla, para poder
+usarlo antes de generar el ejecutable.
+
+USO:
+    python diagnostico_arranque.py
+    ARRANQUE_MAX_MS=600 python diagnostico_arranque.py
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import sys
+import subprocess
+
+# Presupuesto de importación de main.py (milisegundos)
+PRESUPUESTO_MS = int(os.getenv('ARRANQUE_MAX_MS', 800))
+
+# Módulos que solo deben cargarse al usarlos
+MODULOS_DIFERIDOS = [
+    'reportlab',
+    'openpyxl',
+    'xml.dom.minidom',
+    'viewmodels.pdf_generator',
+    'viewmodels.etiquetas_generator',
+    'utils.pdf_styles',
+    'utils.sepa_lib',
+    'utils.sepa_planner',
+    'utils.excel_socios',
+    'views.activitats_view',
+    'reports.activitat_report',
+]
+
+# Módulos más lentos que se muestran
+TOP_MODULOS = 15
+
+
+def medir_importacion():
+    """
+    Importa main.py en un proceso nuevo con -X importtime.
+
+    Returns:
+        list: [(modulo, propio_us, acumulado_us, nivel)] en orden de importación
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=directorio,
+        env={**os.environ, 'QT_QPA_PLATFORM': os.getenv('QT_QPA_PLATFORM', 'offscreen')},
+        capture_output=True,
+        text=True,
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se ha podido importar main.py:\n{resultado.stderr[-2000:]}")
+
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        modulos.append((nombre.strip(), int(propio), int(acumulado), nivel))
+    return modulos
+
+
+def main():
+    print("\n" + "="*70)
+    print("⏱️  DIAGNÓSTICO DE ARRANQUE - Importación de main.py")
+    print("="*70 + "\n")
+
+    modulos = medir_importacion()
+    # Los módulos de primer nivel acumulan el tiempo de todo lo que importan
+    total_ms = sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000
+    cargados = {nombre for nombre, _, _, _ in modulos}
+
+    print(f"📊 Módulos importados: {len(modulos)}")
+    print(f"📊 Tiempo total: {total_ms:.0f} ms (presupuesto: {PRESUPUESTO_MS} ms)")
+
+    print(f"\n📋 {TOP_MODULOS} módulos más lentos (tiempo propio):")
+    for nombre, propio, acumulado, _ in sorted(modulos, key=lambda m: -m[1])[:TOP_MODULOS]:
+        print(f"   {propio / 1000:8.1f} ms  (acumulado {acumulado / 1000:8.1f} ms)  {nombre}")
+
+    errores = []
+    if total_ms > PRESUPUESTO_MS:
+        errores.append(f"La importación tarda {total_ms:.0f} ms (máximo {PRESUPUESTO_MS} ms)")
+    for modulo in MODULOS_DIFERIDOS:
+        if modulo in cargados:
+            errores.append(f"'{modulo}' se importa al arrancar (debería importarse al usarlo)")
+
+    print("\n" + "="*70)
+    if errores:
+        print("❌ COMPROBACIONES FALLIDAS:")
+        for error in errores:
+            print(f"   - {error}")
+    else:
+        print("✅ Arranque dentro del presupuesto y sin módulos pesados")
+    print("="*70 + "\n")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
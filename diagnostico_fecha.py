@@ -16,7 +16,7 @@ load_dotenv('models/.env')
 # Intentar importar el modelo
 try:
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    from models.model import DatabaseModel
+    from models.model import DatabaseModel, Socio
     print("✓ Módulo DatabaseModel importado correctamente\n")
 except Exception as e:
     print(f"✗ Error al importar DatabaseModel: {e}")
@@ -51,62 +51,17 @@ try:
     print(f"   Nombre del tipo: {primer_socio.__class__.__name__}\n")
     
     # Mostrar todos los campos
-    print("4. Campos disponibles en el objeto socio:")
+    print("4. Campos del socio (Socio._fields, ya convertidos a su tipo):")
     print("-"*80)
     
-    if hasattr(primer_socio, '_fields'):
-        # Es un namedtuple
-        print("   ✓ Es un namedtuple")
-        print(f"   Campos (_fields): {primer_socio._fields}\n")
-        
-        for field in primer_socio._fields:
-            valor = getattr(primer_socio, field, None)
-            tipo = type(valor).__name__
-            print(f"   • {field:25} = {valor!r:50} (tipo: {tipo})")
-    else:
-        # Es otro tipo de objeto
-        print("   ℹ No es un namedtuple, listando atributos...")
-        for attr in dir(primer_socio):
-            if not attr.startswith('_'):
-                valor = getattr(primer_socio, attr, None)
-                if not callable(valor):
-                    tipo = type(valor).__name__
-                    print(f"   • {attr:25} = {valor!r:50} (tipo: {tipo})")
-    
-    print("\n" + "="*80)
-    print("5. Análisis específico del campo de fecha:")
-    print("-"*80)
-    
-    # Buscar campos relacionados con fecha de alta
-    campos_fecha = []
-    posibles_nombres = ['FAMDataAlta', 'dDataAlta', 'DataAlta', 'FechaAlta', 
-                       'FAMFechaAlta', 'FAMDataAlta', 'fecha_alta']
-    
-    for nombre in posibles_nombres:
-        if hasattr(primer_socio, nombre):
-            valor = getattr(primer_socio, nombre)
-            campos_fecha.append((nombre, valor))
-            print(f"   ✓ ENCONTRADO: {nombre}")
-            print(f"     Valor: {valor}")
-            print(f"     Tipo: {type(valor)}")
-            print(f"     Es None: {valor is None}")
-            if valor is not None:
-                print(f"     Representación: {repr(valor)}")
-            print()
-    
-    if not campos_fecha:
-        print("   ⚠ NO se encontró ningún campo de fecha de alta con nombres comunes")
-        print("   Campos que contienen 'data' o 'fecha' en el nombre:")
-        for attr in dir(primer_socio):
-            if not attr.startswith('_'):
-                if 'data' in attr.lower() or 'fecha' in attr.lower() or 'alta' in attr.lower():
-                    valor = getattr(primer_socio, attr, None)
-                    if not callable(valor):
-                        print(f"     • {attr} = {valor!r}")
+    for field in Socio._fields:
+        valor = getattr(primer_socio, field)
+        tipo = type(valor).__name__
+        print(f"   • {field:25} = {valor!r:50} (tipo: {tipo})")
     
     # Analizar varios socios
     print("\n" + "="*80)
-    print("6. Revisando primeros 5 socios:")
+    print("5. Revisando primeros 5 socios:")
     print("-"*80)
     
     for i, socio in enumerate(all_socis[:5], 1):
@@ -114,25 +69,20 @@ try:
         print(f"   ID: {socio.FAMID}")
         print(f"   Nombre: {socio.FAMNom}")
         
-        # Intentar acceder a FAMDataAlta
-        if hasattr(socio, 'FAMDataAlta'):
-            valor = socio.FAMDataAlta
-            print(f"   FAMDataAlta: {valor} (tipo: {type(valor).__name__})")
-            if valor is not None and hasattr(valor, 'strftime'):
-                try:
-                    print(f"   Formateado: {valor.strftime('%d/%m/%Y')}")
-                except Exception as e:
-                    print(f"   Error al formatear: {e}")
-        else:
-            print(f"   FAMDataAlta: NO EXISTE ESTE CAMPO")
+        # FAMDataAlta es un datetime o None (Socio.from_row)
+        valor = socio.FAMDataAlta
+        print(f"   FAMDataAlta: {valor} (tipo: {type(valor).__name__})")
+        if valor is not None:
+            print(f"   Formateado: {valor.strftime('%d/%m/%Y')}")
     
     # Consulta SQL directa
     print("\n" + "="*80)
-    print("7. Consultando directamente la tabla G_Socis:")
+    print("6. Consultando directamente la tabla G_Socis:")
     print("-"*80)
     
     try:
-        cursor = model.conn.cursor()
+        conn = model.pool.acquire()
+        cursor = conn.cursor()
         
         # Ver estructura de la tabla
         cursor.execute("""
@@ -141,12 +91,12 @@ try:
         """)
         
         columns = [column[0] for column in cursor.description]
-        print(f"\n   Columnas en la tabla G_Socis:")
+        print("\n   Columnas en la tabla G_Socis:")
         for i, col in enumerate(columns, 1):
             print(f"   {i:2}. {col}")
         
         # Buscar columnas relacionadas con fecha
-        print(f"\n   Columnas que contienen 'Data', 'Fecha' o 'Alta':")
+        print("\n   Columnas que contienen 'Data', 'Fecha' o 'Alta':")
         campos_fecha_db = [col for col in columns if 
                           'data' in col.lower() or 
                           'fecha' in col.lower() or 
@@ -156,10 +106,10 @@ try:
             for col in campos_fecha_db:
                 print(f"   ✓ {col}")
         else:
-            print(f"   ⚠ No se encontraron columnas relacionadas")
+            print("   ⚠ No se encontraron columnas relacionadas")
         
         # Consultar valores reales
-        print(f"\n   Valores de los primeros 5 registros:")
+        print("\n   Valores de los primeros 5 registros:")
         cursor.execute("""
             SELECT TOP 5 FAMID, FAMNom, FAMDataAlta
             FROM scazorla_sa.G_Socis
@@ -169,6 +119,9 @@ try:
             famid, famnom, data_alta = row
             print(f"   • ID {famid}: {famnom[:30]:30} → DataAlta: {data_alta}")
         
+        cursor.close()
+        model.pool.release(conn)
+        
     except Exception as e:
         print(f"   ✗ Error en consulta SQL: {e}")
     
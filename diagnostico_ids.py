@@ -13,11 +13,10 @@ USO:
     python diagnostico_ids.py
 """
 
-import os
 import sys
-from dotenv import load_dotenv
-import pyodbc
-import openpyxl
+from models.model import get_pool
+from itertools import islice
+from utils.excel_socios import leer_socios_excel
 
 def main():
     print("\n" + "="*70)
@@ -27,15 +26,12 @@ def main():
     # 1. Leer IDs del Excel
     print("📂 Leyendo IDs del Excel...")
     try:
-        wb = openpyxl.load_workbook('Socis-2025.xlsx')
-        ws = wb['Hoja1']
-        
         ids_excel = []
-        for row in range(2, min(ws.max_row + 1, 20)):  # Primeros 20
-            codi = ws.cell(row, 1).value
-            if codi:
-                codi_str = str(codi).strip()
-                ids_excel.append(codi_str)
+        socios = leer_socios_excel('Socis-2025.xlsx', obligatorias=('FAMID',))
+        for socio in islice(socios, 18):  # Primeras 18 filas con datos
+            if socio['FAMID']:
+                ids_excel.append(socio['FAMID'])
+        socios.close()
         
         print(f"✅ Total de IDs en Excel (primeros 18): {len(ids_excel)}")
         print("\n📋 Primeros 10 IDs del Excel:")
@@ -49,17 +45,9 @@ def main():
     # 2. Leer IDs de la BD
     print("\n💾 Leyendo IDs de la Base de Datos...")
     try:
-        # Cargar .env
-        load_dotenv('models/.env')
-        
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={os.getenv('SQL_SERVER')};"
-            f"DATABASE={os.getenv('SQL_DATABASE')};"
-            f"UID={os.getenv('SQL_USER')};"
-            f"PWD={os.getenv('SQL_PASSWORD')};"
-        )
-        conn = pyodbc.connect(conn_str)
+        # Conexión del pool compartido (lee models/.env)
+        pool = get_pool('models/.env')
+        conn = pool.acquire()
         cursor = conn.cursor()
         
         # Obtener primeros 10 IDs de la BD
@@ -75,7 +63,8 @@ def main():
         cursor.execute("SELECT FAMID FROM scazorla_sa.G_Socis")
         todos_ids_bd = set(row[0].strip() if row[0] else "" for row in cursor.fetchall())
         
-        conn.close()
+        pool.release(conn)
+        pool.close_all()
         
     except Exception as e:
         print(f"❌ Error al leer BD: {e}")
@@ -1,26 +1,40 @@
 import sys
+import logging
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from views.view import MainWindow
 from viewmodels.viewmodel import ViewModel
 from models.model import DatabaseModel
+from models.cache_local import CacheLocal
 from viewmodels.activitat_viewmodel import ActivitatViewModel
-from views.activitats_view import ActivitatsView
+from utils.instrumentacion import configurar_log, span
 
 if __name__ == "__main__":
+    # Necesario para el pool de procesos de los informes en el ejecutable (PyInstaller)
+    multiprocessing.freeze_support()
+    # Log rotativo (JSON) con los tiempos de cada operación
+    configurar_log()
     app = QApplication(sys.argv)
     
     # Crear instancia del modelo de base de datos (compartida)
     db_model = DatabaseModel()
     
+    # Copia local de los datos: arranque inmediato y consulta sin conexión
+    cache = CacheLocal()
+    
     # Crear ViewModel principal para socios
-    view_model = ViewModel(db_model)
+    view_model = ViewModel(db_model, cache)
     
     # Crear ViewModel para actividades (usa el mismo db_model)
-    activitat_viewmodel = ActivitatViewModel(db_model)
+    activitat_viewmodel = ActivitatViewModel(db_model, cache)
     
-    # Crear vista principal y pasarle ambos viewmodels
-    view = MainWindow(view_model, activitat_viewmodel)
+    # Cambios de otros usuarios: socios e inscripciones se refrescan solos
+    view_model.inscripcions_changed.connect(activitat_viewmodel.refresh_inscripcions)
+    view_model.start_auto_refresh()
     
-    view.showMaximized()
+    # Crear vista principal y pasarle ambos viewmodels
+    with span('app.finestra', nivel=logging.INFO):
+        view = MainWindow(view_model, activitat_viewmodel)
+        view.showMaximized()
     
     sys.exit(app.exec())
\ No newline at end of file
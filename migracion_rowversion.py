@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de Migración: Columna ROWVERSION para el Refresco Automático
+===================================================================
+Añade la columna RowVer (ROWVERSION) a las tablas que comparten los
+usuarios de la aplicación (G_Socis y G_Activitats_Socis).
+
+Con ella la aplicación solo lee lo que otros usuarios han cambiado desde
+el último refresco; sin ella, cada refresco vuelve a leer todos los socios.
+La aplicación nunca modifica el esquema: esta migración la ejecuta una vez
+un usuario con permiso ALTER sobre las tablas.
+
+Este script:
+1. Muestra qué tablas tienen ya la columna
+2. Con --aplicar: añade la columna a las que no la tienen (idempotente)
+
+Las copias de seguridad no incluyen esta columna (la genera el servidor),
+así que la migración no fuerza una copia completa.
+
+USO:
+    python migracion_rowversion.py              Comprobar
+    python migracion_rowversion.py --aplicar    Añadir la columna
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import sys
+import pyodbc
+from models.model import get_pool, CHANGE_TRACKED_TABLES, ROWVERSION_COLUMN
+
+
+def tablas_sin_columna(cursor):
+    """Tablas sincronizadas que todavía no tienen la columna ROWVERSION."""
+    pendientes = []
+    for tabla in CHANGE_TRACKED_TABLES:
+        cursor.execute("SELECT COL_LENGTH(?, ?)", tabla, ROWVERSION_COLUMN)
+        if cursor.fetchone()[0] is None:
+            pendientes.append(tabla)
+    return pendientes
+
+
+def main():
+    aplicar = '--aplicar' in sys.argv[1:]
+
+    print("\n" + "="*70)
+    print("🗄️  MIGRACIÓN - Columna ROWVERSION para el refresco automático")
+    print("="*70 + "\n")
+
+    pool = get_pool('models/.env')
+    with pool.connection() as conn, conn.cursor() as cursor:
+        pendientes = tablas_sin_columna(cursor)
+        for tabla in CHANGE_TRACKED_TABLES:
+            estado = "❌ sin columna" if tabla in pendientes else "✅ con columna"
+            print(f"   {tabla:<40} {estado} {ROWVERSION_COLUMN}")
+
+        if not pendientes:
+            print("\n✅ No hay nada que migrar")
+            return 0
+        if not aplicar:
+            print("\nℹ️ Comprobación: no se ha modificado nada. Usa --aplicar para migrar.")
+            return 0
+
+        for tabla in pendientes:
+            print(f"\n🔧 ALTER TABLE {tabla} ADD {ROWVERSION_COLUMN} ROWVERSION")
+            cursor.execute(f"ALTER TABLE {tabla} ADD {ROWVERSION_COLUMN} ROWVERSION")
+        conn.commit()
+
+        if tablas_sin_columna(cursor):
+            print("\n❌ La columna no se ha añadido a todas las tablas")
+            return 1
+    print("\n✅ Migración completada: el refresco automático ya solo lee los cambios")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except pyodbc.Error as e:
+        print(f"\n❌ Error de base de datos: {e}")
+        sys.exit(1)
@@ -0,0 +1,161 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.socio import Socio
+
+
+def default_cache_path():
+    """Ruta del fichero de caché (COJUB_CACHE_LOCAL o la carpeta de datos del usuario)."""
+    path = os.getenv('COJUB_CACHE_LOCAL')
+    if path:
+        return path
+    base = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'COJUB', 'cache_local.sqlite3')
+
+
+def _encode(value):
+    """Valor de la BD -> valor JSON (fechas e importes marcados con su tipo)."""
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'decimal': str(value)}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return datetime.fromisoformat(value['datetime'])
+        if 'date' in value:
+            return date.fromisoformat(value['date'])
+        if 'decimal' in value:
+            return Decimal(value['decimal'])
+    return value
+
+
+def _dumps(values):
+    return json.dumps([_encode(v) for v in values], ensure_ascii=False, separators=(',', ':'))
+
+
+def _loads(text):
+    return [_decode(v) for v in json.loads(text)]
+
+
+class CacheLocal:
+    """
+    Copia local (SQLite) de G_Socis, G_Dades y las actividades.
+
+    Permite abrir la aplicación al instante con los datos de la última
+    sesión y consultarlos en modo solo lectura si el servidor no responde.
+    Guarda también la marca de sincronización (ROWVERSION) con la que se
+    leyeron, para completarlos luego solo con los cambios.
+
+    Cada operación abre su propia conexión (nunca se comparte una conexión
+    entre hilos) y las escrituras de este proceso se hacen de una en una,
+    así que puede usarse desde los hilos de trabajo y desde la interfaz.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS socis (famid TEXT PRIMARY KEY, fila TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS activitats (id INTEGER PRIMARY KEY, fila TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS meta (clau TEXT PRIMARY KEY, valor TEXT);
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (clau, valor) VALUES (?, ?)", (key, value))
+
+    def _upsert_socis(self, conn, socis):
+        conn.executemany(
+            "INSERT OR REPLACE INTO socis (famid, fila) VALUES (?, ?)",
+            ((s.FAMID, _dumps(s)) for s in socis)
+        )
+
+    def save(self, socis, dades, token):
+        """
+        Sustituye la copia por una carga completa.
+
+        Args:
+            socis: Todos los socios
+            dades: Configuración (Dades) o None
+            token (bytes): Marca de sincronización leída antes que los socios
+        """
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM socis")
+            self._upsert_socis(conn, socis)
+            self._set_meta(conn, 'dades', _dumps(dades) if dades else None)
+            self._set_meta(conn, 'token', token.hex() if token else None)
+            self._set_meta(conn, 'desat', datetime.now().isoformat(timespec='seconds'))
+
+    def apply(self, removed, socis, token=None, dades=None):
+        """
+        Aplica un refresco incremental (socios cambiados y eliminados).
+
+        Sin token (escrituras hechas desde este equipo) se conserva la marca
+        guardada: el siguiente refresco volverá a traer esas filas.
+        """
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM socis WHERE famid = ?", ((f,) for f in removed))
+            self._upsert_socis(conn, socis)
+            if dades is not None:
+                self._set_meta(conn, 'dades', _dumps(dades))
+            if token is not None:
+                self._set_meta(conn, 'token', token.hex())
+            self._set_meta(conn, 'desat', datetime.now().isoformat(timespec='seconds'))
+
+    def load(self, dades_type):
+        """
+        Lee la copia local.
+
+        Args:
+            dades_type: Clase de la configuración (Dades)
+
+        Returns:
+            tuple: (socios, dades, token, fecha de guardado) o None si está vacía
+        """
+        with closing(self._connect()) as conn:
+            meta = dict(conn.execute("SELECT clau, valor FROM meta"))
+            if 'desat' not in meta:
+                return None
+            # Los tipos (fechas, importes, bits) se recuperan como al leer de la BD
+            socis = [
+                Socio.from_row(_loads(fila))
+                for (fila,) in conn.execute("SELECT fila FROM socis ORDER BY famid")
+            ]
+        dades = dades_type(*_loads(meta['dades'])) if meta.get('dades') else None
+        token = bytes.fromhex(meta['token']) if meta.get('token') else None
+        return socis, dades, token, meta['desat']
+
+    def save_activitats(self, rows):
+        """Guarda las filas de actividades activas tal como se leyeron de la BD."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM activitats")
+            conn.executemany(
+                "INSERT INTO activitats (id, fila) VALUES (?, ?)",
+                ((row[0], _dumps(row)) for row in rows)
+            )
+
+    def load_activitats(self):
+        """Filas de actividades guardadas, con los mismos tipos que las de la BD."""
+        with closing(self._connect()) as conn:
+            return [_loads(fila) for (fila,) in conn.execute("SELECT fila FROM activitats")]
+
@@ -1,46 +1,21 @@
 import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import pyodbc
 from collections import namedtuple
 from datetime import datetime
 from pathlib import Path
+from models.socio import Socio, coerce_value
+from utils.instrumentacion import span, contar
 
+log = logging.getLogger(__name__)
 
-# Definir la estructura de los datos del socio y de configuración
-#Socio = namedtuple('Socio', [
-#    'FAMID', 'FAMNom', 'FAMAdressa', 'FAMPoblacio', 'FAMCodPos', 'FAMTelefon',
-#    'FAMMobil', 'FAMEmail', 'FAMDataAlta', 'FAMCCC', 'FAMIBAN', 'FAMBIC',
-#    'FAMNSocis', 'bBaixa', 'FAMObservacions', 'FAMbSeccio', 'FAMNIF',
-#    'FAMDataNaixement', 'FAMQuota', 'FAMIDSec', 'FAMDataBaixa', 'FAMTipus',
-#    'FAMSexe', 'FAMSociReferencia', 'FAMNewId', 'FAMNewIdRef',
-#    'FAMbPagamentDomiciliat', 'FAMbRebutCobrat', 'FAMPagamentFinestreta'
-#])
-
-Socio = namedtuple('Socio', [
-    'FAMID',                    # 1
-    'FAMNom',                   # 2
-    'FAMAdressa',               # 3
-    'FAMPoblacio',              # 4
-    'FAMCodPos',                # 5
-    'FAMTelefon',               # 6
-    'FAMMobil',                 # 7
-    'FAMEmail',                 # 8
-    'FAMDataAlta',              # 9
-    'FAMIBAN',                  # 11 (saltamos FAMCCC que está en pos 10)
-    'FAMBIC',                   # 12
-    'bBaixa',                   # 14 (saltamos FAMNSocis en pos 13)
-    'FAMObservacions',          # 15
-    'FAMNIF',                   # 17 (saltamos FAMbSeccio en pos 16)
-    'FAMDataNaixement',         # 18
-    'FAMQuota',                 # 19
-    'FAMDataBaixa',             # 21 (saltamos FAMIDSec en pos 20)
-    'FAMSexe',                  # 23 (saltamos FAMTipus en pos 22)
-    'FAMSociReferencia',        # 24
-    'FAMbPagamentDomiciliat',   # 27 (saltamos FAMNewId y FAMNewIdRef)
-    'FAMbRebutCobrat',          # 28
-    'FAMPagamentFinestreta',    # 29
-    'FAMTelefonEmergencia'      # 30
-])
+
+# Definir la estructura de los datos de configuración
+# (el socio se define una sola vez en models/socio.py, compartido con el ViewModel)
 
 Dades = namedtuple('Dades', [
     'Presentador', 'CIFPresentador', 'Ordenant', 'CIFOrdenant',
@@ -48,84 +23,542 @@ Dades = namedtuple('Dades', [
     'SufixeRebuts', 'TexteRebutFinestreta'
 ])
 
+# Columnas de G_Socis en el mismo orden que Socio._fields
+SOCIS_SELECT = f"SELECT {', '.join(Socio._fields)} FROM scazorla_sa.G_Socis"
 
-class DatabaseModel:
+# Refresco incremental: columna ROWVERSION que el servidor actualiza en cada
+# INSERT/UPDATE de las tablas que comparten los usuarios de la aplicación
+ROWVERSION_COLUMN = "RowVer"
+CHANGE_TRACKED_TABLES = ("scazorla_sa.G_Socis", "scazorla_sa.G_Activitats_Socis")
+
+# Resultado de get_changes()
+Cambios = namedtuple('Cambios', ['token', 'socis', 'total_socis', 'activitats', 'inscripcions'])
+
+# Columnas en las que busca query_socis(search=...)
+SOCIS_SEARCH_COLUMNS = (
+    'FAMID', 'FAMNom', 'FAMNIF', 'FAMAdressa', 'FAMPoblacio', 'FAMCodPos',
+    'FAMTelefon', 'FAMMobil', 'FAMTelefonEmergencia', 'FAMEmail',
+)
+# Comparación sin distinguir mayúsculas ni acentos
+SEARCH_COLLATION = "Latin1_General_CI_AI"
+
+
+# ============================================================================
+# POOL DE CONEXIONES
+# ============================================================================
+
+# SQLSTATE que indican que la conexión se ha perdido (no un error de la consulta)
+CONNECTION_ERROR_STATES = {'08S01', '08S02', '08001', '08003', '08004', '08007', 'HYT00', 'HYT01'}
+
+
+def build_connection_string(env_path=None):
     """
-    Clase que gestiona la conexión a la base de datos y las operaciones CRUD.
+    Construye la cadena de conexión a SQL Server a partir del .env.
+
+    Args:
+        env_path: Ruta al .env (por defecto models/.env)
     """
-    def __init__(self):
+    if env_path is None:
         env_path = Path(__file__).resolve().parent / ".env"
+    if os.path.exists(env_path):
         load_dotenv(dotenv_path=env_path)
 
-        self.conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={os.getenv('SQL_SERVER')};"
-            f"DATABASE={os.getenv('SQL_DATABASE')};"
-            f"UID={os.getenv('SQL_USER')};"
-            f"PWD={os.getenv('SQL_PASSWORD')};"
-        )
-        self.conn = pyodbc.connect(self.conn_str)
+    return (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={os.getenv('SQL_SERVER')};"
+        f"DATABASE={os.getenv('SQL_DATABASE')};"
+        f"UID={os.getenv('SQL_USER')};"
+        f"PWD={os.getenv('SQL_PASSWORD')};"
+    )
+
+
+def is_connection_error(ex):
+    """Indica si una excepción de pyodbc se debe a una conexión caída."""
+    sqlstate = ex.args[0] if ex.args else None
+    return isinstance(ex, pyodbc.OperationalError) or sqlstate in CONNECTION_ERROR_STATES
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones pyodbc con afinidad por hilo y reconexión automática.
+
+    - Cada hilo usa su propia conexión; las llamadas anidadas dentro del
+      mismo hilo reutilizan la misma (y por tanto la misma transacción).
+    - Como máximo hay `size` conexiones en uso; el resto de hilos esperan.
+    - Las conexiones ociosas más de `health_check_interval` segundos se
+      comprueban con SELECT 1 antes de entregarlas.
+    - Una conexión que falla con un error de comunicación se descarta y la
+      siguiente petición abre otra, reintentando con espera creciente.
+
+    Configurable por .env: SQL_POOL_SIZE, SQL_POOL_TIMEOUT, SQL_POOL_RETRIES,
+    SQL_LOGIN_TIMEOUT.
+    """
+
+    def __init__(self, conn_str, size=None, timeout=None, max_retries=None,
+                 retry_delay=1.0, health_check_interval=30.0, login_timeout=None):
+        self.conn_str = conn_str
+        self.size = size or int(os.getenv('SQL_POOL_SIZE', 4))
+        self.timeout = timeout if timeout is not None else float(os.getenv('SQL_POOL_TIMEOUT', 30))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('SQL_POOL_RETRIES', 3))
+        self.retry_delay = retry_delay
+        self.health_check_interval = health_check_interval
+        self.login_timeout = login_timeout if login_timeout is not None else int(os.getenv('SQL_LOGIN_TIMEOUT', 10))
+
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []  # [(conexión, instante de devolución)]
+        self._local = threading.local()
+        self._open = 0
+        self._pending_reconnects = 0
+        self._metrics = {
+            'acquisitions': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'connects': 0,
+            'reconnects': 0,
+            'connect_failures': 0,
+            'health_check_failures': 0,
+            'discarded': 0,
+        }
+
+    # --- Conexiones físicas ---
+
+    def _connect(self):
+        """Abre una conexión nueva reintentando con espera creciente."""
+        delay = self.retry_delay
+        for intento in range(1, self.max_retries + 1):
+            try:
+                with span('bd.connexio', intento=intento):
+                    conn = pyodbc.connect(self.conn_str, timeout=self.login_timeout)
+                with self._lock:
+                    self._open += 1
+                    self._metrics['connects'] += 1
+                    if self._pending_reconnects:
+                        self._pending_reconnects -= 1
+                        self._metrics['reconnects'] += 1
+                return conn
+            except pyodbc.Error as ex:
+                with self._lock:
+                    self._metrics['connect_failures'] += 1
+                if intento == self.max_retries:
+                    raise
+                log.warning("Error de conexión (intento %d/%d): %s", intento, self.max_retries, ex.args[0] if ex.args else ex)
+                time.sleep(delay)
+                delay *= 2
+
+    def _discard(self, conn):
+        """Cierra una conexión que ya no es utilizable."""
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+            self._pending_reconnects += 1
+            self._metrics['discarded'] += 1
+
+    def _is_healthy(self, conn):
+        """Comprueba que la conexión sigue viva."""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            with self._lock:
+                self._metrics['health_check_failures'] += 1
+            return False
+
+    def _take(self):
+        """Obtiene una conexión sana del pool (o abre una nueva)."""
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return self._connect()
+
+            conn, returned_at = entry
+            if time.monotonic() - returned_at < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    # --- API pública ---
+
+    def acquire(self):
+        """
+        Devuelve la conexión del hilo actual.
+
+        Si el hilo ya tiene una, se reutiliza (hay que llamar a release()
+        tantas veces como a acquire()).
+
+        Raises:
+            pyodbc.OperationalError: Si no queda ninguna conexión libre a tiempo
+        """
+        local = self._local
+        if getattr(local, 'conn', None) is not None:
+            local.depth += 1
+            return local.conn
+
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pyodbc.OperationalError('HYT00', f"No hay conexiones libres en el pool tras {self.timeout:.0f}s")
+        waited = time.monotonic() - start
+
+        try:
+            conn = self._take()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            m = self._metrics
+            m['acquisitions'] += 1
+            m['wait_time_total'] += waited
+            m['wait_time_max'] = max(m['wait_time_max'], waited)
+            if waited > 0.001:
+                m['waits'] += 1
+
+        local.conn = conn
+        local.depth = 1
+        local.broken = False
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Devuelve la conexión del hilo al pool.
+
+        Args:
+            conn: Conexión obtenida con acquire()
+            discard: True si la conexión ha fallado y no debe reutilizarse
+        """
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            return
+
+        local.broken = local.broken or discard
+        local.depth -= 1
+        if local.depth > 0:
+            return
+
+        local.conn = None
+        if not local.broken:
+            # Sin autocommit, hasta una lectura deja una transacción abierta
+            # (y sus bloqueos): no se devuelve al pool sin cerrarla
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                local.broken = True
+        if local.broken:
+            self._discard(conn)
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que presta una conexión al bloque.
+
+        Si el bloque falla por una conexión caída, la conexión se descarta.
+        """
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pyodbc.Error as ex:
+            broken = is_connection_error(ex)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def run(self, work, retries=1):
+        """
+        Ejecuta work(conn) reconectando si la conexión se había caído.
+
+        Solo debe usarse con operaciones idempotentes (lecturas): si la
+        conexión se pierde a mitad, la operación se repite entera.
+        """
+        for intento in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    return work(conn)
+            except pyodbc.Error as ex:
+                if intento == retries or not is_connection_error(ex) or getattr(self._local, 'conn', None):
+                    raise
+                log.warning("Conexión perdida, reintentando: %s", ex.args[0] if ex.args else ex)
+
+    def metrics(self):
+        """Devuelve una copia de las métricas del pool."""
+        with self._lock:
+            m = dict(self._metrics)
+            m['size'] = self.size
+            m['open'] = self._open
+            m['idle'] = len(self._idle)
+        m['in_use'] = m['open'] - m['idle']
+        m['wait_time_avg'] = m['wait_time_total'] / m['acquisitions'] if m['acquisitions'] else 0.0
+        return m
+
+    def close_all(self):
+        """Cierra las conexiones ociosas del pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(env_path=None, **kwargs):
+    """
+    Devuelve el pool compartido para la base de datos configurada en el .env.
+
+    Todas las entradas de la aplicación (app Qt, scripts de sincronización
+    y backups) obtienen aquí sus conexiones.
+    """
+    conn_str = build_connection_string(env_path)
+    with _pools_lock:
+        pool = _pools.get(conn_str)
+        if pool is None:
+            pool = ConnectionPool(conn_str, **kwargs)
+            _pools[conn_str] = pool
+        return pool
+
+
+class DatabaseModel:
+    """
+    Clase que gestiona la conexión a la base de datos y las operaciones CRUD.
+    """
+    def __init__(self, pool=None):
+        # Las conexiones se piden al pool compartido en cada operación,
+        # así cada hilo usa la suya y una conexión caída se reabre sola.
+        self.pool = pool or get_pool()
+        self.conn_str = self.pool.conn_str
 
     def connect(self):
-        """Establece la conexión a la base de datos."""
+        """Comprueba que se puede establecer la conexión a la base de datos."""
         try:
-            self.conn = pyodbc.connect(self.conn_str)
-            print("Conexión a la base de datos establecida.")
+            with self.pool.connection():
+                pass
+            log.info("Conexión a la base de datos establecida.")
         except pyodbc.Error as ex:
             sqlstate = ex.args[0]
-            print(f"Error de conexión: {sqlstate}")
+            log.error("Error de conexión: %s", sqlstate)
             raise
 
     def close(self):
-        """Cierra la conexión a la base de datos."""
-        if self.conn:
-            self.conn.close()
-            print("Conexión a la base de datos cerrada.")
+        """Cierra las conexiones del pool."""
+        self.pool.close_all()
+        log.info("Conexión a la base de datos cerrada.")
+
+    def execute_query(self, query, params=()):
+        """
+        Ejecuta una consulta de lectura y devuelve todas las filas.
+
+        Si la conexión se había caído, se reconecta y se repite la consulta.
+        """
+        def work(conn):
+            with span('bd.consulta', sql=query[:120]) as datos, conn.cursor() as cursor:
+                cursor.execute(query, *params)
+                rows = cursor.fetchall()
+                datos['filas'] = len(rows)
+            contar('bd.consultes')
+            contar('bd.files', len(rows))
+            return rows
+        return self.pool.run(work)
+
+    def _fetchone(self, query, *params):
+        """Ejecuta una consulta de lectura de una fila, reconectando si hace falta."""
+        def work(conn):
+            with span('bd.consulta', sql=query[:120]), conn.cursor() as cursor:
+                cursor.execute(query, *params)
+                row = cursor.fetchone()
+            contar('bd.consultes')
+            contar('bd.files', row is not None)
+            return row
+        return self.pool.run(work)
+
+    def _execute_write(self, query, params):
+        """
+        Ejecuta una escritura y la confirma; si falla, deshace la transacción
+        antes de devolver la conexión al pool y relanza el error.
+        """
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            try:
+                cursor.execute(query, params)
+                conn.commit()
+            except pyodbc.Error:
+                try:
+                    conn.rollback()
+                except pyodbc.Error:
+                    pass
+                raise
 
     def get_all_socis(self):
         """Recupera todos los socios de la base de datos."""
-        query = """
-            SELECT 
-                FAMID,
-                FAMNom,
-                FAMAdressa,
-                FAMPoblacio,
-                FAMCodPos,
-                FAMTelefon,
-                FAMMobil,
-                FAMEmail,
-                FAMDataAlta,
-                FAMIBAN,
-                FAMBIC,
-                bBaixa,
-                FAMObservacions,
-                FAMNIF,
-                FAMDataNaixement,
-                FAMQuota,
-                FAMDataBaixa,
-                FAMSexe,
-                FAMSociReferencia,
-                FAMbPagamentDomiciliat,
-                FAMbRebutCobrat,
-                FAMPagamentFinestreta,
-                FAMTelefonEmergencia
-            FROM scazorla_sa.G_Socis
+        return self.query_socis(include_baixa=True)
+
+    def query_socis(self, include_baixa=False, only_finestreta=False, search=None,
+                    columns=None, after_famid=None, limit=None):
+        """
+        Consulta socios filtrando en el servidor.
+
+        Args:
+            include_baixa (bool): Incluir los socios dados de baja
+            only_finestreta (bool): Solo socios que pagan por ventanilla
+            search (str): Texto a buscar; cada palabra debe aparecer en alguna
+                de SOCIS_SEARCH_COLUMNS (sin distinguir mayúsculas ni acentos)
+            columns: Columnas a leer (por defecto todas); FAMID se lee siempre
+                y las no leídas quedan a None en el Socio
+            after_famid (str): Paginación por clave: solo FAMID posteriores
+            limit (int): Número máximo de socios
+
+        Returns:
+            list: Socios ordenados por FAMID
+        """
+        if columns is None:
+            columns = Socio._fields
+        else:
+            unknown = set(columns) - set(Socio._fields)
+            if unknown:
+                raise ValueError(f"Columnas desconocidas en G_Socis: {', '.join(sorted(unknown))}")
+            columns = ('FAMID',) + tuple(c for c in Socio._fields if c in columns and c != 'FAMID')
+
+        where, params = [], []
+        if not include_baixa:
+            where.append("ISNULL(bBaixa, 0) = 0")
+        if only_finestreta:
+            where.append("ISNULL(FAMPagamentFinestreta, 0) = 1")
+        for word in (search or "").split():
+            # Escapar los comodines de LIKE
+            pattern = "%" + word.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]") + "%"
+            where.append("(" + " OR ".join(
+                f"{c} COLLATE {SEARCH_COLLATION} LIKE ?" for c in SOCIS_SEARCH_COLUMNS
+            ) + ")")
+            params.extend([pattern] * len(SOCIS_SEARCH_COLUMNS))
+        if after_famid is not None:
+            where.append("FAMID > ?")
+            # CHAR(5): SQL Server ignora los espacios de relleno al comparar
+            params.append(str(after_famid).strip())
+
+        top = f"TOP ({int(limit)}) " if limit is not None else ""
+        query = f"SELECT {top}{', '.join(columns)} FROM scazorla_sa.G_Socis"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY FAMID"
+
+        with span('bd.query_socis', nivel=logging.INFO, columnes=len(columns)) as datos:
+            rows = self.execute_query(query, params)
+            datos['filas'] = len(rows)
+            if columns == Socio._fields:
+                return [Socio.from_row(row) for row in rows]
+            return [
+                Socio(**{c: coerce_value(c, v) for c, v in zip(columns, row)})
+                for row in rows
+            ]
+
+    def iter_socis(self, page_size=500, **filters):
+        """
+        Recorre los socios por páginas (paginación por FAMID).
+
+        Acepta los mismos filtros que query_socis; cada página es una consulta
+        corta, así no se mantiene abierto un cursor durante todo el recorrido.
+        """
+        after = None
+        while True:
+            page = self.query_socis(after_famid=after, limit=page_size, **filters)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1].FAMID
+
+    def has_change_tracking(self):
         """
-        with self.conn.cursor() as cursor:
-            cursor.execute(query)
-            return [Socio(*row) for row in cursor.fetchall()]
+        True si todas las tablas sincronizadas tienen la columna ROWVERSION.
+
+        La columna la añade el script migracion_rowversion.py; la aplicación
+        solo lo comprueba y, sin ella, recarga todo en cada refresco.
+        """
+        return all(
+            self._fetchone("SELECT COL_LENGTH(?, ?)", table, ROWVERSION_COLUMN)[0] is not None
+            for table in CHANGE_TRACKED_TABLES
+        )
+
+    def get_sync_token(self):
+        """
+        Marca de sincronización actual (MIN_ACTIVE_ROWVERSION).
+
+        Debe leerse antes que los datos: las filas de transacciones aún
+        abiertas tendrán una versión igual o mayor y se verán en el siguiente
+        get_changes().
+        """
+        return bytes(self._fetchone("SELECT MIN_ACTIVE_ROWVERSION()")[0])
+
+    def get_changes(self, token):
+        """
+        Lee lo que ha cambiado desde una marca de sincronización.
+
+        Solo viajan las filas de G_Socis modificadas, el número total de socios
+        (para detectar eliminaciones), los ids de las actividades con
+        inscripciones modificadas y una firma de las inscripciones de cada
+        actividad (número de filas y ROWVERSION máxima): las filas borradas no
+        dejan ROWVERSION, pero cambian la firma.
+
+        Returns:
+            Cambios: (nueva marca, socios cambiados, total de socios,
+                {activitat_id}, {activitat_id: (filas, ROWVERSION máxima)})
+        """
+        def work(conn):
+            with span('bd.canvis') as datos, conn.cursor() as cursor:
+                cursor.execute("SELECT MIN_ACTIVE_ROWVERSION()")
+                new_token = bytes(cursor.fetchone()[0])
+                cursor.execute(f"{SOCIS_SELECT} WHERE {ROWVERSION_COLUMN} >= ?", token)
+                socis = [Socio.from_row(row) for row in cursor.fetchall()]
+                cursor.execute("SELECT COUNT(*) FROM scazorla_sa.G_Socis")
+                total = cursor.fetchone()[0]
+                cursor.execute(
+                    "SELECT DISTINCT activitat_id FROM scazorla_sa.G_Activitats_Socis "
+                    f"WHERE {ROWVERSION_COLUMN} >= ?",
+                    token
+                )
+                activitats = {row[0] for row in cursor.fetchall()}
+                cursor.execute(
+                    f"SELECT activitat_id, COUNT(*), MAX({ROWVERSION_COLUMN}) "
+                    "FROM scazorla_sa.G_Activitats_Socis GROUP BY activitat_id"
+                )
+                inscripcions = {row[0]: (row[1], bytes(row[2])) for row in cursor.fetchall()}
+                datos['filas'] = len(socis)
+            contar('bd.consultes', 5)
+            contar('bd.files', len(socis) + len(activitats) + len(inscripcions) + 2)
+            return Cambios(new_token, socis, total, activitats, inscripcions)
+        return self.pool.run(work)
+
+    def get_socio(self, famid):
+        """Recupera un único socio por FAMID (None si no existe)."""
+        famid = (famid or "").strip()
+        if not famid:
+            return None
+        row = self._fetchone(f"{SOCIS_SELECT} WHERE FAMID = ?", famid)
+        return Socio.from_row(row) if row else None
 
     def famid_exists(self, famid: str) -> bool:
         famid = (famid or "").strip()
         if not famid:
             return False
 
-        cursor = self.conn.cursor()
-        cursor.execute(
+        row = self._fetchone(
             "SELECT 1 FROM scazorla_sa.G_Socis WHERE FAMID = ?",
             famid
         )
-        return cursor.fetchone() is not None
+        return row is not None
 
     def get_dades(self):
         """Recupera los datos de configuración de la tabla G_Dades."""
@@ -133,19 +566,15 @@ class DatabaseModel:
         columns = ", ".join(Dades._fields)
         query = f"SELECT {columns} FROM scazorla_sa.G_Dades WHERE RegID = 1"
 
-        with self.conn.cursor() as cursor:
-            cursor.execute(query)
-            row = cursor.fetchone()
-            if row:
-                return Dades(*row)
-            return None
+        row = self._fetchone(query)
+        if row:
+            return Dades(*row)
+        return None
 
     def socio_exists(self, fam_id):
         """Verifica si un socio con un FAMID específico ya existe."""
         query = "SELECT FAMID FROM scazorla_sa.G_Socis WHERE FAMID = ?"
-        with self.conn.cursor() as cursor:
-            cursor.execute(query, fam_id)
-            return cursor.fetchone() is not None
+        return self._fetchone(query, fam_id) is not None
 
     def add_socio(self, data):
         """Añade un nuevo socio a la base de datos."""
@@ -154,14 +583,13 @@ class DatabaseModel:
         placeholders = ', '.join(['?'] * n_placeholders)
         columns = ', '.join(Socio._fields)
         query = f"INSERT INTO scazorla_sa.G_Socis ({columns}) VALUES ({placeholders})"
+        data = Socio.clean(data)
     
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(query, data)  # ✅ Pasar data directamente
-                self.conn.commit()
+            self._execute_write(query, data)  # ✅ Pasar data directamente
             return True
         except pyodbc.Error as ex:
-            print(f"Error al añadir socio: {ex}")
+            log.error("Error al añadir socio: %s", ex)
             return False
 
     def update_socio(self, data):
@@ -171,80 +599,23 @@ class DatabaseModel:
         # ============================================================================
         # LIMPIEZA Y VALIDACIÓN DE DATOS
         # ============================================================================
-        data_clean = list(data)
+        data = Socio.clean(data)
     
-        for i, (field_name, value) in enumerate(zip(Socio._fields, data)):
-            # Campos numéricos: convertir strings vacíos a None
-            if field_name == "FAMQuota":
-                if value == "" or value is None:
-                    data_clean[i] = None
-                elif isinstance(value, str):
-                    try:
-                        data_clean[i] = float(value.replace(',', '.'))
-                    except:
-                        data_clean[i] = None
-        
-            # Campos de fecha: convertir strings a datetime
-            elif field_name in ["FAMDataAlta", "FAMDataNaixement", "FAMDataBaixa"]:
-                if value is None or value == "":
-                    data_clean[i] = None
-                elif isinstance(value, str):
-                    try:
-                        data_clean[i] = datetime.strptime(value.split()[0], '%Y-%m-%d')
-                    except:
-                        data_clean[i] = None
-        
-            # Campos booleanos: convertir strings a bool
-            elif field_name in ["FAMbPagamentDomiciliat", "FAMbRebutCobrat", "FAMPagamentFinestreta", "bBaixa"]:
-                if isinstance(value, str):
-                    data_clean[i] = value.upper() in ['TRUE', '1', 'YES']
-                elif value is None:
-                    data_clean[i] = False
-        
-            # Strings vacíos a None
-            elif isinstance(value, str) and value.strip() == "":
-                data_clean[i] = None
-    
-        data = tuple(data_clean)
-    
-        # ============================================================================
-        # DEBUG: Imprimir datos para diagnóstico
-        # ============================================================================
-        print("\n" + "="*80)
-        print("DEBUG - DATOS A ACTUALIZAR:")
-        print("="*80)
-        for i, (field_name, value) in enumerate(zip(Socio._fields, data)):
-            print(f"{i:2d}. {field_name:25s} = {value!r:40s} (tipo: {type(value).__name__})")
-        print("="*80 + "\n")
-
-        # Después de imprimir "DEBUG - DATOS LIMPIADOS:", añadir:
-        print(f"\n🔍 DEBUG ESPECÍFICO NIF:")
-        print(f"   Índice FAMNIF en Socio._fields: {Socio._fields.index('FAMNIF') if 'FAMNIF' in Socio._fields else 'NO ENCONTRADO'}")
-        print(f"   Valor FAMNIF en data: '{data[13]}' (posición 13)")
-        print(f"   Tipo: {type(data[13])}")
+        log.debug("Datos a actualizar del socio %s", fam_id,
+                  extra={'valors': {f: repr(v) for f, v in zip(Socio._fields, data)}})
     
         # Excluir FAMID del SET ya que no se debe actualizar la clave primaria
         update_fields = [f for f in Socio._fields if f != 'FAMID']
         update_pairs = ', '.join([f"{col} = ?" for col in update_fields])
         query = f"UPDATE scazorla_sa.G_Socis SET {update_pairs} WHERE FAMID = ?"
     
-        print(f"Query: {query}\n")
-    
         try:
-            with self.conn.cursor() as cursor:
-                # Excluir el primer elemento (FAMID) de data y agregar FAMID al final para el WHERE
-                ordered_data = data[1:] + (fam_id,)
-            
-                print("Datos ordenados para query:")
-                for i, val in enumerate(ordered_data):
-                    print(f"  ?{i+1} = {val!r} (tipo: {type(val).__name__})")
-                print()
-            
-                cursor.execute(query, ordered_data)
-                self.conn.commit()
+            # Excluir el primer elemento (FAMID) de data y agregar FAMID al final para el WHERE
+            ordered_data = data[1:] + (fam_id,)
+            self._execute_write(query, ordered_data)
             return True
         except pyodbc.Error as ex:
-            print(f"Error al actualizar socio: {ex}")
+            log.error("Error al actualizar socio: %s", ex)
             return False
         
     def rename_socio(self, old_fam_id: str, new_fam_id: str) -> bool:
@@ -260,17 +631,19 @@ class DatabaseModel:
 
         # Validaciones
         if not self.socio_exists(old_fam_id):
-            print(f"Error: no existe el socio original {old_fam_id}")
+            log.error("No existe el socio original %s", old_fam_id)
             return False
 
         if old_fam_id == new_fam_id:
             return True
 
         if self.socio_exists(new_fam_id):
-            print(f"Error: ya existe un socio con el nuevo ID {new_fam_id}")
+            log.error("Ya existe un socio con el nuevo ID %s", new_fam_id)
             return False
 
-        cursor = self.conn.cursor()
+        conn = self.pool.acquire()
+        cursor = conn.cursor()
+        broken = False
         try:
             cursor.execute("BEGIN TRANSACTION")
 
@@ -282,7 +655,7 @@ class DatabaseModel:
             if cursor.rowcount != 1:
                 # Si no actualiza exactamente 1 fila, algo está mal (duplicados o no existe)
                 cursor.execute("ROLLBACK")
-                print(f"Error: se esperaban 1 fila actualizada y fueron {cursor.rowcount}")
+                log.error("Se esperaba 1 fila actualizada y fueron %s", cursor.rowcount)
                 return False
 
             # 2) Actualizar referencias en la misma tabla (parejas)
@@ -301,27 +674,26 @@ class DatabaseModel:
             return True
 
         except Exception as ex:
+            broken = isinstance(ex, pyodbc.Error) and is_connection_error(ex)
             try:
                 cursor.execute("ROLLBACK")
             except Exception:
                 pass
-            print(f"Error al renombrar socio: {ex}")
+            log.error("Error al renombrar socio: %s", ex)
             return False
         finally:
             cursor.close()
+            self.pool.release(conn, discard=broken)
 
 
     def delete_socio(self, fam_id):
         """Da de baja un socio (marca bBaixa = True y establece fecha de baja)."""
-        from datetime import datetime
         query = "UPDATE scazorla_sa.G_Socis SET bBaixa = ?, FAMDataBaixa = ? WHERE FAMID = ?"
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(query, (True, datetime.now(), fam_id))
-                self.conn.commit()
+            self._execute_write(query, (True, datetime.now(), fam_id))
             return True
         except pyodbc.Error as ex:
-            print(f"Error al dar de baja socio: {ex}")
+            log.error("Error al dar de baja socio: %s", ex)
             return False
 
     def update_dades(self, data):
@@ -331,12 +703,10 @@ class DatabaseModel:
         update_pairs = ', '.join([f"{col} = ?" for col in Dades._fields])
         query = f"UPDATE scazorla_sa.G_Dades SET {update_pairs} WHERE RegID = 1"
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(query, data)
-                self.conn.commit()
+            self._execute_write(query, data)
             return True
         except pyodbc.Error as ex:
-            print(f"Error al actualizar datos de configuración: {ex}")
+            log.error("Error al actualizar datos de configuración: %s", ex)
             return False
 
     def set_quota_for_all_socis(self, new_quota: float, only_active: bool = True) -> bool:
@@ -348,30 +718,31 @@ class DatabaseModel:
             if new_quota is None:
                 return False
 
-            cursor = self.conn.cursor()
-            try:
-                cursor.execute("BEGIN TRANSACTION")
-
-                if only_active:
-                    cursor.execute(
-                        "UPDATE scazorla_sa.G_Socis SET FAMQuota = ? WHERE ISNULL(bBaixa, 0) = 0",
-                        new_quota
-                    )
-                else:
-                    cursor.execute(
-                        "UPDATE scazorla_sa.G_Socis SET FAMQuota = ?",
-                        new_quota
-                    )
-
-                cursor.execute("COMMIT")
-                return True
-
-            except Exception:
-                cursor.execute("ROLLBACK")
-                raise
-            finally:
-                cursor.close()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("BEGIN TRANSACTION")
+
+                    if only_active:
+                        cursor.execute(
+                            "UPDATE scazorla_sa.G_Socis SET FAMQuota = ? WHERE ISNULL(bBaixa, 0) = 0",
+                            new_quota
+                        )
+                    else:
+                        cursor.execute(
+                            "UPDATE scazorla_sa.G_Socis SET FAMQuota = ?",
+                            new_quota
+                        )
+
+                    cursor.execute("COMMIT")
+                    return True
+
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+                finally:
+                    cursor.close()
 
         except pyodbc.Error as ex:
-            print(f"Error al replicar quota a socios: {ex}")
+            log.error("Error al replicar quota a socios: %s", ex)
             return False
\ No newline at end of file
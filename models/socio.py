@@ -0,0 +1,193 @@
+import sys
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+# Columnas de G_Socis que usa la aplicación, en el orden del SELECT
+SOCIO_FIELDS = (
+    'FAMID',
+    'FAMNom',
+    'FAMAdressa',
+    'FAMPoblacio',
+    'FAMCodPos',
+    'FAMTelefon',
+    'FAMMobil',
+    'FAMEmail',
+    'FAMDataAlta',
+    'FAMIBAN',
+    'FAMBIC',
+    'bBaixa',
+    'FAMObservacions',
+    'FAMNIF',
+    'FAMDataNaixement',
+    'FAMQuota',
+    'FAMDataBaixa',
+    'FAMSexe',
+    'FAMSociReferencia',
+    'FAMbPagamentDomiciliat',
+    'FAMbRebutCobrat',
+    'FAMPagamentFinestreta',
+    'FAMTelefonEmergencia',
+)
+
+DATE_FIELDS = frozenset({'FAMDataAlta', 'FAMDataNaixement', 'FAMDataBaixa'})
+BOOL_FIELDS = frozenset({'bBaixa', 'FAMbPagamentDomiciliat', 'FAMbRebutCobrat', 'FAMPagamentFinestreta'})
+DECIMAL_FIELDS = frozenset({'FAMQuota'})
+# CHAR(5): SQL Server los devuelve con espacios de relleno
+KEY_FIELDS = frozenset({'FAMID', 'FAMSociReferencia'})
+# Valores muy repetidos entre socios: se comparte una sola copia de cada cadena
+INTERNED_FIELDS = frozenset({'FAMPoblacio', 'FAMCodPos', 'FAMBIC', 'FAMSexe'})
+
+
+def to_date(value):
+    """Convierte un valor de fecha (datetime, date o texto) a datetime."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value).strip()
+    if not text:
+        return None
+    text = text.split()[0]
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_decimal(value):
+    """Convierte un importe (número o texto con coma) a Decimal."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value).strip().replace(',', '.'))
+    except InvalidOperation:
+        return None
+
+
+def to_bool(value):
+    """Convierte un valor BIT (o texto del formulario) a bool."""
+    if isinstance(value, str):
+        return value.strip().upper() in ('TRUE', '1', 'YES', 'SI', 'SÍ', 'S')
+    return bool(value)
+
+
+def coerce_value(field, value, blank_as_none=False):
+    """
+    Convierte un valor al tipo canónico de su campo.
+
+    Args:
+        field (str): Nombre del campo
+        value: Valor leído de la BD o del formulario
+        blank_as_none (bool): Guardar las cadenas vacías como NULL
+    """
+    if field in DATE_FIELDS:
+        return to_date(value)
+    if field in BOOL_FIELDS:
+        return to_bool(value)
+    if field in DECIMAL_FIELDS:
+        return to_decimal(value)
+    if isinstance(value, str):
+        if field in KEY_FIELDS:
+            value = value.strip()
+        elif field in INTERNED_FIELDS:
+            value = sys.intern(value.strip())
+        if blank_as_none and value.strip() == "":
+            return None
+    return value
+
+
+class Socio:
+    """
+    Registro de un socio (fila de G_Socis).
+
+    Es la única definición del socio en la aplicación. Usa __slots__ para
+    ocupar poco y se comporta como la antigua namedtuple: acceso por nombre
+    o por índice, iteración, _fields, _replace y _asdict.
+
+    Los valores se convierten a su tipo una sola vez al crearlo con
+    from_row(): fechas a datetime, FAMQuota a Decimal, los BIT a bool y los
+    FAMID sin espacios de relleno.
+    """
+    __slots__ = SOCIO_FIELDS
+    _fields = SOCIO_FIELDS
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(SOCIO_FIELDS):
+            raise TypeError(f"Socio admite {len(SOCIO_FIELDS)} valores, recibidos {len(args)}")
+        for field, value in zip(SOCIO_FIELDS, args):
+            object.__setattr__(self, field, value)
+        for field in SOCIO_FIELDS[len(args):]:
+            object.__setattr__(self, field, kwargs.pop(field, None))
+        if kwargs:
+            raise TypeError(f"Campos desconocidos en Socio: {', '.join(kwargs)}")
+
+    @classmethod
+    def from_row(cls, row):
+        """Crea el socio a partir de una fila de la BD, convirtiendo los tipos."""
+        return cls(*(coerce_value(f, v) for f, v in zip(SOCIO_FIELDS, row)))
+
+    @classmethod
+    def _make(cls, iterable):
+        return cls(*iterable)
+
+    @staticmethod
+    def clean(values):
+        """
+        Prepara los valores del formulario para escribirlos en G_Socis.
+
+        Returns:
+            tuple: Valores convertidos, con las cadenas vacías como NULL
+        """
+        return tuple(
+            coerce_value(f, v, blank_as_none=True)
+            for f, v in zip(SOCIO_FIELDS, values)
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Socio es inmutable; usa _replace()")
+
+    def __iter__(self):
+        return (getattr(self, f) for f in SOCIO_FIELDS)
+
+    def __len__(self):
+        return len(SOCIO_FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        return getattr(self, SOCIO_FIELDS[index])
+
+    def __eq__(self, other):
+        if isinstance(other, Socio):
+            return tuple(self) == tuple(other)
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        valores = ', '.join(f"{f}={getattr(self, f)!r}" for f in SOCIO_FIELDS)
+        return f"Socio({valores})"
+
+    def __getstate__(self):
+        return tuple(self)
+
+    def __setstate__(self, state):
+        for field, value in zip(SOCIO_FIELDS, state):
+            object.__setattr__(self, field, value)
+
+    def _replace(self, **kwargs):
+        values = {f: getattr(self, f) for f in SOCIO_FIELDS}
+        values.update(kwargs)
+        return Socio(**values)
+
+    def _asdict(self):
+        return {f: getattr(self, f) for f in SOCIO_FIELDS}
@@ -1,9 +1,7 @@
 ﻿from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+from utils.pdf_styles import get_styles, tabla
 from models.activitat import Activitat, ActivitatInscripcio
 from typing import List
 from datetime import datetime
@@ -26,26 +24,10 @@ def generate_activitat_report(activitat: Activitat, inscripcions: List[Activitat
                            topMargin=2*cm, bottomMargin=2*cm,
                            leftMargin=2*cm, rightMargin=2*cm)
     
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
+    # Estilos (compartidos, se crean una vez por proceso)
+    styles = get_styles()
+    title_style = styles['ActivitatTitol']
+    subtitle_style = styles['ActivitatSubtitol']
     
     # Elementos del PDF
     elements = []
@@ -102,20 +84,7 @@ def generate_activitat_report(activitat: Activitat, inscripcions: List[Activitat
         table = Table(data, colWidths=[3*cm, 7*cm, 2.5*cm, 2.5*cm, 2*cm])
         
         # Estilo de la tabla
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (3, 0), (4, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        table.setStyle(tabla('activitat'))
         
         elements.append(table)
     else:
@@ -124,9 +93,7 @@ def generate_activitat_report(activitat: Activitat, inscripcions: List[Activitat
     # Pie de página
     elements.append(Spacer(1, 1*cm))
     footer_text = f"Generat el {datetime.now().strftime('%d/%m/%Y a les %H:%M')}"
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], 
-                                  fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-    elements.append(Paragraph(footer_text, footer_style))
+    elements.append(Paragraph(footer_text, styles['Peu']))
     
     # Generar PDF
     doc.build(elements)
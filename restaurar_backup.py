@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de Restauración de Socios desde un Backup
+================================================
+Deja G_Socis como estaba en una copia de seguridad.
+
+Este script:
+1. Reconstruye la copia elegida (incremental de backups/indice.json o un
+   CSV antiguo de backups/)
+2. La compara por FAMID con la tabla actual, columna a columna
+3. Muestra un informe de simulación: socios a recuperar, a modificar y a
+   eliminar, con el detalle de los campos que cambian
+4. Con --aplicar: crea antes un backup del estado actual y aplica solo las
+   filas distintas en una única transacción (tabla temporal cargada con
+   fast_executemany + MERGE)
+
+Uso:
+    python restaurar_backup.py ID|fichero.csv               Simulación
+    python restaurar_backup.py ID|fichero.csv --aplicar     Restaurar
+    python restaurar_backup.py ID|fichero.csv --aplicar --sin-eliminar
+        (no elimina los socios creados después de la copia)
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import sys
+import csv
+from datetime import datetime, date
+from decimal import Decimal
+import pyodbc
+from models.model import get_pool
+from utils.backup_incremental import reconstruir, crear_copia, TABLA_SOCIOS, TAMANO_BLOQUE
+from utils.diff_socios import escribir_changeset
+
+BACKUP_DIR = "backups"
+
+# Socios de cada tipo que se listan en el informe
+MAX_LISTADO = 20
+
+
+def valor_comparable(valor):
+    """
+    Normaliza un valor para comparar la copia con la tabla.
+
+    - None y cadena vacía son equivalentes (los CSV no distinguen NULL)
+    - Se ignoran los espacios de relleno de los campos CHAR
+    - Los importes se comparan sin ceros sobrantes (18.00 == 18)
+    """
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return format(valor.normalize(), 'f')
+    return str(valor).rstrip()
+
+
+def _convertir_csv(valor, tipo):
+    """Convierte un texto de los CSV antiguos al tipo de la columna."""
+    if tipo is str:
+        return valor
+    if valor == '':
+        return None
+    if tipo is bool:
+        return valor == 'True'
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is Decimal:
+        return Decimal(valor)
+    if tipo is int:
+        return int(valor)
+    if tipo is float:
+        return float(valor)
+    return valor
+
+
+class RestauradorSocios:
+    def __init__(self, origen, env_path='models/.env'):
+        """
+        Inicializa el restaurador.
+
+        Args:
+            origen (str): ID de una copia del índice o ruta a un CSV antiguo
+            env_path (str): Ruta al archivo .env con credenciales de BD
+        """
+        self.origen = origen
+        self.env_path = env_path
+        self.pool = get_pool(env_path)
+        self.conn = self.pool.acquire()
+        print("✅ Conexión a la base de datos establecida correctamente")
+
+        self.columnas = []      # Columnas que se restauran (comunes a copia y tabla)
+        self.descripcion = {}   # columna -> fila de cursor.description de la tabla
+        self.altas = []         # Filas de la copia que ya no están en la tabla
+        self.cambios = []       # (fila de la copia, {campo: (actual, copia)})
+        self.bajas = []         # (FAMID, nombre) de socios que no estaban en la copia
+
+    def _describir_tabla(self):
+        """Columnas y tipos actuales de G_Socis (sin las columnas binarias)."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT TOP 0 * FROM {TABLA_SOCIOS}")
+        # Las columnas binarias (ROWVERSION) las genera el servidor
+        return {
+            c[0]: c for c in cursor.description
+            if c[1] not in (bytes, bytearray)
+        }
+
+    def leer_copia(self):
+        """
+        Reconstruye la copia de origen.
+
+        Returns:
+            tuple: (columnas, {FAMID: {columna: valor}})
+        """
+        if os.path.exists(self.origen):
+            print(f"\n📂 Leyendo CSV: {self.origen}")
+            with open(self.origen, newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                columnas = next(reader)
+                tipos = [self.descripcion[c][1] if c in self.descripcion else str for c in columnas]
+                filas = {}
+                for valores in reader:
+                    fila = {c: _convertir_csv(v, t) for c, v, t in zip(columnas, valores, tipos)}
+                    filas[str(fila['FAMID']).strip()] = fila
+        else:
+            print(f"\n📂 Reconstruyendo copia: {self.origen}")
+            columnas, _, por_famid = reconstruir(BACKUP_DIR, self.origen)
+            filas = {famid: dict(zip(columnas, fila)) for famid, fila in por_famid.items()}
+
+        print(f"✅ Copia con {len(filas)} socios")
+        return columnas, filas
+
+    def comparar(self):
+        """Compara la copia con la tabla y guarda las diferencias."""
+        self.descripcion = self._describir_tabla()
+        columnas_copia, copia = self.leer_copia()
+
+        self.columnas = [c for c in columnas_copia if c in self.descripcion]
+        omitidas = [c for c in self.descripcion if c not in columnas_copia]
+        if omitidas:
+            print(f"ℹ️ Columnas que no están en la copia (no se tocan): {', '.join(omitidas)}")
+
+        print("🔍 Comparando con la tabla actual...")
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {', '.join(self.columnas)} FROM {TABLA_SOCIOS}")
+        vistos = set()
+        while True:
+            filas = cursor.fetchmany(TAMANO_BLOQUE)
+            if not filas:
+                break
+            for valores in filas:
+                actual = dict(zip(self.columnas, valores))
+                famid = str(actual['FAMID']).strip()
+                vistos.add(famid)
+
+                fila_copia = copia.get(famid)
+                if fila_copia is None:
+                    self.bajas.append((famid, actual.get('FAMNom')))
+                    continue
+
+                diferencias = {
+                    c: (actual[c], fila_copia.get(c))
+                    for c in self.columnas
+                    if valor_comparable(actual[c]) != valor_comparable(fila_copia.get(c))
+                }
+                if diferencias:
+                    self.cambios.append((fila_copia, diferencias))
+
+        self.altas = [fila for famid, fila in copia.items() if famid not in vistos]
+
+    def mostrar_informe(self, eliminar=True):
+        """Muestra las diferencias encontradas (informe de simulación)."""
+        print("\n" + "="*70)
+        print("📋 INFORME DE RESTAURACIÓN")
+        print("="*70)
+        print(f"➕ Socios a recuperar (no están en la tabla): {len(self.altas)}")
+        for fila in self.altas[:MAX_LISTADO]:
+            print(f"   {str(fila['FAMID']).strip()} - {fila.get('FAMNom')}")
+
+        print(f"🔄 Socios a modificar:                        {len(self.cambios)}")
+        for fila, diferencias in self.cambios[:MAX_LISTADO]:
+            campos = ', '.join(
+                f"{c}: '{valor_comparable(a)}' → '{valor_comparable(b)}'"
+                for c, (a, b) in diferencias.items()
+            )
+            print(f"   {str(fila['FAMID']).strip()} - {fila.get('FAMNom')}: {campos}")
+
+        accion = "a eliminar" if eliminar else "no están en la copia (se conservan)"
+        print(f"➖ Socios {accion}: {len(self.bajas)}")
+        for famid, nombre in self.bajas[:MAX_LISTADO]:
+            print(f"   {famid} - {nombre}")
+
+        changeset = [
+            (fila['FAMID'], fila.get('FAMNIF'), fila.get('FAMNom'), diferencias)
+            for fila, diferencias in self.cambios
+        ]
+        ruta = escribir_changeset(changeset, BACKUP_DIR, prefijo="restauracion_socios")
+        if ruta:
+            print(f"\n📝 Detalle campo a campo: {ruta}")
+        print("="*70)
+
+    def _tamanos(self):
+        """Tipos de los parámetros para fast_executemany."""
+        tamanos = []
+        for col in self.columnas:
+            _, tipo, _, longitud, precision, escala, _ = self.descripcion[col]
+            if tipo is bool:
+                tamanos.append((pyodbc.SQL_BIT, 1, 0))
+            elif tipo is datetime:
+                tamanos.append((pyodbc.SQL_TYPE_TIMESTAMP, 23, 3))
+            elif tipo is Decimal:
+                tamanos.append((pyodbc.SQL_DECIMAL, precision, escala))
+            elif tipo is int:
+                tamanos.append((pyodbc.SQL_INTEGER, 0, 0))
+            elif tipo is float:
+                tamanos.append((pyodbc.SQL_DOUBLE, 0, 0))
+            else:
+                tamanos.append((pyodbc.SQL_WVARCHAR, longitud or 0, 0))
+        return tamanos
+
+    def aplicar(self, eliminar=True):
+        """
+        Aplica las diferencias en una única transacción.
+
+        Las filas a recuperar o modificar se cargan en #Restaurar en un solo
+        viaje y se aplican con un MERGE por FAMID; si algo falla no se
+        aplica ningún cambio.
+
+        Returns:
+            bool: True si se ha restaurado
+        """
+        filas = [
+            tuple(fila.get(c) for c in self.columnas)
+            for fila in self.altas + [f for f, _ in self.cambios]
+        ]
+        bajas = [(famid,) for famid, _ in self.bajas] if eliminar else []
+        if not filas and not bajas:
+            print("✅ La tabla ya coincide con la copia: no hay nada que restaurar")
+            return True
+
+        columnas = ", ".join(self.columnas)
+        cursor = self.conn.cursor()
+        try:
+            # Misma estructura que G_Socis (sin IDENTITY ni columnas binarias)
+            cursor.execute(f"""
+                SELECT TOP 0 {columnas} INTO #Restaurar FROM {TABLA_SOCIOS}
+                UNION ALL
+                SELECT TOP 0 {columnas} FROM {TABLA_SOCIOS}
+            """)
+            cursor.execute("CREATE TABLE #RestaurarBajas (FAMID NVARCHAR(5) PRIMARY KEY)")
+
+            cursor.fast_executemany = True
+            if filas:
+                cursor.setinputsizes(self._tamanos())
+                cursor.executemany(
+                    f"INSERT INTO #Restaurar ({columnas}) VALUES ({', '.join('?' for _ in self.columnas)})",
+                    filas
+                )
+            if bajas:
+                cursor.setinputsizes([(pyodbc.SQL_WVARCHAR, 5, 0)])
+                cursor.executemany("INSERT INTO #RestaurarBajas (FAMID) VALUES (?)", bajas)
+            cursor.fast_executemany = False
+            cursor.setinputsizes(None)
+
+            asignaciones = ", ".join(f"{c} = s.{c}" for c in self.columnas if c != 'FAMID')
+            cursor.execute(f"""
+                MERGE {TABLA_SOCIOS} AS t
+                USING #Restaurar AS s
+                    ON t.FAMID = s.FAMID
+                WHEN MATCHED THEN
+                    UPDATE SET {asignaciones}
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT ({columnas})
+                    VALUES ({', '.join(f's.{c}' for c in self.columnas)});
+            """)
+            cursor.execute(f"""
+                DELETE t FROM {TABLA_SOCIOS} AS t
+                JOIN #RestaurarBajas AS b ON RTRIM(t.FAMID) = b.FAMID
+            """)
+            cursor.execute("DROP TABLE #Restaurar")
+            cursor.execute("DROP TABLE #RestaurarBajas")
+
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"❌ Error en la restauración (no se ha aplicado ningún cambio): {e}")
+            return False
+        finally:
+            cursor.close()
+
+        print(f"✅ Restauración completada: {len(self.altas)} recuperados, "
+              f"{len(self.cambios)} modificados, {len(bajas)} eliminados")
+        return True
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos."""
+        if self.conn:
+            self.pool.release(self.conn)
+            self.pool.close_all()
+            self.conn = None
+            print("🔒 Conexión a la base de datos cerrada")
+
+
+def main():
+    """Función principal."""
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    APLICAR = '--aplicar' in sys.argv[1:]
+    ELIMINAR = '--sin-eliminar' not in sys.argv[1:]
+    ENV_PATH = "models/.env"
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    print("="*70)
+    print("⏪ RESTAURACIÓN DE SOCIOS DESDE BACKUP")
+    print("="*70)
+    print(f"📅 Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    print(f"⚙️  Modo: {'restaurar' if APLICAR else 'simulación (sin cambios)'}")
+    print("="*70)
+
+    if not os.path.exists(ENV_PATH):
+        print(f"\n❌ Error: No se encuentra el archivo {ENV_PATH}")
+        sys.exit(1)
+
+    try:
+        restaurador = RestauradorSocios(args[0], ENV_PATH)
+        try:
+            restaurador.comparar()
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            sys.exit(1)
+        restaurador.mostrar_informe(eliminar=ELIMINAR)
+
+        if APLICAR:
+            respuesta = input("\n¿Deseas aplicar estos cambios? (escribe 'SI' para confirmar): ")
+            if respuesta.upper() != 'SI':
+                print("\n❌ Restauración cancelada por el usuario")
+            else:
+                # El estado actual queda guardado: la restauración también se puede deshacer
+                copia = crear_copia(restaurador.conn, BACKUP_DIR)
+                print(f"💾 Backup del estado actual: {copia['fichero']}")
+                restaurador.aplicar(eliminar=ELIMINAR)
+        else:
+            print("\nℹ️ Simulación: no se ha modificado nada. Usa --aplicar para restaurar.")
+
+        restaurador.cerrar()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Restauración interrumpida por el usuario")
+        sys.exit(1)
+    except pyodbc.Error as e:
+        print(f"\n❌ Error de base de datos: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,17 +13,50 @@ Este script:
 5. Crea backup automático antes de sincronizar
 6. Genera un reporte detallado de los cambios
 
+Modo masivo (--bulk):
+    Carga toda la hoja en una tabla temporal en un solo viaje
+    (fast_executemany) y aplica altas, cambios y bajas con un único
+    MERGE por NIF normalizado dentro de una sola transacción.
+
 Autor: Sistema de Gestión COJUB
 Fecha: 2024
 """
 
 import os
 import sys
-import csv
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
+from datetime import datetime
 import pyodbc
-import openpyxl
+from models.model import get_pool
+from utils.excel_socios import leer_socios_excel, validar_socios_excel, imprimir_incidencias
+from utils.backup_incremental import crear_copia
+from utils.validacion import normalizar_nif
+from utils.diff_socios import (
+    CAMPOS_SYNC, huella, calcular_cambios, sentencia_update,
+    escribir_changeset, resumen_por_campo
+)
+
+# Expresión SQL equivalente a limpiar_nif() para comparar en el servidor
+NIF_LIMPIO_SQL = "UPPER(REPLACE(REPLACE(REPLACE(LTRIM(RTRIM({col})), ' ', ''), '-', ''), '.', ''))"
+
+# Columnas de la tabla temporal del modo masivo (mismo orden que los parámetros)
+COLUMNAS_STAGING = [
+    ('NIF_LIMPIO', 'NVARCHAR(20)'),
+    ('FAMID_NUEVO', 'NVARCHAR(5)'),
+    ('FAMNom', 'NVARCHAR(255)'),
+    ('FAMAdressa', 'NVARCHAR(255)'),
+    ('FAMPoblacio', 'NVARCHAR(255)'),
+    ('FAMCodPos', 'NVARCHAR(20)'),
+    ('FAMTelefon', 'NVARCHAR(50)'),
+    ('FAMMobil', 'NVARCHAR(50)'),
+    ('FAMEmail', 'NVARCHAR(255)'),
+    ('FAMDataAlta', 'DATETIME'),
+    ('FAMIBAN', 'NVARCHAR(50)'),
+    ('FAMBIC', 'NVARCHAR(20)'),
+    ('FAMNIF', 'NVARCHAR(20)'),
+    ('FAMbPagamentDomiciliat', 'BIT'),
+    ('bCambio', 'BIT'),
+]
+
 
 class SincronizadorSociosPorNIF:
     def __init__(self, excel_path, env_path='models/.env'):
@@ -46,26 +79,26 @@ class SincronizadorSociosPorNIF:
             'total_excel': 0,
             'total_bd_antes': 0,
             'total_bd_despues': 0,
-            'nifs_duplicados': 0
+            'nifs_duplicados': 0,
+            'datos_incorrectos': 0
         }
+        # Detalle de cambios aplicados: (FAMID, NIF, nombre, {campo: (antes, después)})
+        self.changeset = []
         
-        # Cargar variables de entorno desde la ruta especificada
-        if os.path.exists(env_path):
-            load_dotenv(env_path)
-        
+        self.env_path = env_path
+        self.pool = None
         self.conectar_bd()
     
     def conectar_bd(self):
-        """Establece conexión con SQL Server."""
+        """
+        Establece conexión con SQL Server.
+        
+        La conexión se toma del pool compartido de models.model, que
+        reintenta la conexión si el servidor no responde a la primera.
+        """
         try:
-            conn_str = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={os.getenv('SQL_SERVER')};"
-                f"DATABASE={os.getenv('SQL_DATABASE')};"
-                f"UID={os.getenv('SQL_USER')};"
-                f"PWD={os.getenv('SQL_PASSWORD')};"
-            )
-            self.conn = pyodbc.connect(conn_str)
+            self.pool = get_pool(self.env_path)
+            self.conn = self.pool.acquire()
             print("✅ Conexión a la base de datos establecida correctamente")
         except pyodbc.Error as ex:
             print(f"❌ Error al conectar a la base de datos: {ex}")
@@ -79,49 +112,29 @@ class SincronizadorSociosPorNIF:
             nif: NIF a limpiar
             
         Returns:
-            str: NIF limpio en mayúsculas sin espacios ni guiones
+            str: NIF limpio en mayúsculas sin espacios, guiones ni puntos
         """
-        if nif is None or nif == '':
-            return None
-        # Convertir a string, quitar espacios, guiones y poner en mayúsculas
-        nif_clean = str(nif).strip().replace(' ', '').replace('-', '').upper()
-        return nif_clean if nif_clean else None
+        return normalizar_nif(nif)
     
     def crear_backup(self):
-        """Crea un backup de todos los socios antes de sincronizar."""
+        """
+        Crea un backup de los socios antes de sincronizar.
+        
+        La copia es incremental y comprimida (utils.backup_incremental):
+        solo guarda lo que ha cambiado desde la copia anterior.
+        """
         print("\n" + "="*70)
         print("💾 CREANDO BACKUP DE SEGURIDAD")
         print("="*70)
         
-        # Crear carpeta de backups si no existe
         backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-            print(f"📁 Carpeta '{backup_dir}' creada")
-        
-        # Nombre del archivo de backup con fecha y hora
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(backup_dir, f"backup_socios_{timestamp}.csv")
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM scazorla_sa.G_Socis")
-            
-            # Obtener nombres de columnas
-            columns = [column[0] for column in cursor.description]
-            
-            # Escribir al CSV
-            with open(backup_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(columns)  # Encabezados
-                
-                count = 0
-                for row in cursor.fetchall():
-                    writer.writerow(row)
-                    count += 1
+            copia = crear_copia(self.conn, backup_dir)
+            backup_file = os.path.join(backup_dir, copia['fichero'])
             
-            print(f"✅ Backup creado: {backup_file}")
-            print(f"📊 Total de socios respaldados: {count}")
+            print(f"✅ Backup {copia['tipo']} creado: {backup_file}")
+            print(f"📊 Total de socios respaldados: {copia['filas']} "
+                  f"(➕ {copia['altas']}  🔄 {copia['cambios']}  ➖ {copia['bajas']})")
             print("="*70)
             
             return backup_file
@@ -135,41 +148,27 @@ class SincronizadorSociosPorNIF:
         Lee el archivo Excel y retorna una lista de diccionarios con los socios.
         Ahora usa el NIF como identificador principal.
         
+        La lectura se hace en streaming (utils.excel_socios) y las columnas
+        se localizan por el nombre de la cabecera.
+        
         Returns:
             list: Lista de diccionarios con datos de socios
         """
         print(f"\n📂 Leyendo archivo Excel: {self.excel_path}")
         
         try:
-            wb = openpyxl.load_workbook(self.excel_path)
-            ws = wb['Hoja1']
-            
             socios_excel = []
             nifs_vistos = set()
             
-            # Leer desde la fila 2 (saltando encabezados)
-            for row_num in range(2, ws.max_row + 1):
-                # Obtener valores
-                codi = ws.cell(row_num, 1).value  # Codi
-                nombre = ws.cell(row_num, 2).value  # Nombre
-                nif = ws.cell(row_num, 3).value  # NIF
-                direccion = ws.cell(row_num, 4).value  # Dirección
-                cp = ws.cell(row_num, 5).value  # CP
-                poblacion = ws.cell(row_num, 7).value  # Población
-                telefono = ws.cell(row_num, 9).value  # Teléfono
-                movil = ws.cell(row_num, 10).value  # Móvil
-                email = ws.cell(row_num, 11).value  # Email
-                forma_pago = ws.cell(row_num, 12).value  # Forma de pagament
-                iban = ws.cell(row_num, 13).value  # IBAN
-                bic = ws.cell(row_num, 14).value  # BIC
-                fecha_alta = ws.cell(row_num, 15).value  # Fecha Alta
+            for socio in leer_socios_excel(self.excel_path):
+                row_num = socio.pop('_fila')
                 
                 # Limpiar y validar NIF
-                nif_limpio = self.limpiar_nif(nif)
+                nif_limpio = self.limpiar_nif(socio['FAMNIF'])
                 
                 if not nif_limpio:
                     self.stats['sin_nif'] += 1
-                    print(f"  ⚠️ Fila {row_num}: NIF vacío - Socio '{nombre}' - OMITIDO")
+                    print(f"  ⚠️ Fila {row_num}: NIF vacío - Socio '{socio['FAMNom']}' - OMITIDO")
                     continue
                 
                 # Detectar NIFs duplicados en Excel
@@ -179,50 +178,15 @@ class SincronizadorSociosPorNIF:
                 
                 nifs_vistos.add(nif_limpio)
                 
-                # Convertir Codi a string
-                codi = str(codi).strip() if codi else ""
-                
-                # Determinar si el pago está domiciliado
-                pago_domiciliado = False
-                if forma_pago and isinstance(forma_pago, str):
-                    pago_domiciliado = 'domiciliat' in forma_pago.lower() or '3' in forma_pago
-                
-                # Convertir fecha de Excel a datetime si es numérico
-                fecha_alta_dt = None
-                if fecha_alta:
-                    if isinstance(fecha_alta, (int, float)):
-                        try:
-                            fecha_alta_dt = datetime(1899, 12, 30) + timedelta(days=int(fecha_alta))
-                        except:
-                            fecha_alta_dt = None
-                    elif isinstance(fecha_alta, datetime):
-                        fecha_alta_dt = fecha_alta
-                
-                # Convertir CP a string
-                cp_str = str(cp) if cp else ""
-                if cp_str and '.' in cp_str:
-                    cp_str = cp_str.split('.')[0]  # Quitar decimales si los hay
-                
-                socio = {
-                    'FAMID': codi,
-                    'NIF_LIMPIO': nif_limpio,  # NIF normalizado para búsqueda
-                    'FAMNom': str(nombre).strip() if nombre else "",
-                    'FAMNIF': nif_limpio,  # Usar NIF limpio
-                    'FAMAdressa': str(direccion).strip() if direccion else "",
-                    'FAMPoblacio': str(poblacion).strip() if poblacion else "",
-                    'FAMCodPos': cp_str.strip(),
-                    'FAMTelefon': str(telefono).strip() if telefono else "",
-                    'FAMMobil': str(movil).strip() if movil else "",
-                    'FAMEmail': str(email).strip() if email else "",
-                    'FAMIBAN': str(iban).strip() if iban else "",
-                    'FAMBIC': str(bic).strip() if bic else "",
-                    'FAMDataAlta': fecha_alta_dt,
-                    'FAMbPagamentDomiciliat': pago_domiciliado,
-                    'bBaixa': False  # Los del Excel están activos
-                }
-                
+                socio['NIF_LIMPIO'] = nif_limpio  # NIF normalizado para búsqueda
+                socio['FAMNIF'] = nif_limpio  # Usar NIF limpio
                 socios_excel.append(socio)
             
+            # Validar IBAN, BIC y letra del NIF de todas las filas de una vez
+            incidencias = validar_socios_excel(socios_excel)
+            self.stats['datos_incorrectos'] = len(incidencias)
+            imprimir_incidencias(incidencias)
+            
             self.stats['total_excel'] = len(socios_excel)
             print(f"✅ Se leyeron {len(socios_excel)} socios válidos del Excel")
             if self.stats['sin_nif'] > 0:
@@ -240,12 +204,15 @@ class SincronizadorSociosPorNIF:
         """
         Obtiene todos los socios de la BD indexados por NIF.
         
+        Cada socio incluye los campos sincronizados y su huella ('HASH')
+        para detectar sin más consultas si el Excel trae cambios.
+        
         Returns:
             dict: Diccionario {NIF_LIMPIO: {datos del socio}}
         """
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT FAMID, FAMNIF, FAMNom, bBaixa 
+        cursor.execute(f"""
+            SELECT FAMID, {', '.join(CAMPOS_SYNC)}
             FROM scazorla_sa.G_Socis
         """)
         
@@ -254,16 +221,13 @@ class SincronizadorSociosPorNIF:
         total_sin_nif = 0
         
         for row in cursor.fetchall():
-            famid, famnif, famnom, bbaixa = row
-            nif_limpio = self.limpiar_nif(famnif)
+            socio_bd = dict(zip(['FAMID'] + CAMPOS_SYNC, row))
+            nif_limpio = self.limpiar_nif(socio_bd['FAMNIF'])
             
             if nif_limpio:
-                socios_bd[nif_limpio] = {
-                    'FAMID': famid,
-                    'FAMNIF_ORIGINAL': famnif,
-                    'FAMNom': famnom,
-                    'bBaixa': bbaixa
-                }
+                socio_bd['FAMNIF_ORIGINAL'] = socio_bd['FAMNIF']
+                socio_bd['HASH'] = huella(socio_bd)
+                socios_bd[nif_limpio] = socio_bd
                 total_con_nif += 1
             else:
                 total_sin_nif += 1
@@ -338,54 +302,31 @@ class SincronizadorSociosPorNIF:
             self.stats['errores'] += 1
             return False
     
-    def actualizar_socio(self, socio, famid_bd):
-        """Actualiza un socio existente en la base de datos."""
+    def actualizar_socio(self, socio, socio_bd):
+        """
+        Actualiza un socio existente en la base de datos.
+        
+        Solo se escriben los campos que difieren de la fila actual; si la
+        huella coincide no se lanza ningún UPDATE.
+        """
         try:
-            cursor = self.conn.cursor()
+            cambios = calcular_cambios(socio, socio_bd)
+            if not cambios:
+                self.stats['sin_cambios'] += 1
+                return True
             
-            query = """
-            UPDATE scazorla_sa.G_Socis SET
-                FAMNom = ?,
-                FAMAdressa = ?,
-                FAMPoblacio = ?,
-                FAMCodPos = ?,
-                FAMTelefon = ?,
-                FAMMobil = ?,
-                FAMEmail = ?,
-                FAMDataAlta = ?,
-                FAMIBAN = ?,
-                FAMBIC = ?,
-                FAMNIF = ?,
-                bBaixa = 0,
-                FAMDataBaixa = NULL,
-                FAMbPagamentDomiciliat = ?
-            WHERE FAMID = ?
-            """
+            famid_bd = socio_bd['FAMID']
+            query, params = sentencia_update(cambios, famid_bd)
             
-            cursor.execute(query, (
-                socio['FAMNom'],
-                socio['FAMAdressa'],
-                socio['FAMPoblacio'],
-                socio['FAMCodPos'],
-                socio['FAMTelefon'],
-                socio['FAMMobil'],
-                socio['FAMEmail'],
-                socio['FAMDataAlta'],
-                socio['FAMIBAN'],
-                socio['FAMBIC'],
-                socio['FAMNIF'],
-                socio['FAMbPagamentDomiciliat'],
-                famid_bd
-            ))
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            self.conn.commit()
             
-            if cursor.rowcount > 0:
-                self.conn.commit()
-                self.stats['actualizados'] += 1
-                print(f"  🔄 Actualizado: {socio['FAMNom'][:40]} (NIF: {socio['NIF_LIMPIO']})")
-                return True
-            else:
-                self.stats['sin_cambios'] += 1
-                return True
+            self.stats['actualizados'] += 1
+            self.changeset.append((famid_bd, socio['NIF_LIMPIO'], socio['FAMNom'], cambios))
+            print(f"  🔄 Actualizado: {socio['FAMNom'][:40]} (NIF: {socio['NIF_LIMPIO']}) "
+                  f"[{', '.join(cambios)}]")
+            return True
             
         except Exception as e:
             print(f"  ❌ Error al actualizar {socio['FAMNom']}: {e}")
@@ -476,9 +417,8 @@ class SincronizadorSociosPorNIF:
             nif_limpio = socio['NIF_LIMPIO']
             
             if nif_limpio in socios_bd:
-                # Socio existe: actualizar
-                famid_bd = socios_bd[nif_limpio]['FAMID']
-                self.actualizar_socio(socio, famid_bd)
+                # Socio existe: actualizar solo si hay cambios
+                self.actualizar_socio(socio, socios_bd[nif_limpio])
             else:
                 # Socio nuevo: insertar
                 self.insertar_socio(socio)
@@ -498,6 +438,239 @@ class SincronizadorSociosPorNIF:
         # 8. Mostrar resumen
         self.mostrar_resumen()
     
+    def siguiente_famid(self):
+        """
+        Devuelve el primer FAMID numérico libre.
+        
+        Se consulta una sola vez por sincronización: los IDs de los socios
+        nuevos se reservan en bloque a partir de este valor.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT ISNULL(MAX(TRY_CAST(FAMID AS INT)), 0) + 1
+            FROM scazorla_sa.G_Socis
+        """)
+        return cursor.fetchone()[0]
+    
+    def asignar_famids(self, socios_nuevos):
+        """
+        Reserva un rango consecutivo de FAMIDs para los socios nuevos.
+        
+        Args:
+            socios_nuevos (list): Socios del Excel cuyo NIF no existe en BD
+            
+        Returns:
+            dict: {NIF_LIMPIO: FAMID asignado}
+        """
+        if not socios_nuevos:
+            return {}
+        
+        primer_id = self.siguiente_famid()
+        return {
+            socio['NIF_LIMPIO']: str(primer_id + i)
+            for i, socio in enumerate(socios_nuevos)
+        }
+    
+    def preparar_staging(self, socios_excel, socios_bd):
+        """
+        Prepara las filas a cargar en la tabla temporal.
+        
+        Los NIFs duplicados se resuelven quedándose con la última aparición,
+        igual que en el modo fila a fila. Los socios existentes cuya huella
+        coincide con la de la BD se marcan con bCambio = 0 y el MERGE no
+        los reescribe.
+        
+        Returns:
+            list: Tuplas en el orden de COLUMNAS_STAGING
+        """
+        por_nif = {}
+        for socio in socios_excel:
+            por_nif[socio['NIF_LIMPIO']] = socio
+        
+        nuevos = [s for nif, s in por_nif.items() if nif not in socios_bd]
+        famids_nuevos = self.asignar_famids(nuevos)
+        
+        filas = []
+        for nif, socio in por_nif.items():
+            hay_cambio = True
+            if nif in socios_bd:
+                cambios = calcular_cambios(socio, socios_bd[nif])
+                hay_cambio = bool(cambios)
+                if cambios:
+                    self.changeset.append((socios_bd[nif]['FAMID'], nif, socio['FAMNom'], cambios))
+                else:
+                    self.stats['sin_cambios'] += 1
+            
+            filas.append((
+                nif,
+                famids_nuevos.get(nif),
+                socio['FAMNom'],
+                socio['FAMAdressa'],
+                socio['FAMPoblacio'],
+                socio['FAMCodPos'],
+                socio['FAMTelefon'],
+                socio['FAMMobil'],
+                socio['FAMEmail'],
+                socio['FAMDataAlta'],
+                socio['FAMIBAN'],
+                socio['FAMBIC'],
+                socio['FAMNIF'],
+                socio['FAMbPagamentDomiciliat'],
+                hay_cambio,
+            ))
+        return filas
+    
+    def cargar_staging(self, cursor, filas):
+        """Crea #SociosExcel y carga todas las filas en un solo viaje."""
+        definicion = ", ".join(f"{col} {tipo}" for col, tipo in COLUMNAS_STAGING)
+        cursor.execute(f"CREATE TABLE #SociosExcel ({definicion})")
+        
+        if not filas:
+            return
+        
+        columnas = ", ".join(col for col, _ in COLUMNAS_STAGING)
+        placeholders = ", ".join("?" for _ in COLUMNAS_STAGING)
+        
+        # Tipos explícitos: el driver no siempre sabe describir
+        # los parámetros de una tabla temporal
+        tamanos = []
+        for col, tipo in COLUMNAS_STAGING:
+            if tipo.startswith('NVARCHAR'):
+                tamanos.append((pyodbc.SQL_WVARCHAR, int(tipo[9:-1]), 0))
+            elif tipo == 'DATETIME':
+                tamanos.append((pyodbc.SQL_TYPE_TIMESTAMP, 23, 3))
+            else:
+                tamanos.append((pyodbc.SQL_BIT, 1, 0))
+        
+        cursor.fast_executemany = True
+        cursor.setinputsizes(tamanos)
+        cursor.executemany(
+            f"INSERT INTO #SociosExcel ({columnas}) VALUES ({placeholders})",
+            filas
+        )
+        cursor.fast_executemany = False
+        cursor.setinputsizes(None)
+    
+    def aplicar_merge(self, cursor):
+        """
+        Aplica altas, cambios y bajas con un único MERGE por NIF normalizado.
+        
+        Solo participan como destino los socios con NIF, igual que en el
+        modo fila a fila: los socios sin NIF no se tocan.
+        
+        Returns:
+            list: Filas (accion, FAMID, bBaixa) devueltas por OUTPUT
+        """
+        nif_destino = NIF_LIMPIO_SQL.format(col='FAMNIF')
+        cursor.execute(f"""
+            WITH destino AS (
+                SELECT *
+                FROM scazorla_sa.G_Socis
+                WHERE NULLIF({nif_destino}, '') IS NOT NULL
+            )
+            MERGE destino AS t
+            USING #SociosExcel AS s
+                ON {NIF_LIMPIO_SQL.format(col='t.FAMNIF')} = s.NIF_LIMPIO
+            WHEN MATCHED AND s.bCambio = 1 THEN
+                UPDATE SET
+                    FAMNom = s.FAMNom,
+                    FAMAdressa = s.FAMAdressa,
+                    FAMPoblacio = s.FAMPoblacio,
+                    FAMCodPos = s.FAMCodPos,
+                    FAMTelefon = s.FAMTelefon,
+                    FAMMobil = s.FAMMobil,
+                    FAMEmail = s.FAMEmail,
+                    FAMDataAlta = s.FAMDataAlta,
+                    FAMIBAN = s.FAMIBAN,
+                    FAMBIC = s.FAMBIC,
+                    FAMNIF = s.FAMNIF,
+                    bBaixa = 0,
+                    FAMDataBaixa = NULL,
+                    FAMbPagamentDomiciliat = s.FAMbPagamentDomiciliat
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT (
+                    FAMID, FAMNom, FAMAdressa, FAMPoblacio, FAMCodPos, FAMTelefon,
+                    FAMMobil, FAMEmail, FAMDataAlta, FAMCCC, FAMIBAN, FAMBIC,
+                    FAMNSocis, bBaixa, FAMObservacions, FAMbSeccio, FAMNIF,
+                    FAMDataNaixement, FAMQuota, FAMIDSec, FAMDataBaixa, FAMTipus,
+                    FAMSexe, FAMSociReferencia, FAMNewId, FAMNewIdRef,
+                    FAMbPagamentDomiciliat, FAMbRebutCobrat, FAMPagamentFinestreta
+                ) VALUES (
+                    s.FAMID_NUEVO, s.FAMNom, s.FAMAdressa, s.FAMPoblacio, s.FAMCodPos, s.FAMTelefon,
+                    s.FAMMobil, s.FAMEmail, s.FAMDataAlta, '', s.FAMIBAN, s.FAMBIC,
+                    0, 0, '', 0, s.FAMNIF,
+                    NULL, 0, 0, NULL, 0,
+                    '', 0, 0, 0,
+                    s.FAMbPagamentDomiciliat, 0, 0
+                )
+            WHEN NOT MATCHED BY SOURCE AND ISNULL(t.bBaixa, 0) = 0 THEN
+                UPDATE SET bBaixa = 1, FAMDataBaixa = GETDATE()
+            OUTPUT $action, inserted.FAMID, inserted.bBaixa;
+        """)
+        return cursor.fetchall()
+    
+    def sincronizar_bulk(self):
+        """
+        Ejecuta la sincronización en modo masivo.
+        
+        Todo el proceso (carga de la hoja, altas, cambios y bajas) se hace
+        en una única transacción: si algo falla no se aplica ningún cambio.
+        """
+        print("\n" + "="*70)
+        print("🔄 SINCRONIZACIÓN MASIVA DE SOCIOS POR NIF/DNI")
+        print("="*70)
+        
+        # 1. Crear backup
+        backup_file = self.crear_backup()
+        if backup_file:
+            print(f"💾 Backup guardado: {backup_file}\n")
+        
+        # 2. Leer socios del Excel
+        socios_excel = self.leer_excel()
+        
+        # 3. Obtener socios de la BD (indexados por NIF)
+        socios_bd = self.obtener_socios_bd_por_nif()
+        
+        # 4. Preparar filas y reservar IDs para los nuevos
+        filas = self.preparar_staging(socios_excel, socios_bd)
+        
+        print(f"\n🚚 Cargando {len(filas)} socios en la tabla temporal...")
+        cursor = self.conn.cursor()
+        try:
+            self.cargar_staging(cursor, filas)
+            
+            print("🔀 Aplicando MERGE por NIF...")
+            resultado = self.aplicar_merge(cursor)
+            cursor.execute("DROP TABLE #SociosExcel")
+            
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"❌ Error en la sincronización masiva (no se ha aplicado ningún cambio): {e}")
+            self.stats['errores'] += 1
+            self.stats['sin_cambios'] = 0
+            self.changeset = []
+            resultado = []
+        finally:
+            cursor.close()
+        
+        # 5. Contabilizar acciones devueltas por OUTPUT
+        for accion, famid, bbaixa in resultado:
+            if accion == 'INSERT':
+                self.stats['nuevos'] += 1
+            elif bbaixa:
+                self.stats['marcados_baja'] += 1
+            else:
+                self.stats['actualizados'] += 1
+        
+        # 6. Obtener estadísticas finales
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM scazorla_sa.G_Socis")
+        self.stats['total_bd_despues'] = cursor.fetchone()[0]
+        
+        # 7. Mostrar resumen
+        self.mostrar_resumen()
+    
     def mostrar_resumen(self):
         """Muestra un resumen de la sincronización."""
         print("\n" + "="*70)
@@ -506,7 +679,7 @@ class SincronizadorSociosPorNIF:
         print(f"📂 Socios en Excel:                    {self.stats['total_excel']}")
         print(f"💾 Socios en BD (antes):               {self.stats['total_bd_antes']}")
         print(f"💾 Socios en BD (después):             {self.stats['total_bd_despues']}")
-        print(f"-"*70)
+        print("-"*70)
         print(f"➕ Socios nuevos insertados:           {self.stats['nuevos']}")
         print(f"🔄 Socios actualizados:                {self.stats['actualizados']}")
         print(f"- Socios sin cambios:                  {self.stats['sin_cambios']}")
@@ -515,7 +688,19 @@ class SincronizadorSociosPorNIF:
             print(f"⚠️  Socios omitidos (sin NIF):         {self.stats['sin_nif']}")
         if self.stats['nifs_duplicados'] > 0:
             print(f"⚠️  NIFs duplicados en Excel:          {self.stats['nifs_duplicados']}")
+        if self.stats['datos_incorrectos'] > 0:
+            print(f"⚠️  IBAN/BIC/NIF incorrectos:          {self.stats['datos_incorrectos']}")
         print(f"❌ Errores:                            {self.stats['errores']}")
+        
+        # Detalle por campo de los socios actualizados
+        por_campo = resumen_por_campo(self.changeset)
+        if por_campo:
+            print("-"*70)
+            print("🧾 Campos modificados:")
+            for campo, total in por_campo.items():
+                print(f"   • {campo:25s} {total}")
+            ruta_changeset = escribir_changeset(self.changeset)
+            print(f"📝 Detalle de cambios: {ruta_changeset}")
         print("="*70)
         
         if self.stats['errores'] == 0:
@@ -527,7 +712,9 @@ class SincronizadorSociosPorNIF:
     def cerrar(self):
         """Cierra la conexión a la base de datos."""
         if self.conn:
-            self.conn.close()
+            self.pool.release(self.conn)
+            self.pool.close_all()
+            self.conn = None
             print("🔒 Conexión a la base de datos cerrada")
 
 
@@ -536,23 +723,25 @@ def main():
     # Configuración
     EXCEL_PATH = "Socis-2025.xlsx"
     ENV_PATH = "models/.env"
+    MODO_BULK = '--bulk' in sys.argv[1:]
     
     print("="*70)
     print("🚀 SINCRONIZACIÓN DE SOCIOS POR NIF/DNI")
     print("="*70)
     print(f"📅 Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    print(f"⚙️  Modo: {'masivo (MERGE)' if MODO_BULK else 'fila a fila'}")
     print("="*70)
     
     # Verificar que el archivo Excel existe
     if not os.path.exists(EXCEL_PATH):
         print(f"\n❌ Error: No se encuentra el archivo {EXCEL_PATH}")
-        print(f"   Coloca el archivo Excel en la carpeta del proyecto")
+        print("   Coloca el archivo Excel en la carpeta del proyecto")
         sys.exit(1)
     
     # Verificar que el archivo .env existe
     if not os.path.exists(ENV_PATH):
         print(f"\n❌ Error: No se encuentra el archivo {ENV_PATH}")
-        print(f"   Crea el archivo .env con las credenciales de la base de datos")
+        print("   Crea el archivo .env con las credenciales de la base de datos")
         sys.exit(1)
     
     # Pedir confirmación
@@ -572,7 +761,10 @@ def main():
     # Ejecutar sincronización
     try:
         sincronizador = SincronizadorSociosPorNIF(EXCEL_PATH, ENV_PATH)
-        sincronizador.sincronizar()
+        if MODO_BULK:
+            sincronizador.sincronizar_bulk()
+        else:
+            sincronizador.sincronizar()
         sincronizador.cerrar()
     except KeyboardInterrupt:
         print("\n\n⚠️  Sincronización interrumpida por el usuario")
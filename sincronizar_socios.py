@@ -18,7 +18,12 @@ import sys
 from datetime import datetime
 from dotenv import load_dotenv
 import pyodbc
-import openpyxl
+from models.model import get_pool
+from utils.excel_socios import leer_socios_excel, validar_socios_excel, imprimir_incidencias
+from utils.diff_socios import (
+    CAMPOS_SYNC, huella, calcular_cambios, sentencia_update,
+    escribir_changeset, resumen_por_campo
+)
 
 # Cargar variables de entorno
 load_dotenv()
@@ -37,30 +42,31 @@ class SincronizadorSocios:
         self.stats = {
             'nuevos': 0,
             'actualizados': 0,
+            'sin_cambios': 0,
             'marcados_baja': 0,
             'errores': 0,
             'total_excel': 0,
             'total_bd_antes': 0,
-            'total_bd_despues': 0
+            'total_bd_despues': 0,
+            'datos_incorrectos': 0
         }
+        # Detalle de cambios aplicados: (FAMID, NIF, nombre, {campo: (antes, después)})
+        self.changeset = []
         
-        # Cargar variables de entorno desde la ruta especificada
-        if os.path.exists(env_path):
-            load_dotenv(env_path)
-        
+        self.env_path = env_path
+        self.pool = None
         self.conectar_bd()
     
     def conectar_bd(self):
-        """Establece conexión con SQL Server."""
+        """
+        Establece conexión con SQL Server.
+        
+        La conexión se toma del pool compartido de models.model, que
+        reintenta la conexión si el servidor no responde a la primera.
+        """
         try:
-            conn_str = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={os.getenv('SQL_SERVER')};"
-                f"DATABASE={os.getenv('SQL_DATABASE')};"
-                f"UID={os.getenv('SQL_USER')};"
-                f"PWD={os.getenv('SQL_PASSWORD')};"
-            )
-            self.conn = pyodbc.connect(conn_str)
+            self.pool = get_pool(self.env_path)
+            self.conn = self.pool.acquire()
             print("✅ Conexión a la base de datos establecida correctamente")
         except pyodbc.Error as ex:
             print(f"❌ Error al conectar a la base de datos: {ex}")
@@ -70,83 +76,31 @@ class SincronizadorSocios:
         """
         Lee el archivo Excel y retorna una lista de diccionarios con los socios.
         
+        La lectura se hace en streaming (utils.excel_socios) y las columnas
+        se localizan por el nombre de la cabecera.
+        
         Returns:
             list: Lista de diccionarios con datos de socios
         """
         print(f"\n📂 Leyendo archivo Excel: {self.excel_path}")
         
         try:
-            wb = openpyxl.load_workbook(self.excel_path)
-            ws = wb['Hoja1']
-            
             socios_excel = []
             
-            # Leer desde la fila 2 (saltando encabezados)
-            for row in range(2, ws.max_row + 1):
-                # Obtener valores
-                codi = ws.cell(row, 1).value  # Codi
-                nombre = ws.cell(row, 2).value  # Nombre
-                nif = ws.cell(row, 3).value  # NIF
-                direccion = ws.cell(row, 4).value  # Dirección
-                cp = ws.cell(row, 5).value  # CP
-                poblacion = ws.cell(row, 7).value  # Población
-                telefono = ws.cell(row, 9).value  # Teléfono
-                movil = ws.cell(row, 10).value  # Móvil
-                email = ws.cell(row, 11).value  # Email
-                forma_pago = ws.cell(row, 12).value  # Forma de pagament
-                iban = ws.cell(row, 13).value  # IBAN
-                bic = ws.cell(row, 14).value  # BIC
-                fecha_alta = ws.cell(row, 15).value  # Fecha Alta
+            for socio in leer_socios_excel(self.excel_path, obligatorias=('FAMID', 'FAMNom')):
+                socio.pop('_fila')
                 
                 # Validar que al menos tenga código
-                if not codi:
+                if not socio['FAMID']:
                     continue
                 
-                # Convertir Codi a string
-                codi = str(codi).strip()
-                
-                # Determinar si el pago está domiciliado
-                pago_domiciliado = False
-                if forma_pago and isinstance(forma_pago, str):
-                    pago_domiciliado = 'domiciliat' in forma_pago.lower() or '3' in forma_pago
-                
-                # Convertir fecha de Excel a datetime si es numérico
-                fecha_alta_dt = None
-                if fecha_alta:
-                    if isinstance(fecha_alta, (int, float)):
-                        # Excel guarda fechas como números (días desde 1900-01-01)
-                        try:
-                            from datetime import timedelta
-                            fecha_alta_dt = datetime(1899, 12, 30) + timedelta(days=int(fecha_alta))
-                        except:
-                            fecha_alta_dt = None
-                    elif isinstance(fecha_alta, datetime):
-                        fecha_alta_dt = fecha_alta
-                
-                # Convertir CP a string
-                cp_str = str(cp) if cp else ""
-                if cp_str and '.' in cp_str:
-                    cp_str = cp_str.split('.')[0]  # Quitar decimales si los hay
-                
-                socio = {
-                    'FAMID': codi,
-                    'FAMNom': str(nombre).strip() if nombre else "",
-                    'FAMNIF': str(nif).strip() if nif else "",
-                    'FAMAdressa': str(direccion).strip() if direccion else "",
-                    'FAMPoblacio': str(poblacion).strip() if poblacion else "",
-                    'FAMCodPos': cp_str.strip(),
-                    'FAMTelefon': str(telefono).strip() if telefono else "",
-                    'FAMMobil': str(movil).strip() if movil else "",
-                    'FAMEmail': str(email).strip() if email else "",
-                    'FAMIBAN': str(iban).strip() if iban else "",
-                    'FAMBIC': str(bic).strip() if bic else "",
-                    'FAMDataAlta': fecha_alta_dt,
-                    'FAMbPagamentDomiciliat': pago_domiciliado,
-                    'bBaixa': False  # Los del Excel están activos
-                }
-                
                 socios_excel.append(socio)
             
+            # Validar IBAN, BIC y letra del NIF de todas las filas de una vez
+            incidencias = validar_socios_excel(socios_excel)
+            self.stats['datos_incorrectos'] = len(incidencias)
+            imprimir_incidencias(incidencias)
+            
             self.stats['total_excel'] = len(socios_excel)
             print(f"✅ Se leyeron {len(socios_excel)} socios del Excel")
             
@@ -158,14 +112,21 @@ class SincronizadorSocios:
     
     def obtener_socios_bd(self):
         """
-        Obtiene todos los IDs de socios de la base de datos.
+        Obtiene todos los socios de la base de datos indexados por FAMID.
+        
+        Cada socio incluye los campos sincronizados y su huella ('HASH')
+        para saber sin más consultas si existe y si el Excel trae cambios.
         
         Returns:
-            set: Conjunto con los IDs de socios en la BD
+            dict: Diccionario {FAMID: {datos del socio}}
         """
         cursor = self.conn.cursor()
-        cursor.execute("SELECT FAMID FROM scazorla_sa.G_Socis")
-        socios_bd = set(row[0] for row in cursor.fetchall())
+        cursor.execute(f"SELECT FAMID, {', '.join(CAMPOS_SYNC)} FROM scazorla_sa.G_Socis")
+        socios_bd = {}
+        for row in cursor.fetchall():
+            socio_bd = dict(zip(['FAMID'] + CAMPOS_SYNC, row))
+            socio_bd['HASH'] = huella(socio_bd)
+            socios_bd[str(socio_bd['FAMID']).strip()] = socio_bd
         self.stats['total_bd_antes'] = len(socios_bd)
         print(f"📊 Total de socios en BD antes de sincronizar: {len(socios_bd)}")
         return socios_bd
@@ -234,49 +195,28 @@ class SincronizadorSocios:
             self.stats['errores'] += 1
             return False
     
-    def actualizar_socio(self, socio):
-        """Actualiza un socio existente en la base de datos."""
+    def actualizar_socio(self, socio, socio_bd):
+        """
+        Actualiza un socio existente en la base de datos.
+        
+        Solo se escriben los campos que difieren de la fila actual; si la
+        huella coincide no se lanza ningún UPDATE.
+        """
         try:
-            cursor = self.conn.cursor()
+            cambios = calcular_cambios(socio, socio_bd)
+            if not cambios:
+                self.stats['sin_cambios'] += 1
+                return True
             
-            query = """
-            UPDATE scazorla_sa.G_Socis SET
-                FAMNom = ?,
-                FAMAdressa = ?,
-                FAMPoblacio = ?,
-                FAMCodPos = ?,
-                FAMTelefon = ?,
-                FAMMobil = ?,
-                FAMEmail = ?,
-                FAMDataAlta = ?,
-                FAMIBAN = ?,
-                FAMBIC = ?,
-                FAMNIF = ?,
-                bBaixa = 0,
-                FAMDataBaixa = NULL,
-                FAMbPagamentDomiciliat = ?
-            WHERE FAMID = ?
-            """
-            
-            cursor.execute(query, (
-                socio['FAMNom'],
-                socio['FAMAdressa'],
-                socio['FAMPoblacio'],
-                socio['FAMCodPos'],
-                socio['FAMTelefon'],
-                socio['FAMMobil'],
-                socio['FAMEmail'],
-                socio['FAMDataAlta'],
-                socio['FAMIBAN'],
-                socio['FAMBIC'],
-                socio['FAMNIF'],
-                socio['FAMbPagamentDomiciliat'],
-                socio['FAMID']
-            ))
+            query, params = sentencia_update(cambios, socio['FAMID'])
             
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
             self.conn.commit()
+            
             self.stats['actualizados'] += 1
-            print(f"  🔄 Socio actualizado: {socio['FAMID']} - {socio['FAMNom']}")
+            self.changeset.append((socio['FAMID'], socio['FAMNIF'], socio['FAMNom'], cambios))
+            print(f"  🔄 Socio actualizado: {socio['FAMID']} - {socio['FAMNom']} [{', '.join(cambios)}]")
             return True
             
         except Exception as e:
@@ -349,8 +289,8 @@ class SincronizadorSocios:
         # 4. Insertar o actualizar socios del Excel
         print(f"\n🔄 Procesando {len(socios_excel)} socios del Excel...")
         for socio in socios_excel:
-            if self.socio_existe(socio['FAMID']):
-                self.actualizar_socio(socio)
+            if socio['FAMID'] in socios_bd:
+                self.actualizar_socio(socio, socios_bd[socio['FAMID']])
             else:
                 self.insertar_socio(socio)
         
@@ -373,11 +313,24 @@ class SincronizadorSocios:
         print(f"📂 Socios en Excel:                    {self.stats['total_excel']}")
         print(f"💾 Socios en BD (antes):               {self.stats['total_bd_antes']}")
         print(f"💾 Socios en BD (después):             {self.stats['total_bd_despues']}")
-        print(f"-"*70)
+        print("-"*70)
         print(f"➕ Socios nuevos insertados:           {self.stats['nuevos']}")
         print(f"🔄 Socios actualizados:                {self.stats['actualizados']}")
+        print(f"- Socios sin cambios:                  {self.stats['sin_cambios']}")
         print(f"⚠️  Socios marcados como baja:         {self.stats['marcados_baja']}")
+        if self.stats['datos_incorrectos'] > 0:
+            print(f"⚠️  IBAN/BIC/NIF incorrectos:          {self.stats['datos_incorrectos']}")
         print(f"❌ Errores:                            {self.stats['errores']}")
+        
+        # Detalle por campo de los socios actualizados
+        por_campo = resumen_por_campo(self.changeset)
+        if por_campo:
+            print("-"*70)
+            print("🧾 Campos modificados:")
+            for campo, total in por_campo.items():
+                print(f"   • {campo:25s} {total}")
+            ruta_changeset = escribir_changeset(self.changeset)
+            print(f"📝 Detalle de cambios: {ruta_changeset}")
         print("="*70)
         
         if self.stats['errores'] == 0:
@@ -389,7 +342,9 @@ class SincronizadorSocios:
     def cerrar(self):
         """Cierra la conexión a la base de datos."""
         if self.conn:
-            self.conn.close()
+            self.pool.release(self.conn)
+            self.pool.close_all()
+            self.conn = None
             print("🔒 Conexión a la base de datos cerrada")
 
 
@@ -402,13 +357,13 @@ def main():
     # Verificar que el archivo Excel existe
     if not os.path.exists(EXCEL_PATH):
         print(f"❌ Error: No se encuentra el archivo {EXCEL_PATH}")
-        print(f"   Coloca el archivo Excel en la carpeta del proyecto")
+        print("   Coloca el archivo Excel en la carpeta del proyecto")
         sys.exit(1)
     
     # Verificar que el archivo .env existe
     if not os.path.exists(ENV_PATH):
         print(f"❌ Error: No se encuentra el archivo {ENV_PATH}")
-        print(f"   Crea el archivo .env con las credenciales de la base de datos")
+        print("   Crea el archivo .env con las credenciales de la base de datos")
         sys.exit(1)
     
     # Ejecutar sincronización
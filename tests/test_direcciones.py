@@ -0,0 +1,32 @@
+from utils.direcciones import misma_direccion, normalizar_direccion
+
+
+def _misma(a, b):
+    return misma_direccion(normalizar_direccion(a), normalizar_direccion(b))
+
+
+def test_misma_direccion_escrita_de_otra_forma():
+    assert _misma("C/ Major 25", "Carrer Major, 25")
+    assert _misma("Carrer Major 25 pis 2", "Carrer Major 25 2")
+
+
+def test_erratas_en_el_nombre_son_la_misma_direccion():
+    assert _misma("Carrasco i Gormiguera 36 2n 1a", "Carrasco i Formiguera 36 2n 1a")
+    assert _misma("Montpeitá 34", "Montpaita 34")
+
+
+def test_calle_con_nombre_mas_largo_no_es_la_misma_direccion():
+    assert not _misma("Carrer Sant Joan 5", "Carrer Sant Joan de Deu 5")
+    assert not _misma("Sants 20", "Sant Pau 20")
+
+
+def test_calles_con_nombre_parecido_no_son_la_misma_direccion():
+    assert not _misma("Carrer Rosa 5", "Carrer Rosal 5")
+    assert not _misma("Carrer Balmes 10", "Carrer Palmes 10")
+    assert not _misma("Sants 20", "Santa 20")
+    assert not _misma("C/ Roses 3", "C/ Rosas 3")
+
+
+def test_pis_forma_parte_del_nombre_antes_del_numero():
+    assert normalizar_direccion("Carrer Pis 3") == "carrer pis 3"
+    assert not _misma("Carrer Pis 3", "Carrer 3")
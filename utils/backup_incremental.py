@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backups Incrementales de G_Socis
+================================
+Copias de seguridad comprimidas que solo guardan lo que ha cambiado.
+
+- Lee la tabla en bloques (fetchmany), sin cargarla entera en memoria
+- Cada fila se resume en una huella (hash) y se compara por FAMID con el
+  estado de la copia anterior
+- Guarda en JSON Lines comprimido (gzip) solo las altas, cambios y bajas;
+  cada cierto número de copias incrementales se hace una completa
+- El índice (indice.json) encadena cada copia con su base, de modo que
+  cualquier copia se puede reconstruir entera cuando haga falta
+
+Formato de cada fichero .jsonl.gz:
+    1ª línea: {"id", "tipo", "base", "fecha", "columnas", "tipos"}
+    resto:    {"op": "+", "fila": [...]}   alta (o fila de copia completa)
+              {"op": "~", "fila": [...]}   cambio (fila completa)
+              {"op": "-", "FAMID": "..."}  baja
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import csv
+import gzip
+import json
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal
+
+TABLA_SOCIOS = "scazorla_sa.G_Socis"
+FICHERO_INDICE = "indice.json"
+FICHERO_ESTADO = "estado.json.gz"
+
+# Filas por viaje al servidor
+TAMANO_BLOQUE = 500
+# Copias incrementales seguidas antes de forzar una completa
+MAX_INCREMENTALES = int(os.getenv('BACKUP_MAX_INCREMENTALES', 30))
+
+
+# ============================================================================
+# CODIFICACIÓN DE VALORES
+# ============================================================================
+
+def codificar_valor(valor):
+    """Convierte un valor de la BD a un tipo que admite JSON."""
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=' ')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.hex()
+    return valor
+
+
+def decodificar_valor(valor, tipo):
+    """
+    Recupera el tipo original de un valor guardado en JSON.
+
+    Args:
+        valor: Valor leído del JSON
+        tipo (str): Nombre del tipo de la columna (de cursor.description)
+    """
+    if valor is None:
+        return None
+    if tipo == 'datetime':
+        return datetime.fromisoformat(valor)
+    if tipo == 'date':
+        return date.fromisoformat(valor)
+    if tipo == 'Decimal':
+        return Decimal(valor)
+    if tipo in ('bytes', 'bytearray'):
+        return bytes.fromhex(valor)
+    return valor
+
+
+def huella_fila(fila_codificada):
+    """Huella de una fila ya codificada (independiente del tipo de la BD)."""
+    datos = json.dumps(fila_codificada, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(datos.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# ÍNDICE Y ESTADO
+# ============================================================================
+
+def leer_indice(backup_dir="backups"):
+    """Devuelve la lista de copias registradas (más antigua primero)."""
+    ruta = os.path.join(backup_dir, FICHERO_INDICE)
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _guardar_indice(backup_dir, indice):
+    ruta = os.path.join(backup_dir, FICHERO_INDICE)
+    temporal = ruta + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+
+def _leer_estado(backup_dir):
+    """Estado de la última copia: {'id', 'columnas', 'huellas': {FAMID: hash}}."""
+    ruta = os.path.join(backup_dir, FICHERO_ESTADO)
+    if not os.path.exists(ruta):
+        return None
+    with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _guardar_estado(backup_dir, estado):
+    ruta = os.path.join(backup_dir, FICHERO_ESTADO)
+    temporal = ruta + ".tmp"
+    with gzip.open(temporal, 'wt', encoding='utf-8') as f:
+        json.dump(estado, f, separators=(',', ':'))
+    os.replace(temporal, ruta)
+
+
+def buscar_copia(backup_dir, id_copia=None):
+    """
+    Busca una copia en el índice.
+
+    Args:
+        id_copia (str): Identificador (fecha_hora) o None para la última
+
+    Raises:
+        KeyError: Si la copia no existe
+    """
+    indice = leer_indice(backup_dir)
+    if not indice:
+        raise KeyError("No hay copias de seguridad registradas")
+    if id_copia is None:
+        return indice[-1]
+    for entrada in indice:
+        if entrada['id'] == id_copia:
+            return entrada
+    raise KeyError(f"No existe la copia '{id_copia}'")
+
+
+# ============================================================================
+# CREAR COPIA
+# ============================================================================
+
+def crear_copia(conn, backup_dir="backups", completa=False):
+    """
+    Crea una copia de G_Socis (incremental si es posible).
+
+    Args:
+        conn: Conexión pyodbc
+        backup_dir (str): Carpeta de las copias
+        completa (bool): Forzar una copia completa
+
+    Returns:
+        dict: Entrada del índice de la copia creada
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    indice = leer_indice(backup_dir)
+    estado = _leer_estado(backup_dir)
+
+    ahora = datetime.now()
+    id_copia = ahora.strftime("%Y%m%d_%H%M%S")
+    if indice and indice[-1]['id'] == id_copia:
+        id_copia = ahora.strftime("%Y%m%d_%H%M%S_%f")
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT TOP 0 * FROM {TABLA_SOCIOS}")
+    # Las columnas binarias (ROWVERSION) las genera el servidor: no se copian,
+    # así añadirlas (migracion_rowversion.py) no cambia las copias
+    descripcion = [c for c in cursor.description if c[1] not in (bytes, bytearray)]
+    cursor.fetchall()
+    columnas = [c[0] for c in descripcion]
+    tipos = [c[1].__name__ if isinstance(c[1], type) else str(c[1]) for c in descripcion]
+    cursor.execute(f"SELECT {', '.join(f'[{c}]' for c in columnas)} FROM {TABLA_SOCIOS}")
+    pos_famid = columnas.index('FAMID')
+
+    # Copia completa si no hay base válida o la cadena es demasiado larga
+    incrementales = 0
+    for entrada in reversed(indice):
+        if entrada['tipo'] == 'completa':
+            break
+        incrementales += 1
+    base_valida = (
+        estado is not None and indice and estado.get('id') == indice[-1]['id']
+        and estado.get('columnas') == columnas
+    )
+    if completa or not base_valida or incrementales >= MAX_INCREMENTALES:
+        tipo, base, huellas_base = 'completa', None, {}
+    else:
+        tipo, base, huellas_base = 'incremental', indice[-1]['id'], estado['huellas']
+
+    fichero = f"backup_socios_{id_copia}.jsonl.gz"
+    ruta = os.path.join(backup_dir, fichero)
+    temporal = ruta + ".tmp"
+    huellas = {}
+    cuenta = {'filas': 0, 'altas': 0, 'cambios': 0, 'bajas': 0}
+
+    with gzip.open(temporal, 'wt', encoding='utf-8') as f:
+        cabecera = {
+            'id': id_copia, 'tipo': tipo, 'base': base,
+            'fecha': ahora.isoformat(timespec='seconds'),
+            'columnas': columnas, 'tipos': tipos,
+        }
+        f.write(json.dumps(cabecera, ensure_ascii=False) + "\n")
+
+        while True:
+            filas = cursor.fetchmany(TAMANO_BLOQUE)
+            if not filas:
+                break
+            for fila in filas:
+                valores = [codificar_valor(v) for v in fila]
+                famid = str(valores[pos_famid]).strip()
+                h = huella_fila(valores)
+                huellas[famid] = h
+                cuenta['filas'] += 1
+
+                anterior = huellas_base.get(famid)
+                if anterior == h:
+                    continue
+                op = '+' if anterior is None else '~'
+                cuenta['altas' if op == '+' else 'cambios'] += 1
+                f.write(json.dumps({'op': op, 'fila': valores}, ensure_ascii=False) + "\n")
+
+        for famid in huellas_base.keys() - huellas.keys():
+            cuenta['bajas'] += 1
+            f.write(json.dumps({'op': '-', 'FAMID': famid}, ensure_ascii=False) + "\n")
+
+    os.replace(temporal, ruta)
+
+    entrada = {
+        'id': id_copia,
+        'fichero': fichero,
+        'tipo': tipo,
+        'base': base,
+        'fecha': cabecera['fecha'],
+        'bytes': os.path.getsize(ruta),
+        **cuenta,
+    }
+    indice.append(entrada)
+    _guardar_indice(backup_dir, indice)
+    _guardar_estado(backup_dir, {'id': id_copia, 'columnas': columnas, 'huellas': huellas})
+    return entrada
+
+
+# ============================================================================
+# RECONSTRUIR COPIA
+# ============================================================================
+
+def reconstruir(backup_dir="backups", id_copia=None):
+    """
+    Reconstruye el contenido completo de G_Socis en una copia.
+
+    Aplica en orden la copia completa de la que parte y todas las
+    incrementales hasta la pedida.
+
+    Args:
+        backup_dir (str): Carpeta de las copias
+        id_copia (str): Copia a reconstruir (None = la última)
+
+    Returns:
+        tuple: (columnas, tipos, {FAMID: fila}) con los valores ya decodificados
+    """
+    por_id = {e['id']: e for e in leer_indice(backup_dir)}
+    cadena = [buscar_copia(backup_dir, id_copia)]
+    while cadena[-1]['base'] is not None:
+        cadena.append(por_id[cadena[-1]['base']])
+    cadena.reverse()
+
+    filas = {}
+    columnas, tipos = None, None
+    for entrada in cadena:
+        with gzip.open(os.path.join(backup_dir, entrada['fichero']), 'rt', encoding='utf-8') as f:
+            cabecera = json.loads(f.readline())
+            columnas, tipos = cabecera['columnas'], cabecera['tipos']
+            pos_famid = columnas.index('FAMID')
+            for linea in f:
+                registro = json.loads(linea)
+                if registro['op'] == '-':
+                    filas.pop(registro['FAMID'], None)
+                else:
+                    fila = registro['fila']
+                    filas[str(fila[pos_famid]).strip()] = fila
+
+    decodificadas = {
+        famid: [decodificar_valor(v, t) for v, t in zip(fila, tipos)]
+        for famid, fila in filas.items()
+    }
+    return columnas, tipos, decodificadas
+
+
+def exportar_csv(backup_dir, id_copia, ruta_csv):
+    """
+    Escribe una copia reconstruida en CSV (mismo formato que los backups antiguos).
+
+    Returns:
+        int: Número de socios escritos
+    """
+    columnas, _, filas = reconstruir(backup_dir, id_copia)
+    with open(ruta_csv, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(columnas)
+        for famid in sorted(filas):
+            writer.writerow(filas[famid])
+    return len(filas)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección de Cambios entre Excel y G_Socis
+==========================================
+Compara el registro normalizado del Excel con la fila actual de la BD
+para que la sincronización solo escriba los socios (y los campos) que
+realmente han cambiado.
+
+Cada registro se resume en una huella (hash) de sus campos sincronizados;
+si las huellas coinciden el socio se da por "sin cambios" sin comparar
+campo a campo.
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import csv
+import hashlib
+from datetime import date, datetime
+
+# Campos que la sincronización desde Excel mantiene en G_Socis
+CAMPOS_SYNC = [
+    'FAMNom',
+    'FAMAdressa',
+    'FAMPoblacio',
+    'FAMCodPos',
+    'FAMTelefon',
+    'FAMMobil',
+    'FAMEmail',
+    'FAMDataAlta',
+    'FAMIBAN',
+    'FAMBIC',
+    'FAMNIF',
+    'FAMbPagamentDomiciliat',
+    'bBaixa',
+]
+
+CAMPOS_BOOL = {'FAMbPagamentDomiciliat', 'bBaixa'}
+
+
+def normalizar_valor(campo, valor):
+    """
+    Normaliza un valor para poder compararlo entre Excel y BD.
+
+    - None y cadenas vacías son equivalentes
+    - Se ignoran los espacios de relleno de los campos CHAR
+    - Las fechas se comparan solo por día
+    - Los booleanos se comparan como 0/1
+
+    Returns:
+        str: Valor normalizado
+    """
+    if campo in CAMPOS_BOOL:
+        return '1' if valor else '0'
+    if valor is None:
+        return ''
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime('%Y-%m-%d')
+    return str(valor).strip()
+
+
+def huella(registro):
+    """
+    Calcula la huella de contenido de un socio sobre CAMPOS_SYNC.
+
+    Args:
+        registro (dict): Socio del Excel o fila de la BD
+
+    Returns:
+        str: Hash SHA-1 en hexadecimal
+    """
+    partes = [normalizar_valor(c, registro.get(c)) for c in CAMPOS_SYNC]
+    return hashlib.sha1('\x1f'.join(partes).encode('utf-8')).hexdigest()
+
+
+def calcular_cambios(socio_excel, socio_bd):
+    """
+    Devuelve los campos que difieren entre el Excel y la BD.
+
+    Args:
+        socio_excel (dict): Registro normalizado leído del Excel
+        socio_bd (dict): Fila actual de G_Socis (debe incluir 'HASH')
+
+    Returns:
+        dict: {campo: (valor_bd, valor_excel)}; vacío si no hay cambios
+    """
+    if socio_bd.get('HASH') == huella(socio_excel):
+        return {}
+
+    cambios = {}
+    for campo in CAMPOS_SYNC:
+        antes = socio_bd.get(campo)
+        despues = socio_excel.get(campo)
+        if normalizar_valor(campo, antes) != normalizar_valor(campo, despues):
+            cambios[campo] = (antes, despues)
+    return cambios
+
+
+def sentencia_update(cambios, famid):
+    """
+    Construye un UPDATE que solo escribe los campos modificados.
+
+    Al reactivar un socio (bBaixa pasa a 0) también se borra FAMDataBaixa.
+
+    Args:
+        cambios (dict): Resultado de calcular_cambios()
+        famid: FAMID del socio en BD
+
+    Returns:
+        tuple: (query, params)
+    """
+    asignaciones = []
+    params = []
+    for campo, (_, despues) in cambios.items():
+        asignaciones.append(f"{campo} = ?")
+        params.append(despues)
+
+    if 'bBaixa' in cambios and not cambios['bBaixa'][1]:
+        asignaciones.append("FAMDataBaixa = NULL")
+
+    query = f"UPDATE scazorla_sa.G_Socis SET {', '.join(asignaciones)} WHERE FAMID = ?"
+    params.append(famid)
+    return query, tuple(params)
+
+
+def escribir_changeset(changeset, directorio="backups", prefijo="cambios_socios"):
+    """
+    Guarda el detalle campo a campo de los cambios aplicados.
+
+    Args:
+        changeset (list): Tuplas (FAMID, NIF, nombre, cambios)
+        directorio (str): Carpeta de salida
+        prefijo (str): Inicio del nombre del fichero
+
+    Returns:
+        str: Ruta del CSV generado, o None si no había cambios
+    """
+    if not changeset:
+        return None
+
+    os.makedirs(directorio, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ruta = os.path.join(directorio, f"{prefijo}_{timestamp}.csv")
+
+    with open(ruta, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['FAMID', 'NIF', 'Nombre', 'Campo', 'Antes', 'Despues'])
+        for famid, nif, nombre, cambios in changeset:
+            for campo, (antes, despues) in cambios.items():
+                writer.writerow([
+                    str(famid).strip(), nif, nombre, campo,
+                    normalizar_valor(campo, antes),
+                    normalizar_valor(campo, despues)
+                ])
+
+    return ruta
+
+
+def resumen_por_campo(changeset):
+    """
+    Cuenta cuántos socios han cambiado en cada campo.
+
+    Returns:
+        dict: {campo: número de socios}, en el orden de CAMPOS_SYNC
+    """
+    conteo = {}
+    for _, _, _, cambios in changeset:
+        for campo in cambios:
+            conteo[campo] = conteo.get(campo, 0) + 1
+    return {c: conteo[c] for c in CAMPOS_SYNC if c in conteo}
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalización y Deduplicación de Direcciones
+============================================
+Detecta socios que viven en la misma dirección aunque esté escrita de
+forma distinta ("C/ Major 25" y "Carrer Major, 25"), para enviar una sola
+etiqueta por domicilio.
+
+- Normaliza: minúsculas, sin acentos ni puntuación, abreviaturas de vía
+  expandidas ("c/", "avda", "pg"...), ordinales de piso y puerta ("1r",
+  "2ª") reducidos al número y código postal con ceros a la izquierda
+- Agrupa por bloques (código postal o población + números y pisos de la
+  dirección) y solo compara entre sí las direcciones de un mismo bloque,
+  así el coste sigue siendo lineal con el número de socios
+- Dentro del bloque compara el nombre de la calle palabra a palabra y
+  admite como mucho una letra cambiada, sobrante o que falta en palabras
+  largas, para absorber erratas ("Gormiguera" / "Formiguera"); las
+  palabras cortas ("Rosa" / "Rosal", "Sants" / "Santa") deben coincidir y
+  nombres con distinto número de palabras ("Sant Joan" / "Sant Joan de
+  Déu") nunca se confunden
+
+Dos direcciones con números o letras distintos (portal, piso o puerta)
+nunca se consideran la misma.
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import re
+import unicodedata
+
+# Longitud mínima de una palabra del nombre de calle para admitirle una errata
+LONGITUD_MINIMA_ERRATA = 7
+
+# Tipos de vía y otras palabras -> forma canónica
+ABREVIATURAS = {
+    'c': 'carrer', 'cl': 'carrer', 'cr': 'carrer', 'crer': 'carrer',
+    'calle': 'carrer', 'carrer': 'carrer',
+    'av': 'avinguda', 'avd': 'avinguda', 'avda': 'avinguda', 'avgda': 'avinguda',
+    'avinguda': 'avinguda', 'avenida': 'avinguda',
+    'pl': 'placa', 'pza': 'placa', 'plz': 'placa', 'placa': 'placa', 'plaza': 'placa',
+    'pg': 'passeig', 'ps': 'passeig', 'pso': 'passeig', 'passeig': 'passeig', 'paseo': 'passeig',
+    'ctra': 'carretera', 'crta': 'carretera', 'carretera': 'carretera',
+    'rbla': 'rambla', 'rambla': 'rambla',
+    'rda': 'ronda', 'ronda': 'ronda',
+    'trav': 'travessera', 'travessera': 'travessera', 'travesia': 'travessera',
+    'ptge': 'passatge', 'pje': 'passatge', 'passatge': 'passatge', 'pasaje': 'passatge',
+    'cami': 'cami', 'camino': 'cami',
+    'urb': 'urbanitzacio', 'urbanitzacio': 'urbanitzacio', 'urbanizacion': 'urbanitzacio',
+    'bj': 'baixos', 'bjs': 'baixos', 'bxs': 'baixos', 'baixos': 'baixos', 'bajos': 'baixos',
+    'pral': 'principal', 'principal': 'principal',
+    'ent': 'entresol', 'entl': 'entresol', 'entresol': 'entresol', 'entresuelo': 'entresol',
+    'at': 'atic', 'atic': 'atic', 'atico': 'atic',
+    'esc': 'escala', 'escala': 'escala', 'escalera': 'escala',
+}
+
+# Formas canónicas que indican el tipo de vía
+TIPOS_VIA = {
+    'carrer', 'avinguda', 'placa', 'passeig', 'carretera', 'rambla', 'ronda',
+    'travessera', 'passatge', 'cami', 'urbanitzacio',
+}
+# Formas canónicas que indican el piso o la escalera
+PISOS = {'baixos', 'principal', 'entresol', 'atic', 'escala'}
+
+# Palabras que no distinguen una dirección de otra
+PALABRAS_VACIAS = {
+    'de', 'del', 'dels', 'd', 'la', 'les', 'el', 'els', 'l', 'los', 'las', 'i', 'y',
+    'n', 'no', 'num', 'numero', 's', 'sn',
+}
+# Palabras que solo se ignoran detrás del número ("25 pis 2" pero no "Carrer Pis")
+PALABRAS_PISO = {'pis', 'piso', 'planta', 'porta', 'puerta', 'pta'}
+
+# Número seguido de marca de ordinal: 1r, 2n, 3er, 4t, 1a, 2o...
+_RE_ORDINAL = re.compile(r'^(\d+)(r|n|er|t|o|a|ra|na|ta)$')
+_RE_NO_ALFANUM = re.compile(r'[^a-z0-9]+')
+
+
+def _sin_acentos(texto):
+    """Minúsculas y sin acentos (º y ª pasan a 'o' y 'a')."""
+    descompuesto = unicodedata.normalize('NFKD', str(texto).lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def normalizar_direccion(direccion):
+    """
+    Forma canónica de una dirección.
+
+    Returns:
+        str: Palabras normalizadas separadas por espacios ('' si está vacía)
+    """
+    if not direccion:
+        return ''
+    palabras = []
+    numero_visto = False
+    for palabra in _RE_NO_ALFANUM.split(_sin_acentos(direccion)):
+        if not palabra:
+            continue
+        m = _RE_ORDINAL.match(palabra)
+        if m:
+            palabra = m.group(1)
+        if len(palabra) > 1 or not palabras:
+            # Una letra suelta tras la calle es la del portal o la puerta, no "c/"
+            palabra = ABREVIATURAS.get(palabra, palabra)
+        if palabra.isdigit():
+            palabra = str(int(palabra))  # "025" -> "25"
+            numero_visto = True
+        elif palabra in PALABRAS_VACIAS or (numero_visto and palabra in PALABRAS_PISO):
+            continue
+        palabras.append(palabra)
+    return ' '.join(palabras)
+
+
+def normalizar_cp(codigo_postal):
+    """Código postal de 5 cifras ('8001' -> '08001'); '' si no hay cifras."""
+    cifras = re.sub(r'\D', '', str(codigo_postal or ''))
+    return cifras.zfill(5) if cifras else ''
+
+
+def normalizar_poblacion(poblacion):
+    """Población sin acentos, puntuación ni espacios de más."""
+    return ' '.join(p for p in _RE_NO_ALFANUM.split(_sin_acentos(poblacion or '')) if p)
+
+
+def _partes(direccion):
+    """Separa una dirección normalizada en (tipo de vía, palabras del nombre, números, letras y pisos)."""
+    tipo, nombre, resto = '', [], []
+    for palabra in direccion.split():
+        if palabra in TIPOS_VIA and not tipo and not nombre:
+            tipo = palabra
+        elif any(c.isdigit() for c in palabra) or len(palabra) == 1 or palabra in PISOS:
+            resto.append(palabra)
+        else:
+            nombre.append(palabra)
+    return tipo, tuple(nombre), tuple(resto)
+
+
+def clave_bloque(direccion, codigo_postal, poblacion):
+    """
+    Clave del bloque en el que se compara una dirección ya normalizada.
+
+    Solo pueden coincidir direcciones del mismo código postal (o población,
+    si falta) y con exactamente los mismos números, letras de portal y pisos.
+    """
+    return (codigo_postal or poblacion, _partes(direccion)[2])
+
+
+def _una_errata(a, b):
+    """True si b es a con una letra cambiada, sobrante o que falta."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    # Se salta el prefijo y el sufijo comunes; debe quedar como mucho una letra
+    inicio = 0
+    while inicio < len(a) and a[inicio] == b[inicio]:
+        inicio += 1
+    fin_a, fin_b = len(a), len(b)
+    while fin_a > inicio and a[fin_a - 1] == b[fin_b - 1]:
+        fin_a -= 1
+        fin_b -= 1
+    return fin_a - inicio <= 1 and fin_b - inicio <= 1
+
+
+def _misma_palabra(a, b):
+    if a == b:
+        return True
+    return min(len(a), len(b)) >= LONGITUD_MINIMA_ERRATA and _una_errata(a, b)
+
+
+def misma_direccion(a, b):
+    """
+    Compara dos direcciones normalizadas del mismo bloque.
+
+    El tipo de vía debe coincidir si consta en las dos; el nombre de la
+    calle debe tener las mismas palabras, en el mismo orden, salvo una
+    errata en las palabras largas.
+    """
+    if a == b:
+        return True
+    tipo_a, nombre_a, _ = _partes(a)
+    tipo_b, nombre_b, _ = _partes(b)
+    if tipo_a and tipo_b and tipo_a != tipo_b:
+        return False
+    if len(nombre_a) != len(nombre_b):
+        return False
+    return all(_misma_palabra(pa, pb) for pa, pb in zip(nombre_a, nombre_b))
+
+
+def direcciones_unicas(socios):
+    """
+    Devuelve, a medida que los recorre, un socio por domicilio.
+
+    Se queda con el primero de cada dirección; los socios sin dirección
+    ni código postal ni población no se agrupan con nadie.
+
+    Args:
+        socios: Socios (iterable; no hace falta tenerlos todos en memoria)
+
+    Yields:
+        Socio: Socios con dirección no vista hasta el momento
+    """
+    bloques = {}
+    for socio in socios:
+        direccion = normalizar_direccion(socio.FAMAdressa)
+        cp = normalizar_cp(socio.FAMCodPos)
+        poblacion = normalizar_poblacion(socio.FAMPoblacio)
+        if not (direccion or cp or poblacion):
+            yield socio
+            continue
+
+        vistas = bloques.setdefault(clave_bloque(direccion, cp, poblacion), [])
+        if any(misma_direccion(direccion, otra) for otra in vistas):
+            continue
+        vistas.append(direccion)
+        yield socio
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lector en Streaming del Excel de Socios
+=======================================
+Lectura compartida por los scripts de sincronización y diagnóstico.
+
+- Abre el libro en modo solo lectura (no carga la hoja entera en memoria)
+- Recorre las filas con iter_rows(values_only=True)
+- Localiza las columnas por el nombre de la cabecera, no por posición
+- Devuelve los socios ya normalizados como un generador
+- Valida IBAN, BIC y NIF de todas las filas leídas de una vez
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import unicodedata
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from utils.validacion import validar_socios, normalizar_iban, validar_iban, bic_desde_iban
+
+# Campo destino -> nombres de cabecera aceptados (normalizados, por prioridad)
+COLUMNAS_EXCEL = {
+    'FAMID': ('codi', 'codigo', 'id'),
+    'FAMNom': ('nombre', 'nom'),
+    'FAMNIF': ('nif', 'dni', 'nif/dni'),
+    'FAMAdressa': ('direccion', 'adreca'),
+    'FAMCodPos': ('cp', 'codpos', 'codi postal', 'codigo postal'),
+    'FAMPoblacio': ('poblacion', 'poblacio'),
+    'FAMTelefon': ('telefono', 'telefon'),
+    'FAMMobil': ('movil', 'mobil'),
+    'FAMEmail': ('email', 'correo', 'correu'),
+    'FormaPago': ('forma de pagament', 'forma de pago'),
+    'FAMIBAN': ('iban',),
+    'FAMBIC': ('bic',),
+    'FAMDataAlta': ('fecha alta', 'data alta'),
+}
+
+COLUMNAS_OBLIGATORIAS = ('FAMID', 'FAMNom', 'FAMNIF')
+
+
+def normalizar_cabecera(texto):
+    """Pasa una cabecera a minúsculas, sin acentos ni espacios sobrantes."""
+    if texto is None:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def mapear_cabeceras(cabecera, obligatorias=COLUMNAS_OBLIGATORIAS):
+    """
+    Construye el mapa campo -> índice de columna a partir de la cabecera.
+
+    Args:
+        cabecera (tuple): Valores de la primera fila
+        obligatorias (tuple): Campos que deben existir en la hoja
+
+    Returns:
+        dict: {campo: índice (base 0)}
+
+    Raises:
+        ValueError: Si falta alguna columna obligatoria
+    """
+    posiciones = {}
+    for i, valor in enumerate(cabecera):
+        nombre = normalizar_cabecera(valor)
+        if nombre and nombre not in posiciones:
+            posiciones[nombre] = i
+
+    mapa = {}
+    for campo, alias in COLUMNAS_EXCEL.items():
+        for nombre in alias:
+            if nombre in posiciones:
+                mapa[campo] = posiciones[nombre]
+                break
+
+    faltan = [c for c in obligatorias if c not in mapa]
+    if faltan:
+        raise ValueError(f"Faltan columnas en el Excel: {', '.join(faltan)}")
+
+    return mapa
+
+
+def _texto(valor):
+    """Convierte una celda a texto sin espacios; vacío si no hay valor."""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _fecha(valor):
+    """Convierte una celda de fecha (datetime o número de serie Excel)."""
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, (int, float)):
+        try:
+            return datetime(1899, 12, 30) + timedelta(days=int(valor))
+        except (OverflowError, ValueError):
+            return None
+    return None
+
+
+def _pago_domiciliado(forma_pago):
+    """Determina si la forma de pago corresponde a domiciliación."""
+    if forma_pago and isinstance(forma_pago, str):
+        return 'domiciliat' in forma_pago.lower() or '3' in forma_pago
+    return False
+
+
+def normalizar_fila(valores, mapa):
+    """
+    Convierte una fila del Excel en un diccionario de socio.
+
+    Args:
+        valores (tuple): Valores de la fila
+        mapa (dict): Resultado de mapear_cabeceras()
+
+    Returns:
+        dict: Socio normalizado (claves con los nombres de G_Socis)
+    """
+    def celda(campo):
+        i = mapa.get(campo)
+        return valores[i] if i is not None and i < len(valores) else None
+
+    cp = _texto(celda('FAMCodPos'))
+    if '.' in cp:
+        cp = cp.split('.')[0]  # Quitar decimales si los hay
+
+    return {
+        'FAMID': _texto(celda('FAMID')),
+        'FAMNom': _texto(celda('FAMNom')),
+        'FAMNIF': _texto(celda('FAMNIF')),
+        'FAMAdressa': _texto(celda('FAMAdressa')),
+        'FAMPoblacio': _texto(celda('FAMPoblacio')),
+        'FAMCodPos': cp,
+        'FAMTelefon': _texto(celda('FAMTelefon')),
+        'FAMMobil': _texto(celda('FAMMobil')),
+        'FAMEmail': _texto(celda('FAMEmail')),
+        'FAMIBAN': _texto(celda('FAMIBAN')),
+        'FAMBIC': _texto(celda('FAMBIC')),
+        'FAMDataAlta': _fecha(celda('FAMDataAlta')),
+        'FAMbPagamentDomiciliat': _pago_domiciliado(celda('FormaPago')),
+        'bBaixa': False  # Los del Excel están activos
+    }
+
+
+def leer_socios_excel(excel_path, hoja='Hoja1', obligatorias=COLUMNAS_OBLIGATORIAS):
+    """
+    Recorre el Excel de socios fila a fila sin cargarlo entero.
+
+    Las filas completamente vacías se ignoran. Cada socio incluye la clave
+    '_fila' con el número de fila del Excel para los mensajes.
+
+    Args:
+        excel_path (str): Ruta al archivo Excel
+        hoja (str): Nombre de la hoja
+        obligatorias (tuple): Columnas que deben existir en la cabecera
+
+    Yields:
+        dict: Socio normalizado
+    """
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        filas = wb[hoja].iter_rows(values_only=True)
+        cabecera = next(filas, None)
+        if cabecera is None:
+            return
+
+        mapa = mapear_cabeceras(cabecera, obligatorias)
+
+        for num_fila, valores in enumerate(filas, start=2):
+            if not any(v not in (None, '') for v in valores):
+                continue
+            socio = normalizar_fila(valores, mapa)
+            socio['_fila'] = num_fila
+            yield socio
+    finally:
+        # En modo solo lectura el archivo queda abierto hasta cerrar el libro
+        wb.close()
+
+
+def validar_socios_excel(socios):
+    """
+    Revisa los datos bancarios y fiscales de los socios leídos del Excel.
+
+    Completa el BIC vacío a partir del IBAN (si es español y correcto) y
+    devuelve todas las incidencias juntas, para corregirlas de una vez en
+    el Excel en lugar de descubrirlas cuando el banco rechaza la remesa.
+
+    Args:
+        socios (list): Socios devueltos por leer_socios_excel()
+
+    Returns:
+        list: Incidencias (utils.validacion.Incidencia)
+    """
+    for socio in socios:
+        iban = normalizar_iban(socio.get('FAMIBAN'))
+        if iban and not socio.get('FAMBIC') and validar_iban(iban) is None:
+            socio['FAMBIC'] = bic_desde_iban(iban) or ''
+    return validar_socios(socios)
+
+
+def imprimir_incidencias(incidencias, max_lineas=50):
+    """Muestra las incidencias de validación agrupadas por campo."""
+    if not incidencias:
+        print("✅ IBAN, BIC y NIF correctos en todas las filas")
+        return
+
+    print(f"\n⚠️ {len(incidencias)} datos incorrectos en el Excel:")
+    for i in sorted(incidencias, key=lambda i: (i.campo, i.famid))[:max_lineas]:
+        print(f"  ⚠️ {i.campo} {i.famid} '{i.nombre}': '{i.valor}' - {i.motivo}")
+    if len(incidencias) > max_lineas:
+        print(f"  ... y {len(incidencias) - max_lineas} más")
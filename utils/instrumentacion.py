@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentación: Tiempos, Contadores y Log Estructurado
+=======================================================
+Mide dónde se va el tiempo de la aplicación (conexión, lectura de socios,
+carga de la tabla, PDF, SEPA...) sin depender de prints de depuración.
+
+- span("bd.consulta", filas=...) mide un bloque y lo acumula por nombre
+  (veces, total, máximo) y lo escribe en el log
+- contar("bd.filas", n) acumula contadores (consultas, filas, bytes)
+- configurar_log() envía el logging de la aplicación a un fichero JSON
+  Lines rotativo (y a la consola, en texto)
+- resumen() devuelve las cifras acumuladas para el panel de diagnóstico
+
+Todo es seguro entre hilos; sin configurar_log() los spans se siguen
+acumulando en memoria y el logging queda como esté configurado.
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+log = logging.getLogger(__name__)
+
+FICHERO_LOG = "cojub.log"
+# Tamaño de cada fichero de log y cuántos antiguos se conservan
+LOG_MAX_BYTES = int(os.getenv('COJUB_LOG_MB', 5)) * 1024 * 1024
+LOG_COPIAS = int(os.getenv('COJUB_LOG_COPIAS', 5))
+
+# Campos estándar de LogRecord que no se repiten en el JSON
+_CAMPOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def directorio_log():
+    """Carpeta del log (COJUB_LOG_DIR o la carpeta de datos del usuario)."""
+    directorio = os.getenv('COJUB_LOG_DIR')
+    if directorio:
+        return directorio
+    base = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'COJUB', 'logs')
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con los campos extra (span, ms, filas...)."""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'origen': record.name,
+            'hilo': record.threadName,
+            'msg': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _CAMPOS_RECORD:
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+def configurar_log(directorio=None, nivel=None):
+    """
+    Configura el logging de la aplicación.
+
+    Args:
+        directorio (str): Carpeta del log (por defecto, directorio_log())
+        nivel (str): Nivel mínimo (por defecto COJUB_LOG_NIVEL o INFO)
+
+    Returns:
+        str: Ruta del fichero de log
+    """
+    directorio = directorio or directorio_log()
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, FICHERO_LOG)
+    nivel = (nivel or os.getenv('COJUB_LOG_NIVEL', 'INFO')).upper()
+
+    raiz = logging.getLogger()
+    raiz.setLevel(nivel)
+    # Idempotente: se sustituyen los manejadores de una configuración anterior
+    for manejador in [h for h in raiz.handlers if getattr(h, '_cojub', False)]:
+        raiz.removeHandler(manejador)
+        manejador.close()
+
+    fichero = RotatingFileHandler(ruta, maxBytes=LOG_MAX_BYTES, backupCount=LOG_COPIAS, encoding='utf-8')
+    fichero.setFormatter(FormatoJSON())
+    consola = logging.StreamHandler()
+    consola.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"))
+    for manejador in (fichero, consola):
+        manejador._cojub = True
+        raiz.addHandler(manejador)
+
+    metricas.ruta_log = ruta
+    return ruta
+
+
+class Metricas:
+    """Acumulado de spans y contadores desde el arranque."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        self.ruta_log = None
+        self.spans = {}       # nombre -> {'veces', 'total_ms', 'max_ms', 'ultimo_ms'}
+        self.contadores = {}  # nombre -> valor
+
+    def registrar_span(self, nombre, ms):
+        with self._lock:
+            s = self.spans.setdefault(nombre, {'veces': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'ultimo_ms': 0.0})
+            s['veces'] += 1
+            s['total_ms'] += ms
+            s['max_ms'] = max(s['max_ms'], ms)
+            s['ultimo_ms'] = ms
+
+    def contar(self, nombre, n=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def resumen(self):
+        """Copia de las cifras: {'segons', 'spans', 'contadores', 'log'}."""
+        with self._lock:
+            return {
+                'segons': time.time() - self.inicio,
+                'spans': {nombre: dict(s) for nombre, s in self.spans.items()},
+                'contadores': dict(self.contadores),
+                'log': self.ruta_log,
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self.inicio = time.time()
+            self.spans.clear()
+            self.contadores.clear()
+
+
+metricas = Metricas()
+
+
+@contextmanager
+def span(nombre, nivel=logging.DEBUG, **campos):
+    """
+    Mide el bloque, lo acumula en metricas y lo escribe en el log.
+
+    El bloque puede añadir datos al registro a través del diccionario que
+    devuelve (p. ej. datos['filas'] = len(filas)). Si el bloque falla, el
+    tiempo se registra igualmente, con el error.
+
+    Args:
+        nombre (str): Nombre del span ('bd.consulta', 'informe.general'...)
+        nivel: Nivel de logging del registro
+        **campos: Datos fijos del registro
+    """
+    datos = dict(campos)
+    inicio = time.perf_counter()
+    try:
+        yield datos
+    except Exception as e:
+        datos['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        ms = (time.perf_counter() - inicio) * 1000
+        metricas.registrar_span(nombre, ms)
+        if log.isEnabledFor(nivel):
+            log.log(nivel, "%s %.1f ms", nombre, ms, extra={'span': nombre, 'ms': round(ms, 2), **datos})
+
+
+def contar(nombre, n=1):
+    """Suma n al contador nombre ('bd.consultas', 'bd.filas', 'informes.bytes'...)."""
+    metricas.contar(nombre, n)
+
+
+def contar_fichero(nombre, ruta):
+    """Suma al contador nombre el tamaño del fichero escrito (si existe)."""
+    try:
+        tamano = os.path.getsize(ruta)
+    except OSError:
+        return 0
+    metricas.contar(nombre, tamano)
+    return tamano
+
+
+def resumen():
+    """Cifras acumuladas desde el arranque (para el panel de diagnóstico)."""
+    return metricas.resumen()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estilos Compartidos de los PDF
+==============================
+Registro único de estilos y fuentes para todos los informes
+(pdf_generator, etiquetas_generator y activitat_report).
+
+- La hoja de estilos (getSampleStyleSheet + estilos propios) se crea una
+  sola vez por proceso y se comparte entre informes
+- Los TableStyle de cada informe se definen aquí como listas de comandos
+  y se construyen una sola vez
+- Las fuentes TrueType opcionales se registran una sola vez
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Fuentes base (incluidas en ReportLab, no hace falta registrarlas)
+FUENTE_NORMAL = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+FUENTE_CURSIVA = 'Helvetica-Oblique'
+
+
+# ============================================================================
+# COMANDOS DE LAS TABLAS
+# ============================================================================
+
+# Listado general: sin líneas verticales ni horizontales (solo bajo el encabezado)
+TABLA_GENERAL = [
+    # Encabezado
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 7),  # Tamaño reducido
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
+    ('TOPPADDING', (0, 0), (-1, 0), 5),
+
+    # Datos
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID centrado
+    ('ALIGN', (1, 1), (1, -1), 'CENTER'),  # Fecha centrada
+    ('ALIGN', (2, 1), (-1, -1), 'LEFT'),   # Resto a la izquierda
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 6),  # Tamaño reducido
+    ('TOPPADDING', (0, 1), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+
+    # SOLO línea debajo del encabezado
+    ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#2c3e50')),
+
+    # Filas alternadas
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+]
+
+
+# Listado de datos bancarios
+TABLA_BANCARIA = [
+    # Encabezado
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('TOPPADDING', (0, 0), (-1, 0), 6),
+
+    # Datos
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID centrado
+    ('ALIGN', (5, 1), (5, -1), 'CENTER'),  # Domiciliado centrado
+    ('ALIGN', (1, 1), (4, -1), 'LEFT'),    # Resto a la izquierda
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('TOPPADDING', (0, 1), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+
+    # Bordes
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#27ae60')),
+
+    # Filas alternadas
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#e8f8f5')]),
+]
+
+
+# Remesa SEPA (la última fila es la de total)
+TABLA_SEPA = [
+    # Encabezado
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 7),
+
+    # Datos
+    ('BACKGROUND', (0, 1), (-1, -2), colors.white),
+    ('ALIGN', (0, 1), (0, -2), 'CENTER'),  # ID
+    ('ALIGN', (4, 1), (4, -2), 'RIGHT'),   # Cuota
+    ('ALIGN', (1, 1), (3, -2), 'LEFT'),
+    ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -2), 7),
+
+    # Fila de total
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#ecf0f1')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, -1), (-1, -1), 9),
+    ('ALIGN', (3, -1), (3, -1), 'RIGHT'),
+    ('ALIGN', (4, -1), (4, -1), 'RIGHT'),
+
+    # Bordes
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#3498db')),
+    ('LINEABOVE', (0, -1), (-1, -1), 1.5, colors.black),
+
+    # Filas alternadas
+    ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.white, colors.HexColor('#ebf5fb')]),
+]
+
+
+# Incidencias de validación de la remesa SEPA
+TABLA_INCIDENCIAS = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#c0392b')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+]
+
+# Inscritos a una actividad
+TABLA_ACTIVITAT = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (3, 0), (4, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+]
+
+TABLAS = {
+    'general': TABLA_GENERAL,
+    'bancaria': TABLA_BANCARIA,
+    'sepa': TABLA_SEPA,
+    'incidencias': TABLA_INCIDENCIAS,
+    'activitat': TABLA_ACTIVITAT,
+}
+
+
+# ============================================================================
+# REGISTRO
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def registrar_fuente(nombre, ruta_ttf):
+    """
+    Registra una fuente TrueType (solo la primera vez).
+
+    Returns:
+        str: Nombre de la fuente para setFont / FONTNAME
+    """
+    pdfmetrics.registerFont(TTFont(nombre, ruta_ttf))
+    return nombre
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """
+    Hoja de estilos compartida (se crea una vez por proceso).
+
+    Incluye los estilos de ReportLab y los propios: TituloCustom,
+    SubtituloCustom, FechaCustom, Nota, ActivitatTitol, ActivitatSubtitol
+    y Peu. No se debe modificar: cada informe la usa tal cual.
+    """
+    styles = getSampleStyleSheet()
+
+    # Estilo para título principal
+    styles.add(ParagraphStyle(
+        name='TituloCustom',
+        parent=styles['Heading1'],
+        fontSize=14,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=15,
+        alignment=TA_CENTER,
+        fontName=FUENTE_NEGRITA
+    ))
+
+    # Estilo para subtítulos
+    styles.add(ParagraphStyle(
+        name='SubtituloCustom',
+        parent=styles['Heading2'],
+        fontSize=10,
+        textColor=colors.HexColor('#4a4a4a'),
+        spaceAfter=10,
+        alignment=TA_LEFT,
+        fontName=FUENTE_NEGRITA
+    ))
+
+    # Estilo para información de fecha
+    styles.add(ParagraphStyle(
+        name='FechaCustom',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#666666'),
+        alignment=TA_RIGHT,
+        fontName=FUENTE_NORMAL
+    ))
+
+    # Nota al pie de los listados
+    styles.add(ParagraphStyle(
+        name='Nota',
+        parent=styles['Normal'],
+        fontSize=7,
+        textColor=colors.grey,
+        alignment=TA_LEFT,
+        fontName=FUENTE_CURSIVA
+    ))
+
+    # Informe de actividad
+    styles.add(ParagraphStyle(
+        name='ActivitatTitol',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        fontName=FUENTE_NEGRITA
+    ))
+    styles.add(ParagraphStyle(
+        name='ActivitatSubtitol',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=colors.HexColor('#34495e'),
+        spaceAfter=20,
+        alignment=TA_CENTER
+    ))
+    styles.add(ParagraphStyle(
+        name='Peu',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    ))
+
+    return styles
+
+
+@lru_cache(maxsize=None)
+def tabla(nombre):
+    """
+    TableStyle compartido de un informe (ver TABLAS).
+
+    No se debe modificar con add(): si un informe necesita comandos extra,
+    que use tabla_con(nombre, comandos).
+    """
+    return TableStyle(TABLAS[nombre])
+
+
+def tabla_con(nombre, comandos):
+    """TableStyle nuevo con los comandos de un informe más los indicados."""
+    return TableStyle(TABLAS[nombre] + list(comandos))
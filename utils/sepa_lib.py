@@ -1,111 +1,273 @@
 from datetime import datetime
-from xml.etree.ElementTree import Element, SubElement, tostring, ElementTree
-from xml.dom import minidom
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
 import os
+import logging
 
-def generar_xml_sepa(dades, socios, filename="remesa_sepa.xml"):
+from utils.validacion import normalizar_iban, bic_socio, comprobar_remesa
+
+log = logging.getLogger(__name__)
+
+SEPA_NAMESPACE = "urn:iso:std:iso:20022:tech:xsd:pain.008.001.02"
+
+
+class SepaXmlWriter:
     """
-    Genera un archivo XML en formato SEPA (pain.008.001.02)
-    para el cobro de la cuota de socios.
+    Escritor XML en streaming para los ficheros SEPA.
+
+    Escribe cada elemento directamente en el fichero, sin construir el árbol
+    en memoria, así el consumo no depende del número de recibos.
+    """
+
+    def __init__(self, f, pretty=True, indent="  "):
+        self.f = f
+        self.pretty = pretty
+        self.indent = indent
+        self._stack = []
+
+    def _prefix(self):
+        return ("\n" + self.indent * len(self._stack)) if self.pretty else ""
+
+    @staticmethod
+    def _attrs(attrs):
+        return "".join(f" {k}={quoteattr(str(v))}" for k, v in attrs.items())
+
+    def declaration(self):
+        self.f.write('<?xml version="1.0" encoding="UTF-8"?>')
+        if not self.pretty:
+            self.f.write("\n")
+
+    def start(self, tag, **attrs):
+        """Abre un elemento que contendrá otros elementos."""
+        self.f.write(f"{self._prefix()}<{tag}{self._attrs(attrs)}>")
+        self._stack.append(tag)
+
+    def end(self):
+        """Cierra el último elemento abierto."""
+        tag = self._stack.pop()
+        self.f.write(f"{self._prefix()}</{tag}>")
+
+    def element(self, tag, text=None, **attrs):
+        """Escribe un elemento hoja con su texto (vacío si no hay valor)."""
+        if text is None or text == "":
+            self.f.write(f"{self._prefix()}<{tag}{self._attrs(attrs)}/>")
+        else:
+            self.f.write(f"{self._prefix()}<{tag}{self._attrs(attrs)}>{escape(str(text))}</{tag}>")
+
+    def close(self):
+        while self._stack:
+            self.end()
+        self.f.write("\n")
+
+
+def importe(socio):
+    """Importe del recibo de un socio (FAMQuota ya es Decimal)."""
+    return socio.FAMQuota or Decimal("0")
+
+
+def totales_remesa(socios):
+    """
+    Calcula NbOfTxs y CtrlSum en una sola pasada.
+
+    Returns:
+        tuple: (número de recibos, suma de importes)
     """
-    
-    # 1. Crear el elemento raíz
-    documento = Element("Document", xmlns="urn:iso:std:iso:20022:tech:xsd:pain.008.001.02")
-    cct_pago = SubElement(documento, "CstmrDrctDbtInitn")
-    
+    num = 0
+    total = Decimal("0")
+    for socio in socios:
+        num += 1
+        total += importe(socio)
+    return num, total
+
+
+def _formato_importe(valor):
+    return "{:.2f}".format(valor)
+
+
+def _escribir_cabecera(w, dades, ahora, num_transacciones, total_control, msg_id=None):
+    """Escribe Document, CstmrDrctDbtInitn y GrpHdr (quedan abiertos los dos primeros)."""
+    # 1. Elemento raíz
+    w.start("Document", xmlns=SEPA_NAMESPACE)
+    w.start("CstmrDrctDbtInitn")
+
     # 2. Encabezado del mensaje
-    grupo_cabecera = SubElement(cct_pago, "GrpHdr")
-    msg_id = SubElement(grupo_cabecera, "MsgId")
-    msg_id.text = "MSGID-" + datetime.now().strftime("%Y%m%d%H%M%S")
-    creacion_fecha = SubElement(grupo_cabecera, "CreDtTm")
-    creacion_fecha.text = datetime.now().isoformat()
-    num_transacciones = SubElement(grupo_cabecera, "NbOfTxs")
-    num_transacciones.text = str(len(socios))
-    
-    total_control = sum(s.FAMQuota for s in socios)
-    total_control_el = SubElement(grupo_cabecera, "CtrlSum")
-    total_control_el.text = "{:.2f}".format(total_control)
-    
+    w.start("GrpHdr")
+    w.element("MsgId", msg_id or "MSGID-" + ahora.strftime("%Y%m%d%H%M%S"))
+    w.element("CreDtTm", ahora.isoformat())
+    w.element("NbOfTxs", str(num_transacciones))
+    w.element("CtrlSum", _formato_importe(total_control))
+
     # Datos del presentador
-    init_ptn = SubElement(grupo_cabecera, "InitgPty")
-    nm = SubElement(init_ptn, "Nm")
-    nm.text = dades.Presentador
+    w.start("InitgPty")
+    w.element("Nm", dades.Presentador)
+    w.end()
+    w.end()  # GrpHdr
+
 
+def _escribir_pmtinf(w, dades, pmt_inf_id, socios, secuencia=None, fecha_cobro=None,
+                     iban=None, totales=None):
+    """
+    Escribe un bloque PmtInf con sus recibos.
+
+    Args:
+        secuencia (str): SeqTp (FRST/RCUR); se omite si es None
+        fecha_cobro (date): ReqdColltnDt; se omite si es None
+        iban (str): Cuenta del acreedor (por defecto IBANPresentador)
+        totales (tuple): (NbOfTxs, CtrlSum) del bloque; se omiten si es None
+    """
     # 3. Información del pago
-    pago_info = SubElement(cct_pago, "PmtInf")
-    pago_id = SubElement(pago_info, "PmtInfId")
-    pago_id.text = "PMTINFID-" + datetime.now().strftime("%Y%m%d%H%M%S")
-    metodo_pago = SubElement(pago_info, "PmtMtd")
-    metodo_pago.text = "DD"
-    
-    tipo_servicio = SubElement(pago_info, "PmtTpInf")
-    cat_proposito = SubElement(tipo_servicio, "SvcLvl")
-    code = SubElement(cat_proposito, "Cd")
-    code.text = "SEPA"
-    
+    w.start("PmtInf")
+    w.element("PmtInfId", pmt_inf_id)
+    w.element("PmtMtd", "DD")
+    if totales is not None:
+        w.element("NbOfTxs", str(totales[0]))
+        w.element("CtrlSum", _formato_importe(totales[1]))
+
+    w.start("PmtTpInf")
+    w.start("SvcLvl")
+    w.element("Cd", "SEPA")
+    w.end()
+    if secuencia:
+        w.element("SeqTp", secuencia)
+    w.end()
+
+    if fecha_cobro is not None:
+        w.element("ReqdColltnDt", fecha_cobro.strftime("%Y-%m-%d"))
+
     # Información del cobro
-    tipo_cobro = SubElement(pago_info, "LclInstrm")
-    proprty = SubElement(tipo_cobro, "Cd")
-    proprty.text = "CORE"
-    
+    w.start("LclInstrm")
+    w.element("Cd", "CORE")
+    w.end()
+
     # 4. Información de la entidad deudora
-    entidad_deudora = SubElement(pago_info, "Dbtr")
-    nm_entidad = SubElement(entidad_deudora, "Nm")
-    nm_entidad.text = dades.Ordenant
-    
-    dir_entidad = SubElement(entidad_deudora, "PstlAdr")
-    dir_entidad.text = "Dirección del Ordenante" # TODO: Cambiar por un campo real
-    
+    w.start("Dbtr")
+    w.element("Nm", dades.Ordenant)
+    w.element("PstlAdr", "Dirección del Ordenante")  # TODO: Cambiar por un campo real
+    w.end()
+
     # Cuenta del deudor
-    cuenta_deudor = SubElement(pago_info, "DbtrAcct")
-    id_cuenta = SubElement(cuenta_deudor, "Id")
-    iban_cuenta = SubElement(id_cuenta, "IBAN")
-    iban_cuenta.text = dades.IBANPresentador
-    
+    w.start("DbtrAcct")
+    w.start("Id")
+    w.element("IBAN", normalizar_iban(iban or dades.IBANPresentador))
+    w.end()
+    w.end()
+
     # Agente del deudor
-    agente_deudor = SubElement(pago_info, "DbtrAgt")
-    fin_inst_id = SubElement(agente_deudor, "FinInstnId")
-    bic_agente = SubElement(fin_inst_id, "BIC")
-    bic_agente.text = dades.BICPresentador
-    
+    w.start("DbtrAgt")
+    w.start("FinInstnId")
+    w.element("BIC", dades.BICPresentador)
+    w.end()
+    w.end()
+
     # Esquema de domiciliación
-    domiciliation = SubElement(pago_info, "DrctDbtPmtInf")
-    sepa_id = SubElement(domiciliation, "DrctDbtId")
-    sepa_id.text = "ES000000000000000000000" # TODO: Reemplazar con el ID de la domiciliación
-    
-    # 5. Información de las transacciones
+    w.start("DrctDbtPmtInf")
+    w.element("DrctDbtId", "ES000000000000000000000")  # TODO: Reemplazar con el ID de la domiciliación
+    w.end()
+
+    # 5. Información de las transacciones (se escriben según se recorren)
     for socio in socios:
-        creditor_trans = SubElement(pago_info, "DrctDbtTxInf")
-        
-        pago_id_trans = SubElement(creditor_trans, "PmtId")
-        end_to_end_id = SubElement(pago_id_trans, "EndToEndId")
-        end_to_end_id.text = socio.FAMID
-        
-        monto_trans = SubElement(creditor_trans, "InstdAmt", Ccy="EUR")
-        monto_trans.text = "{:.2f}".format(socio.FAMQuota)
-
-        deudor_trans = SubElement(creditor_trans, "Dbtr")
-        nm_deudor = SubElement(deudor_trans, "Nm")
-        nm_deudor.text = socio.FAMNom
+        w.start("DrctDbtTxInf")
+
+        w.start("PmtId")
+        w.element("EndToEndId", socio.FAMID)
+        w.end()
+
+        w.element("InstdAmt", _formato_importe(importe(socio)), Ccy="EUR")
+
+        w.start("Dbtr")
+        w.element("Nm", socio.FAMNom)
+        w.end()
 
         # Información de la cuenta del deudor
-        cuenta_deudor_trans = SubElement(creditor_trans, "DbtrAcct")
-        id_cuenta_deudor_trans = SubElement(cuenta_deudor_trans, "Id")
-        iban_cuenta_deudor_trans = SubElement(id_cuenta_deudor_trans, "IBAN")
-        iban_cuenta_deudor_trans.text = socio.FAMIBAN
-        
+        w.start("DbtrAcct")
+        w.start("Id")
+        w.element("IBAN", normalizar_iban(socio.FAMIBAN))
+        w.end()
+        w.end()
+
         # Agente del deudor
-        agente_deudor_trans = SubElement(creditor_trans, "DbtrAgt")
-        fin_inst_id_trans = SubElement(agente_deudor_trans, "FinInstnId")
-        bic_agente_trans = SubElement(fin_inst_id_trans, "BIC")
-        bic_agente_trans.text = socio.FAMBIC
-        
-    # 6. Guardar el XML en un archivo
-    arbol = ElementTree(documento)
-    with open(filename, "w", encoding="utf-8") as f:
-        # Embellecer y escribir el XML con sangría
-        xml_str = tostring(documento, 'utf-8')
-        dom = minidom.parseString(xml_str)
-        f.write(dom.toprettyxml(indent="  "))
-    
-    print("Archivo SEPA generado en:", os.path.abspath(filename))
\ No newline at end of file
+        w.start("DbtrAgt")
+        w.start("FinInstnId")
+        w.element("BIC", bic_socio(socio))
+        w.end()
+        w.end()
+
+        w.end()  # DrctDbtTxInf
+
+    w.end()  # PmtInf
+
+
+def generar_xml_sepa(dades, socios, filename="remesa_sepa.xml", pretty=True, validar=True):
+    """
+    Genera un archivo XML en formato SEPA (pain.008.001.02)
+    para el cobro de la cuota de socios.
+
+    Los recibos (DrctDbtTxInf) se escriben uno a uno en el fichero; solo se
+    recorre la lista una vez antes para calcular NbOfTxs y CtrlSum.
+
+    Args:
+        dades: Datos de configuración (G_Dades)
+        socios (list): Socios a domiciliar
+        filename (str): Ruta del XML
+        pretty (bool): Escribir con sangría (False = XML compacto)
+        validar (bool): Comprobar IBAN y BIC antes de escribir
+
+    Returns:
+        tuple: (número de recibos, suma de control)
+
+    Raises:
+        ErrorValidacion: Si algún socio tiene el IBAN o el BIC incorrecto
+    """
+    if validar:
+        comprobar_remesa(socios)
+    num_transacciones, total_control = totales_remesa(socios)
+    ahora = datetime.now()
+
+    with open(filename, "w", encoding="utf-8", newline="\n") as f:
+        w = SepaXmlWriter(f, pretty=pretty)
+        w.declaration()
+        _escribir_cabecera(w, dades, ahora, num_transacciones, total_control)
+        _escribir_pmtinf(w, dades, "PMTINFID-" + ahora.strftime("%Y%m%d%H%M%S"), socios)
+        # 6. Cerrar CstmrDrctDbtInitn y Document
+        w.close()
+
+    log.info("Archivo SEPA generado en: %s", os.path.abspath(filename))
+    return num_transacciones, total_control
+
+
+def generar_xml_sepa_lotes(dades, lotes, filename, pretty=True, msg_id=None):
+    """
+    Genera un XML SEPA con varios bloques PmtInf (uno por lote).
+
+    Args:
+        dades: Datos de configuración (G_Dades)
+        lotes (list): Diccionarios con 'id', 'secuencia', 'fecha_cobro',
+            'iban' y 'socios'
+        filename (str): Ruta del XML
+        pretty (bool): Escribir con sangría
+        msg_id (str): MsgId del fichero (debe ser único por fichero)
+
+    Returns:
+        tuple: (número de recibos, suma de control) del fichero
+    """
+    totales = [totales_remesa(lote['socios']) for lote in lotes]
+    num_transacciones = sum(n for n, _ in totales)
+    total_control = sum((t for _, t in totales), Decimal("0"))
+    ahora = datetime.now()
+
+    with open(filename, "w", encoding="utf-8", newline="\n") as f:
+        w = SepaXmlWriter(f, pretty=pretty)
+        w.declaration()
+        _escribir_cabecera(w, dades, ahora, num_transacciones, total_control, msg_id)
+        for lote, totales_lote in zip(lotes, totales):
+            _escribir_pmtinf(
+                w, dades, lote['id'], lote['socios'],
+                secuencia=lote.get('secuencia'),
+                fecha_cobro=lote.get('fecha_cobro'),
+                iban=lote.get('iban'),
+                totales=totales_lote
+            )
+        w.close()
+
+    log.debug("Archivo SEPA generado en: %s", os.path.abspath(filename))
+    return num_transacciones, total_control
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificador de Remesas SEPA
+============================
+Reparte los socios a domiciliar en bloques PmtInf y en ficheros:
+
+- Agrupa por tipo de secuencia (FRST/RCUR), fecha de cobro y cuenta del
+  acreedor; cada grupo es un PmtInf distinto
+- Limita el número de recibos por fichero (límite del banco)
+- Genera los ficheros en paralelo
+- Escribe un manifiesto JSON con las sumas de control de cada fichero
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import os
+import logging
+import json
+import hashlib
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.sepa_lib import generar_xml_sepa_lotes, totales_remesa
+from utils.validacion import normalizar_iban, comprobar_remesa
+
+log = logging.getLogger(__name__)
+
+# Recibos por fichero que acepta el banco
+MAX_RECIBOS_POR_FICHERO = int(os.getenv('SEPA_MAX_RECIBOS', 1000))
+# Días hábiles entre la generación y la fecha de cobro
+DIAS_COBRO = int(os.getenv('SEPA_DIAS_COBRO', 5))
+
+
+def fecha_cobro_por_defecto(hoy=None, dias=DIAS_COBRO):
+    """Fecha de cobro: 'dias' días hábiles después de hoy (sin sábados ni domingos)."""
+    fecha = hoy or date.today()
+    while dias > 0:
+        fecha += timedelta(days=1)
+        if fecha.weekday() < 5:
+            dias -= 1
+    return fecha
+
+
+def tipo_secuencia(socio, inicio_recurrentes):
+    """
+    FRST para el primer cobro de un mandato, RCUR para los siguientes.
+
+    No se guarda el historial de cobros, así que se considera primer cobro
+    el de los socios dados de alta a partir de 'inicio_recurrentes'.
+    """
+    alta = socio.FAMDataAlta
+    if alta is not None and alta.date() >= inicio_recurrentes:
+        return "FRST"
+    return "RCUR"
+
+
+def planificar_remesa(dades, socios, fecha_cobro=None, max_por_fichero=None,
+                      inicio_recurrentes=None):
+    """
+    Reparte los socios en ficheros y bloques PmtInf.
+
+    Args:
+        dades: Datos de configuración (G_Dades)
+        socios (list): Socios a domiciliar
+        fecha_cobro (date): ReqdColltnDt (por defecto, fecha_cobro_por_defecto())
+        max_por_fichero (int): Recibos máximos por fichero
+        inicio_recurrentes (date): Altas desde esta fecha van como FRST
+            (por defecto, el 1 de enero del año de cobro)
+
+    Returns:
+        list: Un elemento por fichero; cada uno es la lista de lotes
+        ({'secuencia', 'fecha_cobro', 'iban', 'socios'})
+    """
+    fecha_cobro = fecha_cobro or fecha_cobro_por_defecto()
+    max_por_fichero = max_por_fichero or MAX_RECIBOS_POR_FICHERO
+    inicio_recurrentes = inicio_recurrentes or date(fecha_cobro.year, 1, 1)
+    iban_acreedor = normalizar_iban(dades.IBANPresentador)
+
+    # 1. Agrupar (FRST antes que RCUR para que el banco los reciba primero)
+    grupos = {}
+    for socio in socios:
+        clave = (tipo_secuencia(socio, inicio_recurrentes), fecha_cobro, iban_acreedor)
+        grupos.setdefault(clave, []).append(socio)
+
+    # 2. Repartir en ficheros sin superar el límite de recibos
+    ficheros = []
+    actual, ocupados = [], 0
+    for (secuencia, fecha, iban) in sorted(grupos):
+        pendientes = grupos[(secuencia, fecha, iban)]
+        while pendientes:
+            hueco = max_por_fichero - ocupados
+            if hueco == 0:
+                ficheros.append(actual)
+                actual, ocupados = [], 0
+                hueco = max_por_fichero
+            bloque, pendientes = pendientes[:hueco], pendientes[hueco:]
+            actual.append({
+                'secuencia': secuencia,
+                'fecha_cobro': fecha,
+                'iban': iban,
+                'socios': bloque,
+            })
+            ocupados += len(bloque)
+    if actual:
+        ficheros.append(actual)
+
+    return ficheros
+
+
+def _nombres_ficheros(filename, total):
+    """remesa.xml -> remesa.xml si hay un fichero; remesa_01.xml, remesa_02.xml... si hay varios."""
+    if total == 1:
+        return [filename]
+    base, ext = os.path.splitext(filename)
+    return [f"{base}_{i:02d}{ext or '.xml'}" for i in range(1, total + 1)]
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(65536), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def generar_remesa(dades, plan, filename, pretty=True, max_workers=4):
+    """
+    Genera los ficheros de un plan en paralelo y escribe el manifiesto.
+
+    Args:
+        dades: Datos de configuración (G_Dades)
+        plan (list): Resultado de planificar_remesa()
+        filename (str): Ruta base elegida por el usuario
+        pretty (bool): XML con sangría
+        max_workers (int): Ficheros que se generan a la vez
+
+    Returns:
+        dict: Manifiesto (también guardado junto a los XML)
+
+    Raises:
+        ErrorValidacion: Si algún socio tiene el IBAN o el BIC incorrecto
+            (se comprueban todos antes de escribir ningún fichero)
+    """
+    if not plan:
+        raise ValueError("No hay recibos para generar la remesa")
+
+    comprobar_remesa(socio for lotes in plan for lote in lotes for socio in lote['socios'])
+
+    marca = datetime.now().strftime("%Y%m%d%H%M%S")
+    rutas = _nombres_ficheros(filename, len(plan))
+
+    for num_fichero, lotes in enumerate(plan, start=1):
+        for num_lote, lote in enumerate(lotes, start=1):
+            lote['id'] = f"PMTINFID-{marca}-{num_fichero:02d}-{num_lote:02d}-{lote['secuencia']}"
+
+    def generar_fichero(num_fichero):
+        return generar_xml_sepa_lotes(
+            dades, plan[num_fichero], rutas[num_fichero], pretty=pretty,
+            msg_id=f"MSGID-{marca}-{num_fichero + 1:02d}"
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        resultados = list(executor.map(generar_fichero, range(len(plan))))
+
+    fitxers = []
+    for ruta, lotes, (num, total) in zip(rutas, plan, resultados):
+        fitxers.append({
+            'fitxer': os.path.basename(ruta),
+            'MsgId': f"MSGID-{marca}-{len(fitxers) + 1:02d}",
+            'NbOfTxs': num,
+            'CtrlSum': f"{total:.2f}",
+            'sha256': _sha256(ruta),
+            'PmtInf': [
+                {
+                    'PmtInfId': lote['id'],
+                    'SeqTp': lote['secuencia'],
+                    'ReqdColltnDt': lote['fecha_cobro'].isoformat(),
+                    'IBAN': lote['iban'],
+                    'NbOfTxs': n,
+                    'CtrlSum': f"{t:.2f}",
+                }
+                for lote in lotes
+                for n, t in [totales_remesa(lote['socios'])]
+            ],
+        })
+
+    manifiesto = {
+        'generat': datetime.now().isoformat(timespec='seconds'),
+        'NbOfTxs': sum(f['NbOfTxs'] for f in fitxers),
+        'CtrlSum': f"{sum(total for _, total in resultados):.2f}",
+        'fitxers': fitxers,
+    }
+
+    base, _ = os.path.splitext(filename)
+    ruta_manifiesto = f"{base}_manifest.json"
+    with open(ruta_manifiesto, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    manifiesto['ruta'] = ruta_manifiesto
+    manifiesto['rutes'] = rutas
+
+    log.info("Remesa SEPA: %d fichero(s), %s recibos, total %s € (manifiesto: %s)",
+             len(rutas), manifiesto['NbOfTxs'], manifiesto['CtrlSum'], ruta_manifiesto)
+    return manifiesto
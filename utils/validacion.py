@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validación de Datos Bancarios y Fiscales
+========================================
+Comprueba IBAN, BIC y NIF/NIE/CIF de todos los socios en una sola pasada,
+antes de generar la remesa o de sincronizar el Excel.
+
+- IBAN: longitud por país y dígitos de control (mod-97, ISO 13616)
+- BIC: formato ISO 9362; si falta, se deduce del código de entidad de los
+  IBAN españoles
+- NIF/NIE: letra de control; CIF: dígito o letra de control
+
+Los resultados se guardan en caché por valor: los valores repetidos (p. ej.
+el IBAN compartido por una pareja) solo se calculan una vez.
+
+Autor: Sistema de Gestión COJUB
+Fecha: 2025
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Longitud del IBAN de los países SEPA más habituales
+LONGITUD_IBAN = {
+    'ES': 24, 'AD': 24, 'PT': 25, 'FR': 27, 'DE': 22, 'IT': 27, 'GB': 22,
+    'BE': 16, 'NL': 18, 'LU': 20, 'CH': 21, 'AT': 20, 'IE': 22, 'MC': 27,
+}
+
+# Código de entidad (posiciones 5-8 del IBAN español) -> BIC
+BIC_POR_ENTIDAD = {
+    '0019': 'DEUTESBBXXX',  # Deutsche Bank
+    '0030': 'ESPCESMMXXX',  # Banco Español de Crédito
+    '0049': 'BSCHESMMXXX',  # Banco Santander
+    '0061': 'BMARES2MXXX',  # Banca March
+    '0065': 'BARCESMMXXX',  # Barclays
+    '0073': 'OPENESMMXXX',  # Openbank
+    '0075': 'POPUESMMXXX',  # Banco Popular
+    '0081': 'BSABESBBXXX',  # Banco Sabadell
+    '0083': 'RENBESMMXXX',  # Renta 4 Banco
+    '0128': 'BKBKESMMXXX',  # Bankinter
+    '0131': 'BESMESMMXXX',  # Novo Banco
+    '0138': 'BKOAES22XXX',  # Bankoa
+    '0182': 'BBVAESMMXXX',  # BBVA
+    '0186': 'BFIVESBBXXX',  # Banco Mediolanum
+    '0239': 'EVOBESMMXXX',  # EVO Banco
+    '0487': 'GBMNESMMXXX',  # Banco Mare Nostrum
+    '1465': 'INGDESMMXXX',  # ING
+    '1491': 'TRIOESMMXXX',  # Triodos Bank
+    '2013': 'CESCESBBXXX',  # Catalunya Caixa
+    '2038': 'CAHMESMMXXX',  # Bankia
+    '2080': 'CAGLESMMXXX',  # Abanca
+    '2085': 'CAZRES2ZXXX',  # Ibercaja
+    '2095': 'BASKES2BXXX',  # Kutxabank
+    '2100': 'CAIXESBBXXX',  # CaixaBank
+    '2103': 'UCJAES2MXXX',  # Unicaja
+    '3025': 'CDENESBBXXX',  # Caixa d'Enginyers
+    '3035': 'CLPEES2MXXX',  # Laboral Kutxa
+    '3058': 'CCRIES2AXXX',  # Cajamar
+    '3183': 'CASDESBBXXX',  # Caja de Arquitectos
+}
+
+LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+LETRAS_CIF = "JABCDEFGHI"
+
+_RE_BIC = re.compile(r'^[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}([A-Z0-9]{3})?$')
+_RE_DNI = re.compile(r'^(\d{8})([A-Z])$')
+_RE_NIE = re.compile(r'^([XYZ])(\d{7})([A-Z])$')
+_RE_CIF = re.compile(r'^([ABCDEFGHJNPQRSUVW])(\d{7})([0-9A-J])$')
+
+# Una incidencia por campo incorrecto de un socio
+Incidencia = namedtuple('Incidencia', ['famid', 'nombre', 'campo', 'valor', 'motivo'])
+
+
+class ErrorValidacion(ValueError):
+    """Datos incorrectos en uno o más socios; guarda todas las incidencias."""
+
+    # Incidencias que se muestran en el mensaje (el resto se resume)
+    MAX_MENSAJE = 20
+
+    def __init__(self, incidencias):
+        self.incidencias = list(incidencias)
+        lineas = [
+            f"{i.famid} {i.nombre}: {i.campo} '{i.valor}' - {i.motivo}"
+            for i in self.incidencias[:self.MAX_MENSAJE]
+        ]
+        restantes = len(self.incidencias) - self.MAX_MENSAJE
+        if restantes > 0:
+            lineas.append(f"... i {restantes} incidències més")
+        super().__init__(
+            f"{len(self.incidencias)} dades incorrectes:\n" + "\n".join(lineas)
+        )
+
+
+def normalizar_iban(iban):
+    """Quita espacios y guiones y pasa a mayúsculas ('' si no hay valor)."""
+    if not iban:
+        return ''
+    return re.sub(r'[\s-]', '', str(iban)).upper()
+
+
+def normalizar_nif(nif):
+    """
+    Limpia un NIF/NIE/CIF: sin espacios, guiones ni puntos, en mayúsculas.
+
+    Returns:
+        str: NIF limpio, o None si está vacío
+    """
+    if nif is None:
+        return None
+    limpio = re.sub(r'[\s.\-]', '', str(nif)).upper()
+    return limpio or None
+
+
+@lru_cache(maxsize=None)
+def validar_iban(iban):
+    """
+    Comprueba un IBAN (ya normalizado).
+
+    Returns:
+        str: Motivo del error, o None si es correcto
+    """
+    if not re.fullmatch(r'[A-Z]{2}\d{2}[A-Z0-9]+', iban):
+        return "format d'IBAN incorrecte"
+    longitud = LONGITUD_IBAN.get(iban[:2])
+    if longitud is not None and len(iban) != longitud:
+        return f"l'IBAN ha de tenir {longitud} caràcters"
+    reordenado = iban[4:] + iban[:4]
+    numero = ''.join(str(int(c, 36)) for c in reordenado)
+    if int(numero) % 97 != 1:
+        return "dígits de control de l'IBAN incorrectes"
+    return None
+
+
+@lru_cache(maxsize=None)
+def bic_desde_iban(iban):
+    """
+    Deduce el BIC a partir del código de entidad de un IBAN español.
+
+    Returns:
+        str: BIC, o None si no es español o la entidad no está en la tabla
+    """
+    iban = normalizar_iban(iban)
+    if not iban.startswith('ES') or len(iban) < 8:
+        return None
+    return BIC_POR_ENTIDAD.get(iban[4:8])
+
+
+@lru_cache(maxsize=None)
+def validar_bic(bic):
+    """Comprueba el formato de un BIC (8 u 11 caracteres). None si es correcto."""
+    if not _RE_BIC.match(bic):
+        return "format de BIC incorrecte"
+    return None
+
+
+def _control_cif(digitos):
+    pares = sum(int(d) for d in digitos[1::2])
+    impares = sum(sum(divmod(int(d) * 2, 10)) for d in digitos[0::2])
+    return (10 - (pares + impares) % 10) % 10
+
+
+@lru_cache(maxsize=None)
+def validar_nif(nif):
+    """
+    Comprueba un NIF, NIE o CIF (ya normalizado).
+
+    Returns:
+        str: Motivo del error, o None si es correcto
+    """
+    m = _RE_DNI.match(nif)
+    if m:
+        if LETRAS_DNI[int(m.group(1)) % 23] != m.group(2):
+            return "lletra del NIF incorrecta"
+        return None
+
+    m = _RE_NIE.match(nif)
+    if m:
+        numero = str('XYZ'.index(m.group(1))) + m.group(2)
+        if LETRAS_DNI[int(numero) % 23] != m.group(3):
+            return "lletra del NIE incorrecta"
+        return None
+
+    m = _RE_CIF.match(nif)
+    if m:
+        letra, digitos, control = m.groups()
+        valor = _control_cif(digitos)
+        # Unas entidades llevan letra de control, otras número; se aceptan ambos
+        if letra in 'PQRSNW':
+            validos = {LETRAS_CIF[valor]}
+        elif letra in 'ABEH':
+            validos = {str(valor)}
+        else:
+            validos = {str(valor), LETRAS_CIF[valor]}
+        if control not in validos:
+            return "control del CIF incorrecte"
+        return None
+
+    return "format de NIF/NIE/CIF incorrecte"
+
+
+def bic_socio(socio):
+    """BIC del socio, o el deducido de su IBAN si no tiene."""
+    return (socio.FAMBIC or '').strip().upper() or bic_desde_iban(socio.FAMIBAN) or ''
+
+
+def _valor(socio, campo):
+    if isinstance(socio, dict):
+        return socio.get(campo)
+    return getattr(socio, campo, None)
+
+
+def validar_socios(socios, campos=('FAMIBAN', 'FAMBIC', 'FAMNIF'), obligatorios=()):
+    """
+    Valida todos los socios de una vez.
+
+    Args:
+        socios: Socios (Socio o diccionarios del Excel)
+        campos: Campos a comprobar cuando tienen valor
+        obligatorios: Campos que además no pueden estar vacíos
+
+    Returns:
+        list: Incidencias encontradas (vacía si todo es correcto)
+    """
+    incidencias = []
+    for socio in socios:
+        famid = str(_valor(socio, 'FAMID') or '').strip()
+        nombre = _valor(socio, 'FAMNom') or ''
+
+        for campo in campos:
+            valor = _valor(socio, campo)
+            if campo == 'FAMIBAN':
+                limpio = normalizar_iban(valor)
+                motivo = validar_iban(limpio) if limpio else None
+            elif campo == 'FAMBIC':
+                limpio = (valor or '').strip().upper()
+                if not limpio and campo in obligatorios:
+                    # Sin BIC pero deducible del IBAN: no es un error
+                    limpio = bic_desde_iban(_valor(socio, 'FAMIBAN'))
+                    valor = limpio or valor
+                motivo = validar_bic(limpio) if limpio else None
+            else:
+                limpio = normalizar_nif(valor)
+                motivo = validar_nif(limpio) if limpio else None
+
+            if not limpio and campo in obligatorios:
+                motivo = "camp obligatori buit"
+            if motivo:
+                incidencias.append(Incidencia(famid, nombre, campo, valor or '', motivo))
+    return incidencias
+
+
+def comprobar_remesa(socios):
+    """
+    Valida los datos bancarios de los socios de una remesa.
+
+    Raises:
+        ErrorValidacion: Con todas las incidencias, si hay alguna
+    """
+    incidencias = validar_socios(
+        socios, campos=('FAMIBAN', 'FAMBIC'), obligatorios=('FAMIBAN', 'FAMBIC')
+    )
+    if incidencias:
+        raise ErrorValidacion(incidencias)
@@ -1,8 +1,14 @@
-﻿from PyQt6.QtCore import QObject, pyqtSignal
+﻿import logging
+import sqlite3
+import pyodbc
+from PyQt6.QtCore import QObject, pyqtSignal
 from typing import List, Optional
 from models.activitat import Activitat, ActivitatInscripcio
-from models.model import DatabaseModel
+from models.model import DatabaseModel, is_connection_error
 from datetime import date
+from utils.instrumentacion import span
+
+log = logging.getLogger(__name__)
 
 class ActivitatViewModel(QObject):
     """ViewModel para la gestión de actividades"""
@@ -12,11 +18,13 @@ class ActivitatViewModel(QObject):
     error_occurred = pyqtSignal(str)
     success_message = pyqtSignal(str)
     
-    def __init__(self, db_model: DatabaseModel):
+    def __init__(self, db_model: DatabaseModel, cache=None):
         super().__init__()
         self.db_model = db_model
+        self.cache = cache  # Copia local (CacheLocal) para consultar sin conexión
         self._activitats: List[Activitat] = []
         self._inscripcions: List[ActivitatInscripcio] = []
+        self._activitat_id: Optional[int] = None  # Actividad de las inscripciones cargadas
     
     # --- GESTIÓN DE ACTIVIDADES ---
     
@@ -31,9 +39,20 @@ class ActivitatViewModel(QObject):
                 WHERE activa = 1
                 ORDER BY data_inici DESC
             """
-            with self.db_model.conn.cursor() as cursor:
-                cursor.execute(query)
-                rows = cursor.fetchall()
+            try:
+                with span('act.carrega_activitats', nivel=logging.INFO) as datos:
+                    rows = self.db_model.execute_query(query)
+                    datos['files'] = len(rows)
+                self._save_cache(rows)
+            except pyodbc.Error as ex:
+                # Sin conexión: se muestran las actividades de la copia local
+                if self.cache is None or not is_connection_error(ex):
+                    raise
+                rows = self.cache.load_activitats()
+                rows.sort(key=lambda row: str(row[2] or ''), reverse=True)  # ORDER BY data_inici DESC
+                self.error_occurred.emit(
+                    "Servidor no disponible: es mostren les activitats desades (només lectura)"
+                )
             
             self._activitats = []
             for row in rows:
@@ -54,8 +73,18 @@ class ActivitatViewModel(QObject):
             self.activitats_updated.emit()
             
         except Exception as e:
+            log.exception("Error al cargar actividades")
             self.error_occurred.emit(f"Error carregant activitats: {str(e)}")
     
+    def _save_cache(self, rows):
+        """Guarda las actividades en la copia local (si la hay)"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.save_activitats(rows)
+        except sqlite3.Error as ex:
+            log.warning("No se ha podido guardar la copia local de actividades: %s", ex)
+    
     def get_activitats(self) -> List[Activitat]:
         """Retorna la lista de actividades"""
         return self._activitats
@@ -77,9 +106,9 @@ class ActivitatViewModel(QObject):
                 activitat.completada
             )
             
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, params)
-                self.db_model.conn.commit()
+                conn.commit()
             self.success_message.emit("Activitat creada correctament")
             self.load_activitats_actives()
             return True
@@ -108,9 +137,9 @@ class ActivitatViewModel(QObject):
                 activitat.id
             )
             
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, params)
-                self.db_model.conn.commit()
+                conn.commit()
             self.success_message.emit("Activitat actualitzada correctament")
             self.load_activitats_actives()
             return True
@@ -128,9 +157,9 @@ class ActivitatViewModel(QObject):
                 WHERE id = ?
             """           
 
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, (activitat_id,))
-                self.db_model.conn.commit()
+                conn.commit()
 
             self.success_message.emit("Activitat eliminada correctament")
             self.load_activitats_actives()
@@ -144,6 +173,7 @@ class ActivitatViewModel(QObject):
     
     def load_inscripcions(self, activitat_id: int):
         """Carga totes les inscripcions d'una activitat"""
+        self._activitat_id = activitat_id
         try:
             query = """
                 SELECT 
@@ -157,11 +187,9 @@ class ActivitatViewModel(QObject):
                 WHERE i.activitat_id = ? AND i.activa = 1
                 ORDER BY s.FAMNom
             """
-            #rows = self.db_model.execute_query(query, (activitat_id,))
-            
-            with self.db_model.conn.cursor() as cursor:
-                cursor.execute(query,(activitat_id,))
-                rows = cursor.fetchall()
+            with span('act.carrega_inscripcions', activitat=activitat_id) as datos:
+                rows = self.db_model.execute_query(query, (activitat_id,))
+                datos['files'] = len(rows)
 
             self._inscripcions = []
             for row in rows:
@@ -186,6 +214,11 @@ class ActivitatViewModel(QObject):
         except Exception as e:
             self.error_occurred.emit(f"Error carregant inscripcions: {str(e)}")
     
+    def refresh_inscripcions(self, activitat_ids):
+        """Recarga las inscripciones mostradas si otro usuario las ha cambiado"""
+        if self._activitat_id is not None and self._activitat_id in activitat_ids:
+            self.load_inscripcions(self._activitat_id)
+
     def get_inscripcions(self) -> List[ActivitatInscripcio]:
         """Retorna la lista de inscripciones"""
         return self._inscripcions
@@ -200,11 +233,9 @@ class ActivitatViewModel(QObject):
                 WHERE activitat_id = ? AND soci_codi = ? AND activa = 1
             """
             
-            with self.db_model.conn.cursor() as cursor:
-                cursor.execute(check_query, (activitat_id, soci_codi))
-                result = cursor.fetchone()
+            result = self.db_model.execute_query(check_query, (activitat_id, soci_codi))
             
-            if result and result[0] > 0:
+            if result and result[0][0] > 0:
                 self.error_occurred.emit("Aquest soci ja està inscrit a l'activitat")
                 return False
             
@@ -215,9 +246,9 @@ class ActivitatViewModel(QObject):
             """
             params = (activitat_id, soci_codi, es_soci, preu)
             
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, params)
-                self.db_model.conn.commit()
+                conn.commit()
             self.success_message.emit("Soci inscrit correctament")
             self.load_inscripcions(activitat_id)
             return True
@@ -235,9 +266,9 @@ class ActivitatViewModel(QObject):
                 WHERE id = ?
             """            
 
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, (inscripcio_id,))
-                self.db_model.conn.commit()
+                conn.commit()
             self.success_message.emit("Soci donat de baixa de l'activitat")
             self.load_inscripcions(activitat_id)
             return True
@@ -255,9 +286,9 @@ class ActivitatViewModel(QObject):
                 WHERE id = ?
             """
 
-            with self.db_model.conn.cursor() as cursor:
+            with self.db_model.pool.connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, (pagat, inscripcio_id))
-                self.db_model.conn.commit()
+                conn.commit()
 
             self.success_message.emit("Estat de pagament actualitzat")
             self.load_inscripcions(activitat_id)
@@ -280,9 +311,7 @@ class ActivitatViewModel(QObject):
                 WHERE activitat_id = ? AND activa = 1
             """
 
-            with self.db_model.conn.cursor() as cursor:
-                cursor.execute(query,(activitat_id,))
-                result = cursor.fetchall()
+            result = self.db_model.execute_query(query, (activitat_id,))
             
             if result and len(result) > 0:
                 row = result[0]
@@ -9,12 +9,16 @@ Autor: Sistema de Gestión COJUB
 Fecha: Diciembre 2024
 """
 
+import logging
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import black
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from itertools import islice
+from utils.pdf_styles import FUENTE_NORMAL, FUENTE_NEGRITA
+from utils.direcciones import direcciones_unicas, normalizar_cp
+
+log = logging.getLogger(__name__)
 
 class EtiquetasGenerator:
     """Generador de etiquetas para socios en formato MULTI3 4704."""
@@ -55,38 +59,37 @@ class EtiquetasGenerator:
     def filtrar_socios_unicos(self, socios):
         """
         Filtra socios para eliminar direcciones duplicadas (misma familia).
-        
+
+        Las direcciones se comparan normalizadas ("C/ Major 25" y
+        "Carrer Major, 25" son la misma; ver utils.direcciones).
+
         Args:
             socios: Lista de objetos Socio
-            
+
         Returns:
             Lista de socios con direcciones únicas
         """
-        direcciones_vistas = set()
-        socios_unicos = []
-        
-        for socio in socios:
-            # Solo socios activos (no dados de baja)
-            if socio.bBaixa:
-                continue
-            
-            # Crear clave única basada en dirección normalizada
-            addr = (socio.FAMAdressa or "").strip().lower()
-            cp = (socio.FAMCodPos or "").strip()
-            pob = (socio.FAMPoblacio or "").strip().lower()
+        return list(self.iterar_socios_unicos(socios))
 
-            direccion_normalizada = f"{addr}|{cp}|{pob}"
+    def iterar_socios_unicos(self, socios):
+        """Como filtrar_socios_unicos, pero sin construir la lista (generador)."""
+        # Solo socios activos (no dados de baja)
+        return direcciones_unicas(s for s in socios if not s.bBaixa)
+
+    def paginas(self, socios):
+        """
+        Agrupa en hojas los socios a etiquetar, a medida que se deduplican.
+
+        Yields:
+            list: Socios de una hoja (hasta ETIQUETAS_POR_HOJA)
+        """
+        unicos = self.iterar_socios_unicos(socios)
+        while True:
+            hoja = list(islice(unicos, self.ETIQUETAS_POR_HOJA))
+            if not hoja:
+                return
+            yield hoja
 
-            if not (addr or cp or pob):
-                # Si no hay dirección, no podemos deduplicar por dirección; usa un fallback
-                direccion_normalizada = (socio.FAMID or "").strip()
-            
-            if direccion_normalizada not in direcciones_vistas:
-                direcciones_vistas.add(direccion_normalizada)
-                socios_unicos.append(socio)
-        
-        return socios_unicos
-    
     def calcular_posicion_etiqueta(self, indice):
         """
         Calcula la posición X, Y de una etiqueta según su índice.
@@ -124,7 +127,7 @@ class EtiquetasGenerator:
         texto_y = y + self.ETIQUETA_ALTO - self.PADDING_SUPERIOR
         
         # LÍNEA 1: Nombre (negrita)
-        c.setFont("Helvetica-Bold", self.FUENTE_NOMBRE)
+        c.setFont(FUENTE_NEGRITA, self.FUENTE_NOMBRE)
         nombre = (socio.FAMNom or "").strip()
         if len(nombre) > 35:  # Truncar si es muy largo
             nombre = nombre[:32] + "..."
@@ -132,7 +135,7 @@ class EtiquetasGenerator:
         texto_y -= self.INTERLINEADO
         
         # LÍNEA 2: Dirección
-        c.setFont("Helvetica", self.FUENTE_DIRECCION)
+        c.setFont(FUENTE_NORMAL, self.FUENTE_DIRECCION)
         direccion = (socio.FAMAdressa or "").strip()
         if len(direccion) > 40:  # Truncar si es muy largo
             direccion = direccion[:37] + "..."
@@ -140,14 +143,11 @@ class EtiquetasGenerator:
         texto_y -= self.INTERLINEADO
         
         # LÍNEA 3: Código Postal - Población
-        c.setFont("Helvetica", self.FUENTE_POBLACION)
-        cod_postal = (socio.FAMCodPos or "").strip()
+        c.setFont(FUENTE_NORMAL, self.FUENTE_POBLACION)
+        # Código postal con ceros a la izquierda si es necesario
+        cod_postal = normalizar_cp(socio.FAMCodPos) or (socio.FAMCodPos or "").strip()
         poblacion = (socio.FAMPoblacio or "").strip()
         
-        # Formatear código postal con ceros a la izquierda si es necesario
-        if cod_postal.isdigit() and len(cod_postal) < 5:
-            cod_postal = cod_postal.zfill(5)
-        
         linea3 = f"{cod_postal} {poblacion}"
         if len(linea3) > 40:
             linea3 = linea3[:37] + "..."
@@ -170,54 +170,45 @@ class EtiquetasGenerator:
             True si se generó correctamente, False en caso contrario
         """
         try:
-            # Filtrar socios únicos (sin duplicados de dirección)
-            socios_unicos = self.filtrar_socios_unicos(socios)
-            
-            if not socios_unicos:
-                print("⚠️  No hay socios para generar etiquetas")
-                return False
-            
-            print(f"📊 Total de socios activos: {len([s for s in socios if not s.bBaixa])}")
-            print(f"📊 Etiquetas a generar (sin duplicados): {len(socios_unicos)}")
-            
-            # Crear el PDF
-            c = canvas.Canvas(filepath, pagesize=A4)
-            c.setTitle("Etiquetas de Socios")
-            
-            # Contador de etiquetas
+            # Las etiquetas se dibujan hoja a hoja, a medida que se
+            # deduplican las direcciones (sin lista intermedia)
+            c = None
+            pagina_actual = 0
             etiqueta_actual = 0
-            pagina_actual = 1
-            
-            for socio in socios_unicos:
-                # Si hemos llenado una hoja completa, crear nueva página
-                if etiqueta_actual > 0 and etiqueta_actual % self.ETIQUETAS_POR_HOJA == 0:
+
+            for hoja in self.paginas(socios):
+                if c is None:
+                    # Crear el PDF
+                    c = canvas.Canvas(filepath, pagesize=A4)
+                    c.setTitle("Etiquetas de Socios")
+                else:
                     c.showPage()
-                    pagina_actual += 1
-                    print(f"📄 Página {pagina_actual} iniciada")
-                
-                # Calcular posición en la hoja actual
-                indice_en_hoja = etiqueta_actual % self.ETIQUETAS_POR_HOJA
-                x, y = self.calcular_posicion_etiqueta(indice_en_hoja)
-                
-                # Dibujar la etiqueta
-                self.dibujar_etiqueta(c, socio, x, y)
-                
-                etiqueta_actual += 1
-            
+                pagina_actual += 1
+                log.debug("Página %d iniciada", pagina_actual)
+
+                for indice_en_hoja, socio in enumerate(hoja):
+                    # Calcular posición en la hoja actual y dibujar la etiqueta
+                    x, y = self.calcular_posicion_etiqueta(indice_en_hoja)
+                    self.dibujar_etiqueta(c, socio, x, y)
+                etiqueta_actual += len(hoja)
+
+            if c is None:
+                log.warning("No hay socios para generar etiquetas")
+                return False
+
             # Guardar el PDF
             c.save()
-            
-            print(f"\n✅ PDF generado correctamente:")
-            print(f"   📄 Total de páginas: {pagina_actual}")
-            print(f"   🏷️  Total de etiquetas: {etiqueta_actual}")
-            print(f"   📁 Archivo: {filepath}")
-            
+
+            total_activos = sum(1 for s in socios if not s.bBaixa)
+            log.info(
+                "Etiquetas generadas: %d páginas, %d etiquetas, %d direcciones duplicadas omitidas: %s",
+                pagina_actual, etiqueta_actual, total_activos - etiqueta_actual, filepath
+            )
+
             return True
-            
+
         except Exception as e:
-            print(f"❌ Error al generar etiquetas: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error al generar etiquetas: %s", e)
             return False
 
 
@@ -245,16 +236,19 @@ def generar_etiquetas_socios(socios, filepath):
 # ============================================================================
 
 if __name__ == "__main__":
-    from collections import namedtuple
+    from models.socio import Socio as _Socio
     
-    # Definir estructura Socio (simplificada para testing)
-    Socio = namedtuple('Socio', [
+    # Campos de los datos de prueba (el resto queda a None)
+    CAMPOS_PRUEBA = [
         'FAMID', 'FAMNom', 'FAMAdressa', 'FAMPoblacio', 'FAMCodPos',
         'FAMTelefon', 'FAMMobil', 'FAMEmail', 'FAMDataAlta', 'FAMIBAN',
         'FAMBIC', 'FAMObservacions', 'FAMNIF', 'FAMDataNaixement',
         'FAMQuota', 'FAMDataBaixa', 'FAMSexe', 'FAMSociReferencia',
         'FAMbPagamentDomiciliat', 'FAMbRebutCobrat', 'FAMPagamentFinestreta', 'bBaixa'
-    ])
+    ]
+    
+    def Socio(*valores):
+        return _Socio(**dict(zip(CAMPOS_PRUEBA, valores)))
     
     # Crear socios de prueba
     socios_test = [
@@ -262,7 +256,7 @@ if __name__ == "__main__":
               "934567890", "612345678", "joan@example.com", None, "ES1234567890",
               "CAIXESBB", "", "12345678A", None, 50.0, None, "H", "",
               True, False, False, False),
-        Socio("1002", "Maria López Sánchez", "Carrer Major, 25", "Barcelona", "08001",  # DUPLICADA
+        Socio("1002", "Maria López Sánchez", "C/ Major 25", "Barcelona", "8001",  # DUPLICADA
               "934567891", "612345679", "maria@example.com", None, "ES1234567891",
               "CAIXESBB", "", "12345678B", None, 50.0, None, "M", "1001",
               True, False, False, False),
@@ -12,63 +12,37 @@ Mejoras:
 - Incluye fecha de alta
 - Filas alternadas para legibilidad
 - Sobrescritura automática
+- Tablas largas troceadas por página (tiempo lineal con el nº de socios)
 
 Autor: Sistema de Gestión COJUB
 Fecha: 2024
 """
 
 import os
+import logging
     
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+from itertools import islice
 from datetime import datetime
 
+from utils.validacion import validar_socios
+from utils.pdf_styles import get_styles, tabla, tabla_con
+
+log = logging.getLogger(__name__)
+
 
 class PdfGeneratorTabular:
     """Generador de reportes PDF en formato tabular."""
     
     def __init__(self):
         """Inicializa el generador de PDFs."""
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Configura estilos personalizados."""
-        # Estilo para título principal
-        self.styles.add(ParagraphStyle(
-            name='TituloCustom',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=15,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Estilo para subtítulos
-        self.styles.add(ParagraphStyle(
-            name='SubtituloCustom',
-            parent=self.styles['Heading2'],
-            fontSize=10,
-            textColor=colors.HexColor('#4a4a4a'),
-            spaceAfter=10,
-            alignment=TA_LEFT,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Estilo para información de fecha
-        self.styles.add(ParagraphStyle(
-            name='FechaCustom',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#666666'),
-            alignment=TA_RIGHT,
-            fontName='Helvetica'
-        ))
+        # Estilos compartidos (se crean una vez por proceso)
+        self.styles = get_styles()
+        # Fecha que se imprime como "Generado el" (por defecto, la actual)
+        self.fecha_generacion = None
     
     def _create_header(self, titulo):
         """
@@ -86,12 +60,74 @@ class PdfGeneratorTabular:
         story.append(Paragraph(titulo, self.styles['TituloCustom']))
         
         # Fecha de generación
-        fecha_actual = datetime.now().strftime('%d/%m/%Y %H:%M')
+        fecha_actual = self.fecha_generacion or datetime.now().strftime('%d/%m/%Y %H:%M')
         story.append(Paragraph(f'Generado el: {fecha_actual}', self.styles['FechaCustom']))
         story.append(Spacer(1, 0.4*cm))
         
         return story
     
+    def _tablas_por_pagina(self, doc, headers, filas, col_widths, table_style, ocupado=0):
+        """
+        Trocea las filas en tablas que caben cada una en una página.
+        
+        Partir una sola tabla enorme obliga a ReportLab a recalcularla en
+        cada salto de página (coste cuadrático). Aquí se mide una vez la
+        altura del encabezado y de una fila (todas las celdas son de una
+        línea) y se crea directamente una tabla por página, todas con el
+        mismo TableStyle.
+        
+        Args:
+            doc: SimpleDocTemplate (para el tamaño del marco)
+            headers (list): Fila de encabezado, se repite en cada tabla
+            filas: Filas de datos (lista o generador)
+            col_widths (list): Anchos de columna
+            table_style (TableStyle): Estilo compartido por todas las tablas
+            ocupado (float): Altura ya ocupada en la primera página
+        
+        Yields:
+            Table: Una tabla por página
+        """
+        filas = iter(filas)
+        primera = next(filas, None)
+        if primera is None:
+            tabla_pagina = Table([headers], colWidths=col_widths)
+            tabla_pagina.setStyle(table_style)
+            yield tabla_pagina
+            return
+        
+        # Marco de SimpleDocTemplate: 6 pt de relleno por cada lado
+        ancho = doc.width - 12
+        alto_pagina = doc.height - 12
+        
+        muestra = Table([headers], colWidths=col_widths)
+        muestra.setStyle(table_style)
+        alto_cabecera = muestra.wrap(ancho, alto_pagina)[1]
+        muestra = Table([headers, primera], colWidths=col_widths)
+        muestra.setStyle(table_style)
+        alto_fila = muestra.wrap(ancho, alto_pagina)[1] - alto_cabecera
+        
+        # Una fila de margen en la primera página por los redondeos del encabezado
+        disponible = alto_pagina - ocupado - alto_fila
+        por_pagina = max(1, int((alto_pagina - alto_cabecera - 1) // alto_fila))
+        primera_pagina = int((disponible - alto_cabecera) // alto_fila)
+        if primera_pagina < 1:
+            primera_pagina = por_pagina
+        
+        bloque = [primera] + list(islice(filas, primera_pagina - 1))
+        while bloque:
+            tabla_pagina = Table([headers] + bloque, colWidths=col_widths)
+            tabla_pagina.setStyle(table_style)
+            yield tabla_pagina
+            bloque = list(islice(filas, por_pagina))
+    
+    def _altura(self, doc, flowables):
+        """Altura que ocupan unos flowables (con sus espacios) en el marco."""
+        total = 0
+        for f in flowables:
+            total += f.wrap(doc.width - 12, doc.height - 12)[1]
+            total += f.getSpaceBefore() + f.getSpaceAfter()
+        return total
+    
     def generate_general_report(self, socios, socis_map, filepath):
         """
         Genera un listado general de socios en formato tabular.
@@ -106,9 +142,9 @@ class PdfGeneratorTabular:
         if os.path.exists(filepath):
             try:
                 os.remove(filepath)
-                print(f"ℹ️ Archivo existente eliminado: {filepath}")
+                log.debug("Archivo existente eliminado: %s", filepath)
             except Exception as e:
-                print(f"⚠️ No se pudo eliminar archivo existente: {e}")
+                log.warning("No se pudo eliminar archivo existente: %s", e)
         
         # Crear documento en HORIZONTAL (landscape)
         doc = SimpleDocTemplate(
@@ -141,63 +177,10 @@ class PdfGeneratorTabular:
             'Email'
         ]
         
-        # Preparar datos de la tabla
-        data = [headers]
-        
-        for socio in socios:
-            # Formatear datos - CORREGIR acceso a fecha de alta
-            # Probar diferentes nombres de campo posibles
-            data_alta = ''
-            if hasattr(socio, 'FAMDataAlta') and socio.FAMDataAlta:
-                data_alta = socio.FAMDataAlta.strftime('%d/%m/%Y')
-            elif hasattr(socio, 'dDataAlta') and socio.dDataAlta:
-                data_alta = socio.dDataAlta.strftime('%d/%m/%Y')
-            elif hasattr(socio, 'FAMDataAlta'):
-                try:
-                    if socio.FAMDataAlta:
-                        data_alta = socio.FAMDataAlta.strftime('%d/%m/%Y')
-                except:
-                    data_alta = ''
-            
-            nombre = socio.FAMNom or ''
-            nif = socio.FAMNIF or ''
-            direccion = socio.FAMAdressa or ''
-            poblacion = socio.FAMPoblacio or ''
-            cp = socio.FAMCodPos or ''
-            
-            # Agregar '0' delante del CP si es necesario (08240 en lugar de 8240)
-            if cp and cp.isdigit() and len(cp) == 4:
-                cp = '0' + cp
-            elif cp and not cp.startswith('0') and len(cp) < 5:
-                cp = cp.zfill(5)  # Rellenar con ceros a la izquierda hasta 5 dígitos
-            
-            telefono = socio.FAMTelefon or ''
-            movil = socio.FAMMobil or ''
-            email = socio.FAMEmail or ''
-            
-            # Truncar textos largos - AUMENTAR límites para horizontal
-            if len(nombre) > 45:
-                nombre = nombre[:42] + '...'
-            if len(direccion) > 48:
-                direccion = direccion[:45] + '...'
-            if len(poblacion) > 30:
-                poblacion = poblacion[:27] + '...'
-            if len(email) > 30:
-                email = email[:27] + '...'
-            
-            row = [
-                str(socio.FAMID),
-                data_alta,
-                nombre,
-                nif,
-                direccion,
-                poblacion,
-                cp,
-                telefono,
-                movil,
-                email
-            ]
-            data.append(row)
+        # Filas de la tabla (se generan según se paginan)
+        def filas():
+            for socio in socios:
+                yield self._fila_general(socio)
         
         # Anchos de columna para A4 HORIZONTAL (29.7cm disponible)
         col_widths = [
@@ -213,44 +196,63 @@ class PdfGeneratorTabular:
             2.5*cm    # Email
         ]
         
-        # Crear tabla
-        table = Table(data, colWidths=col_widths, repeatRows=1)
-        
         # Estilo de la tabla - SIN LÍNEAS VERTICALES NI HORIZONTALES
-        table_style = TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 7),  # Tamaño reducido
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
-            ('TOPPADDING', (0, 0), (-1, 0), 5),
-            
-            # Datos
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID centrado
-            ('ALIGN', (1, 1), (1, -1), 'CENTER'),  # Fecha centrada
-            ('ALIGN', (2, 1), (-1, -1), 'LEFT'),   # Resto a la izquierda
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 6),  # Tamaño reducido
-            ('TOPPADDING', (0, 1), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
-            
-            # SOLO línea debajo del encabezado
-            ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#2c3e50')),
-            
-            # Filas alternadas
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
-        ])
+        table_style = tabla('general')
         
-        table.setStyle(table_style)
-        story.append(table)
+        # Una tabla por página
+        story.extend(self._tablas_por_pagina(
+            doc, headers, filas(), col_widths, table_style,
+            ocupado=self._altura(doc, story)
+        ))
         
         # Generar PDF
         doc.build(story)
-        print(f"✓ Listado general generado: {filepath}")
+        log.info("Listado general generado: %s", filepath)
+    
+    def _fila_general(self, socio):
+        """Fila del listado general para un socio."""
+        # FAMDataAlta ya llega como datetime (Socio.from_row)
+        data_alta = socio.FAMDataAlta.strftime('%d/%m/%Y') if socio.FAMDataAlta else ''
+        
+        nombre = socio.FAMNom or ''
+        nif = socio.FAMNIF or ''
+        direccion = socio.FAMAdressa or ''
+        poblacion = socio.FAMPoblacio or ''
+        cp = socio.FAMCodPos or ''
+        
+        # Agregar '0' delante del CP si es necesario (08240 en lugar de 8240)
+        if cp and cp.isdigit() and len(cp) == 4:
+            cp = '0' + cp
+        elif cp and not cp.startswith('0') and len(cp) < 5:
+            cp = cp.zfill(5)  # Rellenar con ceros a la izquierda hasta 5 dígitos
+        
+        telefono = socio.FAMTelefon or ''
+        movil = socio.FAMMobil or ''
+        email = socio.FAMEmail or ''
+        
+        # Truncar textos largos - AUMENTAR límites para horizontal
+        if len(nombre) > 45:
+            nombre = nombre[:42] + '...'
+        if len(direccion) > 48:
+            direccion = direccion[:45] + '...'
+        if len(poblacion) > 30:
+            poblacion = poblacion[:27] + '...'
+        if len(email) > 30:
+            email = email[:27] + '...'
+        
+        row = [
+            str(socio.FAMID),
+            data_alta,
+            nombre,
+            nif,
+            direccion,
+            poblacion,
+            cp,
+            telefono,
+            movil,
+            email
+        ]
+        return row
     
     def generate_banking_report(self, socios, socis_map, filepath):
         """
@@ -266,9 +268,9 @@ class PdfGeneratorTabular:
         if os.path.exists(filepath):
             try:
                 os.remove(filepath)
-                print(f"ℹ️ Archivo existente eliminado: {filepath}")
+                log.debug("Archivo existente eliminado: %s", filepath)
             except Exception as e:
-                print(f"⚠️ No se pudo eliminar archivo existente: {e}")
+                log.warning("No se pudo eliminar archivo existente: %s", e)
         
         # Filtrar solo socios con datos bancarios
         socios_con_banco = [s for s in socios if s.FAMIBAN and s.FAMIBAN.strip()]
@@ -303,29 +305,23 @@ class PdfGeneratorTabular:
             'Domiciliat'
         ]
         
-        # Preparar datos
-        data = [headers]
-        
-        for socio in socios_con_banco:
-            nombre = socio.FAMNom or ''
-            nif = socio.FAMNIF or ''
-            iban = socio.FAMIBAN or ''
-            bic = socio.FAMBIC or ''
-            domiciliado = 'Sí' if socio.FAMbPagamentDomiciliat else 'No'
-            
-            # Truncar nombre si es muy largo
-            if len(nombre) > 35:
-                nombre = nombre[:32] + '...'
-            
-            row = [
-                str(socio.FAMID),
-                nombre,
-                nif,
-                iban,
-                bic,
-                domiciliado
-            ]
-            data.append(row)
+        # Filas de la tabla (se generan según se paginan)
+        def filas():
+            for socio in socios_con_banco:
+                nombre = socio.FAMNom or ''
+                
+                # Truncar nombre si es muy largo
+                if len(nombre) > 35:
+                    nombre = nombre[:32] + '...'
+                
+                yield [
+                    str(socio.FAMID),
+                    nombre,
+                    socio.FAMNIF or '',
+                    socio.FAMIBAN or '',
+                    socio.FAMBIC or '',
+                    'Sí' if socio.FAMbPagamentDomiciliat else 'No'
+                ]
         
         # Anchos de columna optimizados
         col_widths = [
@@ -337,60 +333,25 @@ class PdfGeneratorTabular:
             1.8*cm    # Domiciliado
         ]
         
-        # Crear tabla
-        table = Table(data, colWidths=col_widths, repeatRows=1)
-        
         # Estilo de la tabla
-        table_style = TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-            ('TOPPADDING', (0, 0), (-1, 0), 6),
-            
-            # Datos
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID centrado
-            ('ALIGN', (5, 1), (5, -1), 'CENTER'),  # Domiciliado centrado
-            ('ALIGN', (1, 1), (4, -1), 'LEFT'),    # Resto a la izquierda
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('TOPPADDING', (0, 1), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-            
-            # Bordes
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#27ae60')),
-            
-            # Filas alternadas
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#e8f8f5')])
-        ])
+        table_style = tabla('bancaria')
         
-        table.setStyle(table_style)
-        story.append(table)
+        # Una tabla por página
+        story.extend(self._tablas_por_pagina(
+            doc, headers, filas(), col_widths, table_style,
+            ocupado=self._altura(doc, story)
+        ))
         
         # Nota al pie
         story.append(Spacer(1, 0.5*cm))
-        nota_style = ParagraphStyle(
-            name='Nota',
-            parent=self.styles['Normal'],
-            fontSize=7,
-            textColor=colors.grey,
-            alignment=TA_LEFT,
-            fontName='Helvetica-Oblique'
-        )
         story.append(Paragraph(
             '<b>Nota:</b> Aquest llistat inclou únicament socis actius amb dades bancàries registrades.',
-            nota_style
+            self.styles['Nota']
         ))
         
         # Generar PDF
         doc.build(story)
-        print(f"✓ Listado bancario generado: {filepath}")
+        log.info("Listado bancario generado: %s", filepath)
     
     def generate_sepa_report(self, socios, dades, filepath):
         """
@@ -406,9 +367,9 @@ class PdfGeneratorTabular:
         if os.path.exists(filepath):
             try:
                 os.remove(filepath)
-                print(f"ℹ️ Archivo existente eliminado: {filepath}")
+                log.debug("Archivo existente eliminado: %s", filepath)
             except Exception as e:
-                print(f"⚠️ No se pudo eliminar archivo existente: {e}")
+                log.warning("No se pudo eliminar archivo existente: %s", e)
         
         # Filtrar socios con pago domiciliado y activos
         socios_sepa = [
@@ -417,7 +378,11 @@ class PdfGeneratorTabular:
         ]
         
         # Calcular total
-        total_cuota = sum(float(s.FAMQuota or 0) for s in socios_sepa)
+        total_cuota = sum(s.FAMQuota or 0 for s in socios_sepa)
+        
+        # Validar IBAN, BIC y NIF de todos los socios de una vez
+        incidencias = validar_socios(socios_sepa)
+        famids_incorrectos = {i.famid for i in incidencias}
         
         # Crear documento
         doc = SimpleDocTemplate(
@@ -437,9 +402,9 @@ class PdfGeneratorTabular:
         # Información del presentador
         if dades:
             info_presentador = f"""
-            <b>Presentador:</b> {dades.DADESNom or 'N/A'}<br/>
-            <b>NIF:</b> {dades.DADESNIF or 'N/A'}<br/>
-            <b>IBAN:</b> {dades.DADESIBAN or 'N/A'}
+            <b>Presentador:</b> {dades.Presentador or 'N/A'}<br/>
+            <b>NIF:</b> {dades.CIFPresentador or 'N/A'}<br/>
+            <b>IBAN:</b> {dades.IBANPresentador or 'N/A'}
             """
             story.append(Paragraph(info_presentador, self.styles['Normal']))
         
@@ -461,8 +426,11 @@ class PdfGeneratorTabular:
         
         # Datos
         data = [headers]
+        filas_incorrectas = []
         
         for socio in socios_sepa:
+            if str(socio.FAMID).strip() in famids_incorrectos:
+                filas_incorrectas.append(len(data))
             nombre = socio.FAMNom or ''
             if len(nombre) > 40:
                 nombre = nombre[:37] + '...'
@@ -472,7 +440,7 @@ class PdfGeneratorTabular:
                 nombre,
                 socio.FAMNIF or '',
                 socio.FAMIBAN or '',
-                f"{float(socio.FAMQuota or 0):.2f}"
+                f"{socio.FAMQuota or 0:.2f}"
             ]
             data.append(row)
         
@@ -491,46 +459,40 @@ class PdfGeneratorTabular:
         # Crear tabla
         table = Table(data, colWidths=col_widths, repeatRows=1)
         
-        # Estilo
-        table_style = TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 7),
-            
-            # Datos
-            ('BACKGROUND', (0, 1), (-1, -2), colors.white),
-            ('ALIGN', (0, 1), (0, -2), 'CENTER'),  # ID
-            ('ALIGN', (4, 1), (4, -2), 'RIGHT'),   # Cuota
-            ('ALIGN', (1, 1), (3, -2), 'LEFT'),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 7),
-            
-            # Fila de total
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#ecf0f1')),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, -1), (-1, -1), 9),
-            ('ALIGN', (3, -1), (3, -1), 'RIGHT'),
-            ('ALIGN', (4, -1), (4, -1), 'RIGHT'),
-            
-            # Bordes
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#3498db')),
-            ('LINEABOVE', (0, -1), (-1, -1), 1.5, colors.black),
-            
-            # Filas alternadas
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.white, colors.HexColor('#ebf5fb')])
+        # Estilo (socios con datos incorrectos en rojo)
+        table_style = tabla_con('sepa', [
+            ('TEXTCOLOR', (0, fila), (-1, fila), colors.HexColor('#c0392b'))
+            for fila in filas_incorrectas
         ])
         
         table.setStyle(table_style)
         story.append(table)
         
+        # Resumen de datos incorrectos
+        if incidencias:
+            story.append(Spacer(1, 0.5*cm))
+            story.append(Paragraph(
+                f'<b>Dades incorrectes:</b> {len(incidencias)} '
+                f'({len(famids_incorrectos)} socis). Cal corregir-les abans d\'enviar la remesa.',
+                self.styles['SubtituloCustom']
+            ))
+            data_incidencias = [['ID', 'Nom', 'Camp', 'Valor', 'Motiu']] + [
+                [i.famid, (i.nombre or '')[:30], i.campo, str(i.valor), i.motivo]
+                for i in incidencias
+            ]
+            table_incidencias = Table(
+                data_incidencias,
+                colWidths=[1.0*cm, 4.5*cm, 2.0*cm, 5.0*cm, 5.0*cm],
+                repeatRows=1
+            )
+            table_incidencias.setStyle(tabla('incidencias'))
+            story.append(table_incidencias)
+        
         # Generar PDF
         doc.build(story)
-        print(f"✓ Reporte SEPA generado: {filepath}")
+        log.info("Reporte SEPA generado: %s", filepath)
+        if incidencias:
+            log.warning("%d datos bancarios/fiscales incorrectos en la remesa", len(incidencias))
 
 
 # Para mantener compatibilidad con código existente
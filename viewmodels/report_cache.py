@@ -0,0 +1,184 @@
+import os
+import time
+import atexit
+import logging
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from utils.instrumentacion import contar
+
+log = logging.getLogger(__name__)
+
+# Carpeta y tamaño máximo de la caché de informes
+CACHE_DIR = os.getenv('REPORT_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'cojub_informes')
+CACHE_MAX_MB = int(os.getenv('REPORT_CACHE_MB', 200))
+# Carpetas de sesiones que no se cerraron bien (se borran pasado este tiempo)
+SESION_ABANDONADA_SEGONS = 24 * 3600
+
+
+class ReportCache:
+    """
+    Caché de informes generados, indexada por el contenido de sus datos.
+
+    La clave es un hash del tipo de informe, sus opciones y la copia de los
+    socios usada; si nada ha cambiado, el PDF se copia de la caché en lugar
+    de volver a generarlo. Al llenarse se eliminan primero los informes
+    usados hace más tiempo.
+
+    La caché solo dura una sesión: cada instancia de la aplicación usa su
+    propia subcarpeta, que se borra al salir, así que otra instancia en el
+    mismo equipo nunca elimina un informe que esta esté copiando.
+
+    Si el informe imprime la fecha de generación, esa fecha debe formar
+    parte de las opciones de la clave para no devolver un PDF con una
+    fecha antigua.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.base_directory = directory
+        self._purge_abandoned()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix='sessio-', dir=directory)
+        self.max_bytes = max_bytes
+        # Los informes se generan en hilos de trabajo
+        self._lock = threading.Lock()
+        # Claves ya calculadas para los datos actuales: (tipo, opciones) -> clave
+        self._keys = {}
+        self._generation = 0
+        atexit.register(self.close)
+
+    def _purge_abandoned(self):
+        """Borra las carpetas de sesiones antiguas que no se cerraron."""
+        if not os.path.isdir(self.base_directory):
+            return
+        limite = time.time() - SESION_ABANDONADA_SEGONS
+        for entry in os.scandir(self.base_directory):
+            if entry.name.startswith('sessio-') and entry.is_dir() and entry.stat().st_mtime < limite:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def close(self):
+        """Borra la carpeta de esta sesión."""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    @property
+    def generation(self):
+        """Versión de los datos; cambia con cada invalidate()."""
+        with self._lock:
+            return self._generation
+
+    def key(self, tipo, socis, generation=None, **opciones):
+        """
+        Clave de un informe.
+
+        El hash de los socios se calcula una sola vez mientras los datos no
+        cambien (ver invalidate()).
+
+        Args:
+            tipo (str): Tipo de informe ('general', 'bancari', 'etiquetes'...)
+            socis: Socios que entran en el informe, en su orden
+            generation (int): Versión de los datos (generation) cuando se
+                copiaron los socios; si ya no es la actual, no se usa ni se
+                guarda la clave recordada
+            **opciones: Resto de parámetros que cambian el resultado
+        """
+        memo = (tipo, repr(sorted(opciones.items())))
+        with self._lock:
+            if generation is None:
+                generation = self._generation
+            key = self._keys.get(memo) if generation == self._generation else None
+        if key is not None:
+            return key
+
+        h = hashlib.sha256()
+        h.update(tipo.encode('utf-8'))
+        h.update(memo[1].encode('utf-8'))
+        for socio in socis:
+            h.update(repr(tuple(socio)).encode('utf-8'))
+            h.update(b'\x1e')
+        key = h.hexdigest()
+        with self._lock:
+            # Si los datos han cambiado mientras se calculaba, no se recuerda
+            if generation == self._generation:
+                self._keys[memo] = key
+        return key
+
+    def invalidate(self):
+        """
+        Olvida las claves calculadas (los datos han cambiado).
+
+        Los informes guardados no se borran: su clave depende del contenido,
+        así que siguen sirviendo si los datos vuelven a coincidir, y el
+        límite de tamaño ya elimina los que no se usan.
+        """
+        with self._lock:
+            self._keys.clear()
+            self._generation += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pdf')
+
+    def get(self, key, filepath):
+        """
+        Copia el informe de la caché a filepath si existe.
+
+        Returns:
+            bool: True si estaba en la caché
+        """
+        with self._lock:
+            cached = self._path(key)
+            if not os.path.exists(cached):
+                return False
+            shutil.copyfile(cached, filepath)
+            os.utime(cached)  # Marca de último uso para el orden de expulsión
+            return True
+
+    def put(self, key, filepath):
+        """Guarda en la caché un informe recién generado."""
+        with self._lock:
+            temporal = self._path(key) + '.tmp'
+            shutil.copyfile(filepath, temporal)
+            os.replace(temporal, self._path(key))
+            self._evict()
+
+    def _evict(self):
+        """Elimina los informes menos usados hasta quedar bajo el límite."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def cached(self, key, filepath, generate):
+        """
+        Devuelve el informe de la caché o lo genera y lo guarda.
+
+        Args:
+            key (str): Clave de ReportCache.key()
+            filepath (str): Ruta de destino
+            generate (callable): generate() escribe el informe en filepath
+                y devuelve True si ha ido bien
+
+        Returns:
+            bool: Resultado de generate(), o True si venía de la caché
+        """
+        if self.get(key, filepath):
+            log.info("Informe sin cambios, recuperado de la caché: %s", filepath)
+            contar('informes.cache')
+            return True
+        ok = generate()
+        if ok and os.path.exists(filepath):
+            self.put(key, filepath)
+        return ok
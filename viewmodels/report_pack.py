@@ -0,0 +1,139 @@
+import os
+import logging
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .socio_store import famid_key
+
+log = logging.getLogger(__name__)
+
+# Informes del paquete: clave -> (nombre para mostrar, fichero de salida)
+INFORMES = {
+    'general': ("Llistat general", "llistat_general.pdf"),
+    'bancari': ("Dades bancàries", "llistat_bancari.pdf"),
+    'sepa_pdf': ("Informe remesa SEPA", "informe_sepa.pdf"),
+    'etiquetes': ("Etiquetes", "etiquetes_socis.pdf"),
+    'sepa_xml': ("Remesa SEPA (XML)", "remesa_sepa.xml"),
+}
+
+
+def _safe_text(value):
+    return str(value).strip().lower() if value is not None else ""
+
+
+def ordenar_socis(socis, orden_alfabetic=True):
+    """
+    Ordena los socios para el listado general.
+
+    Args:
+        socis: Socios a ordenar
+        orden_alfabetic: True por nombre y dirección, False por número de socio
+    """
+    if orden_alfabetic:
+        return sorted(
+            socis,
+            key=lambda s: (_safe_text(s.FAMNom), _safe_text(s.FAMAdressa), _safe_text(s.FAMID))
+        )
+    return sorted(socis, key=lambda s: _safe_text(s.FAMID))
+
+
+def _generar_informe(clave, socis, socis_map, dades, ruta, orden_alfabetic):
+    """
+    Genera un informe del paquete (se ejecuta en un proceso del pool).
+
+    Returns:
+        dict: {'informe', 'ruta', 'segons', 'ok', 'error'}
+    """
+    inicio = time.perf_counter()
+    resultado = {'informe': clave, 'ruta': ruta, 'ok': True, 'error': None}
+    try:
+        # Importados aquí: la vista usa INFORMES sin cargar ReportLab
+        from .pdf_generator import PdfGeneratorTabular
+        from .etiquetas_generator import generar_etiquetas_socios
+        from utils.sepa_planner import planificar_remesa, generar_remesa
+
+        if clave == 'general':
+            actius = ordenar_socis([s for s in socis if not s.bBaixa], orden_alfabetic)
+            generator = PdfGeneratorTabular()
+            generator.dades = dades
+            generator.generate_general_report(actius, socis_map, ruta)
+        elif clave == 'bancari':
+            generator = PdfGeneratorTabular()
+            generator.dades = dades
+            generator.generate_banking_report([s for s in socis if not s.bBaixa], socis_map, ruta)
+        elif clave == 'sepa_pdf':
+            PdfGeneratorTabular().generate_sepa_report(socis, dades, ruta)
+        elif clave == 'etiquetes':
+            resultado['ok'] = bool(generar_etiquetas_socios(socis, ruta))
+        elif clave == 'sepa_xml':
+            domiciliats = [s for s in socis if s.FAMbPagamentDomiciliat and not s.bBaixa]
+            manifiesto = generar_remesa(dades, planificar_remesa(dades, domiciliats), ruta)
+            resultado['ruta'] = manifiesto['ruta']
+        else:
+            raise ValueError(f"Informe desconocido: {clave}")
+    except Exception as e:
+        resultado['ok'] = False
+        resultado['error'] = str(e)
+    resultado['segons'] = time.perf_counter() - inicio
+    return resultado
+
+
+def generar_paquet(dades, socis, socis_map, carpeta, orden_alfabetic=True,
+                   informes=None, max_workers=None, progreso=None):
+    """
+    Genera varios informes a la vez a partir de una misma copia de los socios.
+
+    Cada informe se genera en un proceso distinto (ReportLab consume CPU y
+    en hilos no se aprovecharían varios núcleos). Un error en un informe no
+    detiene los demás.
+
+    Args:
+        dades: Datos de configuración (G_Dades)
+        socis: Socios (se toma una copia al empezar)
+        socis_map: Mapa FAMID -> nombre
+        carpeta (str): Carpeta de salida
+        orden_alfabetic (bool): Orden del listado general
+        informes (list): Claves de INFORMES a generar (por defecto, todas)
+        max_workers (int): Procesos (por defecto, uno por informe hasta el nº de CPUs)
+        progreso (callable): progreso(hechos, total, resultado) al acabar cada informe
+
+    Returns:
+        dict: {'resultats': [...], 'segons': total} con el tiempo de cada informe
+    """
+    informes = list(informes or INFORMES)
+    os.makedirs(carpeta, exist_ok=True)
+
+    # Copia de los datos: los procesos reciben objetos que se pueden serializar
+    snapshot = list(socis)
+    noms = {famid_key(famid): nom for famid, nom in socis_map.items()}
+    max_workers = max_workers or min(len(informes), os.cpu_count() or 1)
+
+    inicio = time.perf_counter()
+    resultats = []
+    # spawn y no fork: el proceso de la aplicación tiene hilos de Qt, bloqueos
+    # y el log rotativo abiertos, que un fork copiaría a medias en cada hijo.
+    # Por eso _generar_informe debe poder importarse desde este módulo.
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto) as executor:
+        futures = [
+            executor.submit(
+                _generar_informe, clave, snapshot, noms, dades,
+                os.path.join(carpeta, INFORMES[clave][1]), orden_alfabetic
+            )
+            for clave in informes
+        ]
+        for future in as_completed(futures):
+            resultado = future.result()
+            resultats.append(resultado)
+            if progreso:
+                progreso(len(resultats), len(futures), resultado)
+
+    total = time.perf_counter() - inicio
+    resultats.sort(key=lambda r: informes.index(r['informe']))
+    for r in resultats:
+        estado = "✓" if r['ok'] else f"✗ {r['error']}"
+        log.info("  %-22s %6.2f s  %s", INFORMES[r['informe']][0], r['segons'], estado,
+                 extra={'informe': r['informe'], 'segons': round(r['segons'], 3)})
+    log.info("Paquete de informes generado en %.2f s", total)
+    return {'resultats': resultats, 'segons': total}
@@ -0,0 +1,143 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+from .socio_store import famid_key
+
+# Campos del socio que entran en la búsqueda
+SEARCH_FIELDS = (
+    'FAMID', 'FAMNom', 'FAMNIF', 'FAMAdressa', 'FAMPoblacio', 'FAMCodPos',
+    'FAMTelefon', 'FAMMobil', 'FAMTelefonEmergencia', 'FAMEmail',
+)
+PHONE_FIELDS = ('FAMTelefon', 'FAMMobil', 'FAMTelefonEmergencia')
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    """Pasa un texto a minúsculas y sin acentos (Àngels -> angels)."""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Índice de búsqueda de texto sobre los socios.
+
+    Cada socio se guarda como un texto normalizado (sin acentos, minúsculas,
+    teléfonos también sin espacios). Los términos de 3 o más caracteres se
+    buscan por trigramas y se confirman sobre ese texto; los más cortos, por
+    prefijo de palabra. Todos los términos de la consulta deben aparecer.
+    """
+
+    # Por debajo de este número de candidatos se verifica término a término
+    VERIFY_LIMIT = 200
+
+    def __init__(self):
+        self._text = {}        # famid -> texto normalizado
+        self._trigrams = {}    # trigrama -> {famid}
+        self._tokens = {}      # palabra -> {famid}
+        self._sorted_tokens = []
+
+    def build(self, socis):
+        """Reconstruye el índice completo."""
+        self.__init__()
+        for socio in socis:
+            self.add(socio)
+
+    def _document(self, socio):
+        parts = [fold(getattr(socio, field, None)) for field in SEARCH_FIELDS]
+        # FAMID también sin ceros a la izquierda ("12" encuentra "00012")
+        parts.append(famid_key(socio.FAMID).lstrip('0'))
+        # Teléfonos también sin separadores, para buscar "931234" en "93 123 45 67"
+        for field in PHONE_FIELDS:
+            digits = re.sub(r'\D', '', getattr(socio, field, None) or "")
+            if digits:
+                parts.append(digits)
+        return ' '.join(p.strip() for p in parts if p)
+
+    def add(self, socio):
+        """Añade o sustituye un socio en el índice."""
+        key = famid_key(socio.FAMID)
+        self.remove(key)
+
+        text = self._document(socio)
+        self._text[key] = text
+        for gram in _trigrams(text):
+            self._trigrams.setdefault(gram, set()).add(key)
+        for token in set(_TOKEN_RE.findall(text)):
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = set()
+                insort(self._sorted_tokens, token)
+            postings.add(key)
+
+    def remove(self, famid):
+        """Quita un socio del índice."""
+        key = famid_key(famid)
+        text = self._text.pop(key, None)
+        if text is None:
+            return
+        for gram in _trigrams(text):
+            postings = self._trigrams.get(gram)
+            if postings:
+                postings.discard(key)
+        # Las palabras vacías se quedan en _sorted_tokens; se ignoran al buscar
+        for token in set(_TOKEN_RE.findall(text)):
+            postings = self._tokens.get(token)
+            if postings:
+                postings.discard(key)
+
+    def _prefix(self, term):
+        found = set()
+        tokens = self._sorted_tokens
+        i = bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            found |= self._tokens[tokens[i]]
+            i += 1
+        return found
+
+    def _substring(self, term):
+        postings = [self._trigrams.get(gram) for gram in _trigrams(term)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {key for key in candidates if term in self._text[key]}
+
+    def search(self, query):
+        """
+        Busca los socios que contienen todos los términos de la consulta.
+
+        Returns:
+            set: FAMIDs (normalizados) que coinciden, o None si la consulta
+            está vacía (sin filtro).
+        """
+        terms = fold(query).split()
+        if not terms:
+            return None
+
+        result = None
+        # Primero los términos más largos: son los más selectivos
+        for term in sorted(terms, key=len, reverse=True):
+            if result is not None and len(result) <= self.VERIFY_LIMIT:
+                # Pocos candidatos: es más rápido comprobarlos sobre el texto
+                result = {key for key in result if self._matches(key, term)}
+            else:
+                hits = self._substring(term) if len(term) >= 3 else self._prefix(term)
+                result = hits if result is None else result & hits
+            if not result:
+                return set()
+        return result
+
+    def _matches(self, key, term):
+        text = self._text[key]
+        if len(term) >= 3:
+            return term in text
+        return re.search(r'(?<![a-z0-9])' + re.escape(term), text) is not None
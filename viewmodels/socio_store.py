@@ -0,0 +1,162 @@
+from collections.abc import Mapping
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+def famid_key(famid):
+    """Clave normalizada de un FAMID (CHAR(5) viene con espacios de relleno)."""
+    return (famid or "").strip()
+
+
+class SocioNameMap(Mapping):
+    """
+    Vista de solo lectura FAMID -> nombre sobre el almacén.
+
+    Acepta FAMIDs con o sin espacios de relleno, así que sirve para resolver
+    FAMSociReferencia directamente (p. ej. en los informes).
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, famid):
+        socio = self._store.get(famid)
+        if socio is None:
+            raise KeyError(famid)
+        return socio.FAMNom
+
+    def __iter__(self):
+        return (s.FAMID for s in self._store.socis())
+
+    def __len__(self):
+        return len(self._store)
+
+
+class SocioStore(QObject):
+    """
+    Almacén en memoria de los socios, indexado por FAMID.
+
+    Permite aplicar un cambio de una sola fila sin recargar toda la tabla;
+    las señales indican la posición de la fila afectada para que la vista
+    repinte solo esa fila. Las señales about_to_* se emiten antes de
+    modificar la lista (lo que exige el contrato de los modelos de Qt) y
+    las demás, después.
+
+    Además del índice por FAMID mantiene el índice inverso de parejas
+    (qué socios tienen a un FAMID como FAMSociReferencia).
+    """
+    about_to_reset = pyqtSignal()
+    reset = pyqtSignal()
+    row_about_to_be_inserted = pyqtSignal(int, str)
+    row_inserted = pyqtSignal(int, str)
+    row_updated = pyqtSignal(int, str)
+    row_about_to_be_removed = pyqtSignal(int, str)
+    row_removed = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._index = {}
+        self._referenced_by = {}
+        self.names = SocioNameMap(self)
+
+    def load(self, socis):
+        """Sustituye todo el contenido (carga inicial o recarga completa)."""
+        socis = list(socis)
+        self.about_to_reset.emit()
+        self._rows = socis
+        self._reindex()
+        self._referenced_by = {}
+        for socio in self._rows:
+            self._add_ref(socio)
+        self.reset.emit()
+
+    def _add_ref(self, socio):
+        ref = famid_key(socio.FAMSociReferencia)
+        if ref:
+            self._referenced_by.setdefault(ref, set()).add(famid_key(socio.FAMID))
+
+    def _remove_ref(self, socio):
+        ref = famid_key(socio.FAMSociReferencia)
+        keys = self._referenced_by.get(ref)
+        if keys:
+            keys.discard(famid_key(socio.FAMID))
+            if not keys:
+                del self._referenced_by[ref]
+
+    def _reindex(self, start=0):
+        if start == 0:
+            self._index = {}
+        for row in range(start, len(self._rows)):
+            self._index[famid_key(self._rows[row].FAMID)] = row
+
+    def socis(self):
+        """Devuelve la lista de socios en el orden de carga."""
+        return self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, famid):
+        return famid_key(famid) in self._index
+
+    def get(self, famid):
+        """Devuelve el socio con ese FAMID o None."""
+        row = self._index.get(famid_key(famid))
+        return self._rows[row] if row is not None else None
+
+    def name_of(self, famid):
+        """Nombre del socio con ese FAMID, o cadena vacía."""
+        socio = self.get(famid)
+        return socio.FAMNom if socio else ""
+
+    def referencing(self, famid):
+        """Socios que tienen a este FAMID como pareja (FAMSociReferencia)."""
+        keys = self._referenced_by.get(famid_key(famid), ())
+        return [self._rows[self._index[k]] for k in keys if k in self._index]
+
+    def row_of(self, famid):
+        """Posición del socio en el almacén, o None si no está."""
+        return self._index.get(famid_key(famid))
+
+    def upsert(self, socio):
+        """Inserta o actualiza un socio y emite la señal correspondiente."""
+        key = famid_key(socio.FAMID)
+        row = self._index.get(key)
+        if row is None:
+            row = len(self._rows)
+            self.row_about_to_be_inserted.emit(row, key)
+            self._rows.append(socio)
+            self._index[key] = row
+            self._add_ref(socio)
+            self.row_inserted.emit(row, key)
+        else:
+            self._remove_ref(self._rows[row])
+            self._rows[row] = socio
+            self._add_ref(socio)
+            self.row_updated.emit(row, key)
+
+    def remove(self, famid):
+        """Quita un socio del almacén (p. ej. al cambiarle el FAMID)."""
+        key = famid_key(famid)
+        row = self._index.get(key)
+        if row is None:
+            return
+        self.row_about_to_be_removed.emit(row, key)
+        del self._index[key]
+        self._remove_ref(self._rows[row])
+        del self._rows[row]
+        self._reindex(row)
+        self.row_removed.emit(row, key)
+
+    def apply(self, removed=(), socis=()):
+        """
+        Aplica un lote de cambios leídos de la BD.
+
+        Args:
+            removed: FAMIDs que ya no existen
+            socis: Filas nuevas o actualizadas
+        """
+        for famid in removed:
+            self.remove(famid)
+        for socio in socis:
+            self.upsert(socio)
@@ -0,0 +1,138 @@
+import threading
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """Se lanza dentro de una tarea cuando el usuario la ha cancelado."""
+
+
+class TaskSignals(QObject):
+    """
+    Señales de una tarea en segundo plano.
+
+    Se emiten desde el hilo de trabajo y Qt las entrega en el hilo de la
+    interfaz, así que los slots conectados pueden tocar widgets.
+    """
+    started = pyqtSignal()
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    """
+    Unidad de trabajo que se ejecuta fuera del hilo de la interfaz.
+
+    La función recibe la propia tarea como primer argumento para poder
+    informar del progreso (report_progress) y comprobar si se ha pedido
+    cancelarla (check_cancelled).
+    """
+
+    def __init__(self, fn, *args, description="", **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.description = description
+        self.signals = TaskSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Pide la cancelación; la tarea se detiene en el siguiente punto de control."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Punto de control: interrumpe la tarea si se ha cancelado."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, percent, message=""):
+        """Informa del progreso (0-100) a la interfaz."""
+        self.signals.progress.emit(int(percent), message or self.description)
+
+    def run(self):
+        self.signals.started.emit()
+        try:
+            self.check_cancelled()
+            result = self.fn(self, *self.args, **self.kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+        else:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """
+    Lanza tareas en un QThreadPool y mantiene el estado global de ocupación.
+
+    Cada hilo del pool obtiene su propia conexión del pool de base de datos,
+    así que conviene no superar SQL_POOL_SIZE hilos.
+    """
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(int, str)
+
+    def __init__(self, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(max_threads)
+        self._active = set()
+
+    def submit(self, fn, *args, on_finished=None, on_error=None, on_cancelled=None,
+               description="", **kwargs):
+        """
+        Ejecuta fn(task, *args, **kwargs) en segundo plano.
+
+        Los callbacks se llaman en el hilo de la interfaz.
+
+        Returns:
+            Task: La tarea lanzada (permite cancelarla)
+        """
+        task = Task(fn, *args, description=description, **kwargs)
+
+        task.signals.progress.connect(self.progress)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        if on_error:
+            task.signals.error.connect(on_error)
+        if on_cancelled:
+            task.signals.cancelled.connect(on_cancelled)
+        for signal in (task.signals.finished, task.signals.error, task.signals.cancelled):
+            signal.connect(lambda *_, t=task: self._on_task_done(t))
+
+        was_busy = self.is_busy()
+        self._active.add(task)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        self.progress.emit(0, description)
+
+        self.thread_pool.start(task)
+        return task
+
+    def _on_task_done(self, task):
+        self._active.discard(task)
+        if not self._active:
+            self.busy_changed.emit(False)
+
+    def is_busy(self):
+        return bool(self._active)
+
+    def cancel_all(self):
+        """Pide la cancelación de todas las tareas en curso."""
+        for task in list(self._active):
+            task.cancel()
+
+    def wait_for_done(self, msecs=-1):
+        """Espera a que terminen las tareas (útil al cerrar la aplicación)."""
+        return self.thread_pool.waitForDone(msecs)
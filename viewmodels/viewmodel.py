@@ -1,46 +1,28 @@
+import os
+import logging
+import sqlite3
 import pyodbc
-from PyQt6.QtCore import QObject, pyqtSignal
-from datetime import datetime
 from collections import namedtuple
-from utils.sepa_lib import generar_xml_sepa
-from .pdf_generator import PdfGenerator,PdfGeneratorTabular
-from .report_generator import ReportGenerator
-from .etiquetas_generator import generar_etiquetas_socios
-
-# ============================================================================
-# ESTRUCTURA CORREGIDA - 22 campos (DEBE COINCIDIR CON model.py)
-# ============================================================================
-Socio = namedtuple('Socio', [
-    'FAMID',
-    'FAMNom',
-    'FAMAdressa',
-    'FAMPoblacio',
-    'FAMCodPos',
-    'FAMTelefon',
-    'FAMMobil',
-    'FAMEmail',
-    'FAMDataAlta',
-    'FAMIBAN',
-    'FAMBIC',
-    'bBaixa',
-    'FAMObservacions',
-    'FAMNIF',
-    'FAMDataNaixement',
-    'FAMQuota',
-    'FAMDataBaixa',
-    'FAMSexe',
-    'FAMSociReferencia',
-    'FAMbPagamentDomiciliat',
-    'FAMbRebutCobrat',
-    'FAMPagamentFinestreta',
-    'FAMTelefonEmergencia'
-])
-
-Dades = namedtuple('Dades', [
-    'Presentador', 'CIFPresentador', 'Ordenant', 'CIFOrdenant',
-    'IBANPresentador', 'BICPresentador', 'QuotaSocis',
-    'SufixeRebuts', 'TexteRebutFinestreta'
-])
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from datetime import datetime
+from utils.validacion import ErrorValidacion
+from utils.instrumentacion import span, contar_fichero, metricas
+from models.model import Dades, is_connection_error
+# Los generadores de PDF y SEPA (ReportLab, XML) se importan al usarlos por
+# primera vez: no hacen falta para abrir la ventana
+from .report_pack import generar_paquet, ordenar_socis
+from .report_cache import ReportCache
+from .tasks import TaskRunner
+from .socio_store import SocioStore, famid_key
+from .search_index import SearchIndex
+
+log = logging.getLogger(__name__)
+
+# Segundos entre consultas de cambios hechos por otros usuarios (0 = desactivado)
+REFRESH_INTERVAL = int(os.getenv('COJUB_REFRESH_SEGONS', 30))
+
+# Copia de los datos con la que se genera un informe en segundo plano
+Instantanea = namedtuple('Instantanea', ['socis', 'socis_map', 'dades', 'generation'])
 
 class ViewModel(QObject):
     """
@@ -49,55 +31,537 @@ class ViewModel(QObject):
     """
     socis_changed = pyqtSignal()
     dades_changed = pyqtSignal()
+    task_error = pyqtSignal(str)
+    # Actividades cuyas inscripciones ha cambiado otro usuario ({activitat_id})
+    inscripcions_changed = pyqtSignal(object)
+    # True si el servidor no responde (se muestran los datos de la copia local)
+    offline_changed = pyqtSignal(bool)
 
-    def __init__(self, model):
+    def __init__(self, model, cache=None):
         super().__init__()
         self.model = model
-        self.all_socis = []
-        self.filtered_socis = []
-        self.socis_map = {}  # Diccionario para buscar socios por ID
+        # Copia local (CacheLocal) para arrancar al instante y trabajar sin conexión
+        self.cache = cache
+        self.offline = False
+        self.cached_at = None
+        self.store = SocioStore()
+        self.socis_map = self.store.names  # FAMID -> nombre (índice compartido)
         self.dades = None
         self.selected_socio = None
         self.search_text = ""
+        self.search_index = SearchIndex()
+        self._search_hits = None  # FAMIDs que coinciden con search_text (None = sin filtro)
         self.filter_finestreta_enabled = False
         self.filter_baixa_enabled = False
+        # Tareas en segundo plano (BD e informes fuera del hilo de la interfaz)
+        self.tasks = TaskRunner()
+        # Informes ya generados; se vacía en cuanto cambia cualquier dato
+        self.report_cache = ReportCache()
+        self.store.reset.connect(self._invalidate_reports)
+        self.store.row_inserted.connect(self._invalidate_reports)
+        self.store.row_updated.connect(self._invalidate_reports)
+        self.store.row_removed.connect(self._invalidate_reports)
+        self.dades_changed.connect(self._invalidate_reports)
+        # Refresco incremental: marca de la última sincronización con la BD
+        # (None si la BD no admite el seguimiento de cambios)
+        self._sync_token = None
+        # Firma de las inscripciones por actividad en el último refresco
+        # (detecta las bajas, que no dejan ROWVERSION)
+        self._inscripcions_firma = None
+        self._poller = TaskRunner(max_threads=1)  # Sin barra de progreso
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.timeout.connect(self.refresh_changes_async)
+
+    def _invalidate_reports(self, *args):
+        """Recalcula las claves de los informes (los socios o la configuración han cambiado)."""
+        self.report_cache.invalidate()
+
+    def instantanea(self):
+        """
+        Copia de socios, nombres y configuración para generar un informe.
+
+        Debe tomarse en el hilo de la interfaz: mientras el informe se genera
+        en segundo plano, los refrescos siguen cambiando los datos en vivo.
+        """
+        return Instantanea(
+            list(self.all_socis), dict(self.socis_map), self.dades,
+            self.report_cache.generation
+        )
+
+    def generate_report_async(self, generate, *args, on_done=None, description=""):
+        """
+        Ejecuta generate(*args, instantanea=...) en segundo plano con una copia
+        de los datos tomada ahora.
+        """
+        return self.run_async(
+            generate, *args, instantanea=self.instantanea(),
+            on_done=on_done, description=description
+        )
+
+    def _cached_report(self, tipo, filepath, generate, instantanea, **opciones):
+        """
+        Genera un informe o lo copia de la caché si sus datos no han cambiado.
+
+        La clave incluye todos los socios y la configuración de la instantánea,
+        además de las opciones propias del informe.
+        """
+        dades = instantanea.dades
+        with span(f"informe.{tipo}", nivel=logging.INFO, socis=len(instantanea.socis)) as datos:
+            key = self.report_cache.key(
+                tipo, instantanea.socis, generation=instantanea.generation,
+                dades=tuple(dades) if dades else None, **opciones
+            )
+            ok = self.report_cache.cached(key, filepath, generate)
+            datos['bytes'] = contar_fichero('informes.bytes', filepath) if ok else 0
+            return ok
+
+    @property
+    def all_socis(self):
+        """Todos los socios cargados (sin filtrar)."""
+        return self.store.socis()
 
     def load_data(self):
         """Carga todos los datos de socios y de configuración del modelo."""
-        self.all_socis = self.model.get_all_socis()
-        self.dades = self.model.get_dades()
-        # Crear el mapa de socios para búsquedas rápidas
-        self.socis_map = {socio.FAMID: socio.FAMNom for socio in self.all_socis}
-        self.update_filtered_socis()
-        self.dades_changed.emit()
+        self._apply_data(self._fetch_data())
+
+    def _fetch_data(self, task=None):
+        """Lee socios y configuración de la BD (apto para el hilo de trabajo)."""
+        with span('vm.carrega_completa', nivel=logging.INFO) as datos:
+            token = self._start_sync()
+            socis = self.model.get_all_socis()
+            datos['socis'] = len(socis)
+            if task:
+                task.report_progress(60, "Carregant configuració...")
+                task.check_cancelled()
+            dades = self.model.get_dades()
+            self._save_cache('save', socis, dades, token)
+            return socis, dades, token
+
+    def _save_cache(self, method, *args):
+        """Actualiza la copia local; un fallo del disco no interrumpe la carga."""
+        if self.cache is None:
+            return
+        try:
+            getattr(self.cache, method)(*args)
+        except sqlite3.Error as ex:
+            log.warning("No se ha podido guardar la copia local: %s", ex)
+
+    def _start_sync(self):
+        """
+        Prepara el refresco incremental antes de leer todos los socios.
+
+        Returns:
+            bytes: Marca de sincronización, o None si la BD no lo admite
+        """
+        try:
+            if not self.model.has_change_tracking():
+                log.info("Sin columna ROWVERSION (migracion_rowversion.py): "
+                         "el refresco automático recarga todos los socios")
+                return None
+            return self.model.get_sync_token()
+        except pyodbc.Error as ex:
+            log.warning("Refresco automático desactivado: %s", ex)
+            return None
+
+    def _apply_data(self, data):
+        """Publica los datos leídos; debe llamarse en el hilo de la interfaz."""
+        socis, self.dades, self._sync_token = data
+        self.cached_at = datetime.now().isoformat(timespec='seconds')
+        # Índice de búsqueda, almacén y tabla (la vista se repinta con las señales)
+        with span('vm.omplir_taula', nivel=logging.INFO, socis=len(socis)):
+            self.search_index.build(socis)
+            self._search_hits = self.search_index.search(self.search_text)
+            self.store.load(socis)
+            self._refresh_selected()
+            self.update_filtered_socis()
+            self.dades_changed.emit()
+
+    def _fetch_socis(self, famids):
+        """Relee de la BD solo los socios indicados."""
+        socis = []
+        for famid in famids:
+            socio = self.model.get_socio(famid)
+            if socio:
+                socis.append(socio)
+        return socis
+
+    def _apply_changes(self, removed, socis):
+        """
+        Aplica al almacén las filas releídas tras una escritura, sin recargar
+        toda la tabla. Debe llamarse en el hilo de la interfaz.
+        """
+        # El índice de búsqueda se actualiza antes que el almacén para que el
+        # proxy de la tabla filtre las filas cambiadas con los resultados nuevos
+        for famid in removed:
+            self.search_index.remove(famid)
+        for socio in socis:
+            self.search_index.add(socio)
+        self._search_hits = self.search_index.search(self.search_text)
+
+        self.store.apply(removed, socis)
+
+        # La vista se actualiza por las señales del almacén (solo esas filas)
+        self._refresh_selected()
+
+    def _refresh_selected(self):
+        """Sustituye el socio seleccionado por su versión actual del almacén."""
+        if self.selected_socio:
+            self.selected_socio = self.store.get(self.selected_socio.FAMID)
+
+    def _affected_by_save(self, data, original_fam_id):
+        """
+        Calcula qué filas cambian al guardar un socio.
+
+        Returns:
+            tuple: (FAMIDs eliminados, FAMIDs a releer)
+        """
+        new_id = famid_key(data[0])
+        old_id = famid_key(original_fam_id)
+        if not old_id or old_id == new_id:
+            return [], [new_id]
+
+        # Al renombrar, las parejas que apuntaban al ID antiguo también cambian
+        partners = [s.FAMID for s in self.store.referencing(old_id)]
+        return [old_id], [new_id] + partners
+
+    # ------------------------------------------------------------------
+    # Operaciones en segundo plano
+    # ------------------------------------------------------------------
+    def run_async(self, fn, *args, on_done=None, description="", **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) en el pool de hilos.
+
+        on_done(resultado) se llama en el hilo de la interfaz; los errores se
+        publican con la señal task_error.
+        """
+        def work(task):
+            return fn(*args, **kwargs)
+
+        return self.tasks.submit(
+            work,
+            on_finished=on_done,
+            on_error=self.task_error.emit,
+            description=description
+        )
+
+    def cancel_tasks(self):
+        """Cancela las tareas en curso."""
+        self.tasks.cancel_all()
+
+    def load_data_async(self, on_done=None):
+        """Recarga socios y configuración sin bloquear la interfaz."""
+        def work(task):
+            task.report_progress(10, "Carregant socis...")
+            return self._fetch_data(task)
+
+        def done(data):
+            self._apply_data(data)
+            if on_done:
+                on_done(True)
+
+        return self.tasks.submit(
+            work,
+            on_finished=done,
+            on_error=self.task_error.emit,
+            description="Carregant dades..."
+        )
+
+    # ------------------------------------------------------------------
+    # Arranque desde la copia local y modo sin conexión
+    # ------------------------------------------------------------------
+    def startup_async(self, on_done=None):
+        """
+        Muestra al instante la copia local de la última sesión (si la hay) y
+        después se pone al día con la BD en segundo plano; sin copia local,
+        hace la carga completa de siempre.
+        """
+        if not self._load_cached():
+            return self.load_data_async(on_done)
+        if self._sync_token is None:
+            return self._reload_async()
+        return self.refresh_changes_async()
+
+    def _load_cached(self):
+        """Publica los datos de la copia local. Devuelve False si no hay."""
+        if self.cache is None:
+            return False
+        try:
+            with span('vm.copia_local', nivel=logging.INFO):
+                data = self.cache.load(Dades)
+        except (sqlite3.Error, ValueError, TypeError) as ex:
+            log.warning("Copia local ilegible, se carga del servidor: %s", ex)
+            return False
+        if not data:
+            return False
+        socis, dades, token, cached_at = data
+        self._apply_data((socis, dades, token))
+        self.cached_at = cached_at
+        log.info("%d socios cargados de la copia local (%s)", len(socis), self.cached_at)
+        return True
+
+    def _set_offline(self, offline):
+        if offline != self.offline:
+            self.offline = offline
+            self.offline_changed.emit(offline)
+
+    def _poll(self, fetch, apply, description):
+        """
+        Ejecuta una consulta en el hilo de sondeo (sin barra de progreso).
+
+        Si el servidor no responde se pasa a modo sin conexión en lugar de
+        mostrar un error; se vuelve a intentar en el siguiente ciclo.
+        """
+        def work(task):
+            try:
+                return fetch()
+            except pyodbc.Error as ex:
+                if not is_connection_error(ex):
+                    raise
+                log.warning("Servidor no disponible: %s", ex.args[-1] if ex.args else ex)
+                return None
+
+        def done(result):
+            self._set_offline(result is None)
+            if result is not None:
+                self.cached_at = datetime.now().isoformat(timespec='seconds')
+                apply(result)
+
+        return self._poller.submit(
+            work,
+            on_finished=done,
+            # Un fallo puntual no se muestra: se reintenta en el siguiente ciclo
+            on_error=lambda msg: log.error("Error al comprobar cambios: %s", msg),
+            description=description
+        )
+
+    def _reload_async(self):
+        """Carga completa en el hilo de sondeo (BD sin seguimiento de cambios)."""
+        return self._poll(self._fetch_data, self._apply_reload, "Carregant dades...")
+
+    def _apply_reload(self, data):
+        """
+        Publica una recarga completa hecha por el refresco automático.
+
+        Con datos ya cargados solo se aplican al almacén las filas que han
+        cambiado, para no reiniciar la tabla (ni la selección) en cada ciclo.
+        """
+        socis, dades, token = data
+        if token is not None or not len(self.store):
+            return self._apply_data(data)
+        server = {famid_key(s.FAMID) for s in socis}
+        removed = sorted({famid_key(s.FAMID) for s in self.all_socis} - server)
+        changed = [s for s in socis if self.store.get(s.FAMID) != s]
+        if removed or changed:
+            log.info("Cambios de otros usuarios: %d socios actualizados, %d eliminados",
+                     len(changed), len(removed))
+            self._apply_changes(removed, changed)
+        if dades != self.dades:
+            self.dades = dades
+            self.dades_changed.emit()
+
+    # ------------------------------------------------------------------
+    # Refresco incremental (cambios de otros usuarios)
+    # ------------------------------------------------------------------
+    def start_auto_refresh(self, seconds=REFRESH_INTERVAL):
+        """Consulta periódicamente los cambios hechos desde otros equipos."""
+        if seconds > 0:
+            self._refresh_timer.start(seconds * 1000)
+
+    def stop_auto_refresh(self):
+        self._refresh_timer.stop()
+
+    def _fetch_changes(self, token, local):
+        """
+        Lee los cambios desde token (hilo de trabajo).
+
+        Las eliminaciones no dejan fila: si el total de socios del servidor no
+        cuadra con los conocidos, se comparan las listas de FAMID.
+
+        Returns:
+            tuple: (Cambios, FAMIDs eliminados, Dades)
+        """
+        with span('vm.refresc') as datos:
+            changes = self.model.get_changes(token)
+            known = local | {famid_key(s.FAMID) for s in changes.socis}
+            removed = []
+            if len(known) != changes.total_socis:
+                server = {
+                    famid_key(s.FAMID)
+                    for s in self.model.query_socis(include_baixa=True, columns=('FAMID',))
+                }
+                removed = sorted(local - server)
+            dades = self.model.get_dades()
+            datos.update(canviats=len(changes.socis), eliminats=len(removed))
+            return changes, removed, dades
+
+    def refresh_changes_async(self):
+        """
+        Aplica los socios e inscripciones que han cambiado otros usuarios
+        desde la última sincronización, sin recargar toda la tabla.
+        """
+        # Con otra lectura/escritura en curso se espera al siguiente ciclo
+        if self.tasks.is_busy() or self._poller.is_busy():
+            return None
+        if self._sync_token is None:
+            # Sin seguimiento de cambios (o sin conexión) se recarga todo
+            return self._reload_async()
+
+        token = self._sync_token
+        local = {famid_key(s.FAMID) for s in self.all_socis}
+
+        def apply(result):
+            changes, removed, dades = result
+            # Una carga completa durante la consulta ya trae una marca más nueva
+            if self._sync_token != token:
+                return
+            self._sync_token = changes.token
+            # La copia local solo recibe cambios que parten de su marca actual
+            self._save_cache('apply', removed, changes.socis, changes.token, dades)
+            # Las filas escritas desde este equipo ya están al día
+            socis = [s for s in changes.socis if self.store.get(s.FAMID) != s]
+            if socis or removed:
+                log.info("Cambios de otros usuarios: %d socios actualizados, %d eliminados", len(socis), len(removed))
+                self._apply_changes(removed, socis)
+            if dades != self.dades:
+                self.dades = dades
+                self.dades_changed.emit()
+            activitats = set(changes.activitats)
+            previous, self._inscripcions_firma = self._inscripcions_firma, changes.inscripcions
+            if previous is not None:
+                activitats |= {
+                    a for a in previous.keys() | changes.inscripcions.keys()
+                    if previous.get(a) != changes.inscripcions.get(a)
+                }
+            if activitats:
+                self.inscripcions_changed.emit(activitats)
+
+        return self._poll(
+            lambda: self._fetch_changes(token, local), apply, "Comprovant canvis..."
+        )
+
+    def _write_and_refresh(self, write, removed, famids, description, on_done):
+        """
+        Ejecuta una escritura en segundo plano y relee solo las filas afectadas
+        en el mismo hilo antes de volver a la interfaz.
+        """
+        def work(task):
+            task.report_progress(10, description)
+            if not write():
+                return None
+            task.report_progress(50, "Actualitzant llista...")
+            socis = self._fetch_socis(famids)
+            self._save_cache('apply', removed, socis)
+            return socis
+
+        def done(socis):
+            if socis is not None:
+                self._apply_changes(removed, socis)
+            if on_done:
+                on_done(socis is not None)
+
+        return self.tasks.submit(
+            work,
+            on_finished=done,
+            on_error=self.task_error.emit,
+            description=description
+        )
+
+    def save_socio_async(self, data, original_fam_id=None, on_done=None):
+        """Versión en segundo plano de save_socio; on_done(success)."""
+        removed, famids = self._affected_by_save(data, original_fam_id)
+        return self._write_and_refresh(
+            lambda: self._write_socio(data, original_fam_id),
+            removed, famids,
+            "Desant soci...",
+            on_done
+        )
+
+    def delete_selected_socio_async(self, on_done=None):
+        """Versión en segundo plano de delete_selected_socio; on_done(success)."""
+        if not self.selected_socio:
+            if on_done:
+                on_done(False)
+            return None
+        famid = self.selected_socio.FAMID
+        return self._write_and_refresh(
+            lambda: self.model.delete_socio(famid),
+            [], [famid],
+            "Eliminant soci...",
+            on_done
+        )
+
+    def save_dades_async(self, data, on_done=None):
+        """Versión en segundo plano de save_dades; on_done(success)."""
+        old_quota = self.dades.QuotaSocis if self.dades else None
+
+        def work(task):
+            task.report_progress(10, "Desant configuració...")
+            quota_changed = self._write_dades(data, old_quota)
+            if quota_changed is None:
+                return None
+            task.report_progress(50, "Actualitzant dades...")
+            return self._fetch_after_dades(quota_changed)
+
+        def done(result):
+            if result is not None:
+                self._apply_dades_result(result)
+            if on_done:
+                on_done(result is not None)
+
+        return self.tasks.submit(
+            work,
+            on_finished=done,
+            on_error=self.task_error.emit,
+            description="Desant configuració..."
+        )
+
+    def _fetch_after_dades(self, quota_changed):
+        """Relee G_Dades y, solo si la quota se ha replicado, todos los socios."""
+        if not quota_changed:
+            return None, self.model.get_dades(), None
+        return self._fetch_data()
+
+    def _apply_dades_result(self, result):
+        socis, dades, _ = result
+        if socis is not None:
+            self._apply_data(result)
+        else:
+            self.dades = dades
+            self.dades_changed.emit()
+
+    def accepts(self, socio):
+        """Indica si un socio pasa los filtros activos de la vista."""
+        # Filtro de baja (por defecto no se muestran los socios dados de baja)
+        if not self.filter_baixa_enabled and socio.bBaixa:
+            return False
+
+        # Filtro de pago por ventanilla
+        if self.filter_finestreta_enabled and not socio.FAMPagamentFinestreta:
+            return False
+
+        # Filtro de búsqueda de texto
+        if self._search_hits is not None:
+            return famid_key(socio.FAMID) in self._search_hits
+        return True
+
+    @property
+    def filtered_socis(self):
+        """Socios que pasan los filtros, en el orden del almacén."""
+        return [s for s in self.all_socis if self.accepts(s)]
 
     def update_filtered_socis(self):
-        """Aplica los filtros de búsqueda y otros a la lista de socios."""
-        socis = self.all_socis
-
-        # Aplicar filtro de baja (por defecto no se muestran los socios dados de baja)
-        if not self.filter_baixa_enabled:
-            socis = [s for s in socis if not s.bBaixa]
-
-        # Aplicar filtro de búsqueda de texto
-        text = (self.search_text or "").strip().lower()
-        if text:
-            socis = [
-                s for s in socis
-                if text in ((s.FAMID or "").lower())
-                or text in ((s.FAMNom or "").lower())
-            ]
-
-        # Aplicar filtro de pago por ventanilla
-        if self.filter_finestreta_enabled:
-            socis = [s for s in socis if s.FAMPagamentFinestreta]
-
-        self.filtered_socis = socis
+        """Notifica a la vista que los filtros han cambiado."""
         self.socis_changed.emit()
 
     def filter_socis(self, text):
-        """Actualiza el texto de búsqueda y filtra la lista."""
+        """
+        Actualiza el texto de búsqueda y filtra la lista.
+
+        Busca en nombre, ID, NIF, dirección, población, CP, teléfonos y email,
+        sin distinguir mayúsculas ni acentos.
+        """
         self.search_text = text
+        self._search_hits = self.search_index.search(text)
         self.update_filtered_socis()
     
     def toggle_finestreta_filter(self, state):
@@ -116,20 +580,15 @@ class ViewModel(QObject):
 
     def get_socio_full_name(self, socio_id):
         """Busca y devuelve el nombre completo de un socio por su ID."""
-        if not socio_id:
-            return ""
-        try:
-            socio = next(s for s in self.all_socis if s.FAMID == socio_id.strip())
-            return socio.FAMNom
-        except StopIteration:
-            return ""
-
-    def set_selected_socio(self, row_index):
-        """Establece el socio seleccionado a partir del índice de la fila."""
-        if row_index is not None and 0 <= row_index < len(self.filtered_socis):
-            self.selected_socio = self.filtered_socis[row_index]
-        else:
-            self.selected_socio = None
+        return self.store.name_of(socio_id)
+
+    def get_partners_of(self, socio_id):
+        """Devuelve los socios que tienen a este socio como pareja."""
+        return self.store.referencing(socio_id)
+
+    def set_selected_socio(self, socio):
+        """Establece el socio seleccionado (None para deseleccionar)."""
+        self.selected_socio = self.store.get(socio.FAMID) if socio else None
 
     def get_selected_socio_data(self):
         """Devuelve los datos del socio seleccionado en formato de tupla."""
@@ -139,11 +598,19 @@ class ViewModel(QObject):
 
     def save_socio(self, data, original_fam_id=None):
         """Guarda o actualiza un socio en la base de datos."""
-        print(f"DEBUG save_socio: original_fam_id={original_fam_id!r}, new_id={data[0]!r}")
+        removed, famids = self._affected_by_save(data, original_fam_id)
+        success = self._write_socio(data, original_fam_id)
+        if success:
+            self._apply_changes(removed, self._fetch_socis(famids))
+        return success
+
+    def _write_socio(self, data, original_fam_id=None):
+        """Escribe el alta o la edición de un socio, sin recargar la lista."""
+        log.debug("save_socio: original_fam_id=%r, new_id=%r", original_fam_id, data[0])
         try:
             new_id = (data[0] or "").strip()
             if not new_id:
-                print("Error: FAMID vacío")
+                log.error("FAMID vacío")
                 return False
 
             old_id = (original_fam_id or "").strip() if original_fam_id else None
@@ -155,7 +622,7 @@ class ViewModel(QObject):
                 # Si cambió el ID -> validar y renombrar
                 if new_id != old_id:
                     if self.model.socio_exists(new_id):
-                        print(f"Error: ya existe un socio con el ID {new_id}")
+                        log.error("Ya existe un socio con el ID %s", new_id)
                         return False
 
                     # OJO: rename_socio(old_id, new_id)
@@ -170,28 +637,25 @@ class ViewModel(QObject):
             # =========================
             else:
                 if self.model.socio_exists(new_id):
-                    print(f"Error: ya existe un socio con el ID {new_id}")
+                    log.error("Ya existe un socio con el ID %s", new_id)
                     return False
 
                 success = self.model.add_socio(data)
 
-            if success:
-                self.load_data()
-
             return success
 
         except Exception as e:
-            print(f"ERROR save_socio: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error en save_socio: %s", e)
             return False
             
     def delete_selected_socio(self):
         """Elimina el socio seleccionado de la base de datos."""
         if self.selected_socio:
-            success = self.model.delete_socio(self.selected_socio.FAMID)
+            famid = self.selected_socio.FAMID
+            success = self.model.delete_socio(famid)
             if success:
-                self.load_data()  # Recargar datos después de eliminar
+                # La baja es lógica: solo cambia esta fila
+                self._apply_changes([], self._fetch_socis([famid]))
             return success
         return False
         
@@ -206,84 +670,95 @@ class ViewModel(QObject):
         # Quota anterior (lo que había antes de guardar)
         old_quota = self.dades.QuotaSocis if self.dades else None
 
+        quota_changed = self._write_dades(data, old_quota)
+        if quota_changed is None:
+            return False
+
+        # Solo se recargan los socios si la quota se ha replicado a todos
+        self._apply_dades_result(self._fetch_after_dades(quota_changed))
+        return True
+
+    def _write_dades(self, data, old_quota):
+        """
+        Escribe G_Dades y, si cambia la quota, la replica a los socios.
+
+        Returns:
+            bool: Si la quota se ha replicado, o None si no se ha podido guardar
+        """
         success = self.model.update_dades(data)
         if not success:
-            return False
+            return None
 
         # Quota nueva (viene del dialog y está en el campo QuotaSocis)
         # En DadesDialog.get_data() QuotaSocis se convierte a float, así que aquí ya llega como float.
         try:
-            new_quota = float(data[12])  # índice 12 = "QuotaSocis"
+            new_quota = float(data[Dades._fields.index("QuotaSocis")])
         except Exception:
             new_quota = None
 
         # Si la quota ha cambiado -> replicar a socios (por defecto solo activos)
         if new_quota is not None and new_quota != old_quota:
             self.model.set_quota_for_all_socis(new_quota, only_active=True)
+            return True
 
-        # Recargar todo para reflejar cambios en UI y tabla
-        self.load_data()
-        return True
+        return False
     
-    def generate_general_report(self, filepath, orden_alfabetic=True):
+    def generate_general_report(self, filepath, orden_alfabetic=True, instantanea=None):
         """
         Genera el informe general de socios.
 
         Args:
             filepath: Ruta del archivo PDF
             orden_alfabetic: True para orden alfabético, False para orden por número
+            instantanea: Datos del informe (por defecto, una copia de los actuales)
         """
         try:
-            # Filtrar solo socios activos
-            socis_actius = [s for s in self.all_socis if not s.bBaixa]
-
-            # Función auxiliar para ordenar sin petar con None
-            def safe_text(value):
-                return (str(value).strip().lower() if value is not None else "")
-
-            # Ordenar según parámetro
-            if orden_alfabetic:
-                # Orden alfabético: por nombre y dirección (ambos seguros ante None)
-                socis_ordenats = sorted(
-                    socis_actius,
-                    key=lambda s: (
-                        safe_text(getattr(s, "FAMNom", None)),
-                        safe_text(getattr(s, "FAMAdressa", None)),
-                        safe_text(getattr(s, "FAMID", None)),
-                    )
-                )
-            else:
-                # Orden por número de socio (FAMID) (seguro ante None)
-                socis_ordenats = sorted(
-                    socis_actius,
-                    key=lambda s: safe_text(getattr(s, "FAMID", None))
-                )
-
-            # Generar PDF con los socios ordenados
-            generator = PdfGenerator()
-            generator.dades = self.dades
-            generator.generate_general_report(socis_ordenats, self.dades, filepath)
-            return True
+            copia = instantanea or self.instantanea()
+            # La fecha impresa en el PDF forma parte de la clave de la caché
+            generat = datetime.now().strftime('%d/%m/%Y %H:%M')
+
+            def generate():
+                # Filtrar solo socios activos y ordenar según parámetro
+                socis_actius = [s for s in copia.socis if not s.bBaixa]
+                socis_ordenats = ordenar_socis(socis_actius, orden_alfabetic)
+
+                # Generar PDF con los socios ordenados
+                from .pdf_generator import PdfGenerator
+                generator = PdfGenerator()
+                generator.dades = copia.dades
+                generator.fecha_generacion = generat
+                generator.generate_general_report(socis_ordenats, copia.socis_map, filepath)
+                return True
+
+            return self._cached_report(
+                'general', filepath, generate, copia,
+                orden_alfabetic=orden_alfabetic, generat=generat
+            )
 
         except Exception as e:
-            print(f"ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error al generar el listado general: %s", e)
             return False
 
-    def generate_banking_report(self, filepath):
+    def generate_banking_report(self, filepath, instantanea=None):
         try:
-            socis_actius = [s for s in self.all_socis if not s.bBaixa]
+            copia = instantanea or self.instantanea()
+            generat = datetime.now().strftime('%d/%m/%Y %H:%M')
 
-            generator = PdfGeneratorTabular()
-            generator.dades = self.dades
-            generator.generate_banking_report(socis_actius, self.dades, filepath)
+            def generate():
+                socis_actius = [s for s in copia.socis if not s.bBaixa]
 
-            return True
+                from .pdf_generator import PdfGeneratorTabular
+                generator = PdfGeneratorTabular()
+                generator.dades = copia.dades
+                generator.fecha_generacion = generat
+                generator.generate_banking_report(socis_actius, copia.socis_map, filepath)
+                return True
+
+            return self._cached_report('bancari', filepath, generate, copia, generat=generat)
         except Exception as e:
-            print(f"Error al generar el listado bancario: {e}")
+            log.exception("Error al generar el listado bancario: %s", e)
             return False
-    def generate_etiquetas(self, filepath):
+    def generate_etiquetas(self, filepath, instantanea=None):
         """
         Genera etiquetas en PDF para los socios.
         
@@ -295,38 +770,112 @@ class ViewModel(QObject):
         
         Args:
             filepath: Ruta donde guardar el PDF
+            instantanea: Datos del informe (por defecto, una copia de los actuales)
             
         Returns:
             True si se generó correctamente, False en caso contrario
         """
         try:
+            from .etiquetas_generator import generar_etiquetas_socios
+
+            copia = instantanea or self.instantanea()
             # Usar todos los socios (no solo los filtrados)
             # El generador ya filtra activos y duplicados
-            success = generar_etiquetas_socios(self.all_socis, filepath)
-            return success
+            return self._cached_report(
+                'etiquetes', filepath,
+                lambda: generar_etiquetas_socios(copia.socis, filepath), copia
+            )
         except Exception as e:
-            print(f"Error al generar etiquetas: {e}")
+            log.exception("Error al generar etiquetas: %s", e)
             return False
     
-    def generar_remesa_sepa(self, filename):
+    def generate_report_pack_async(self, carpeta, orden_alfabetic=True, on_done=None):
         """
-        Genera el archivo de remesa SEPA a partir de los socios a domiciliar
+        Genera todos los informes (listados, etiquetas y remesa SEPA) a la vez.
+
+        Todos parten de la misma copia de los socios y se generan en
+        paralelo en procesos separados (ver report_pack).
+
+        Args:
+            carpeta: Carpeta donde se guardan los ficheros
+            orden_alfabetic: Orden del listado general
+            on_done: on_done(resultado) con los tiempos de cada informe
+        """
+        socis, socis_map, dades, _ = self.instantanea()
+
+        def work(task):
+            task.report_progress(5, "Generant paquet d'informes...")
+
+            def progreso(fets, total, resultat):
+                task.report_progress(
+                    5 + 95 * fets // total,
+                    f"Informes generats: {fets}/{total}"
+                )
+
+            with span('informe.paquet', nivel=logging.INFO, socis=len(socis)):
+                resultat = generar_paquet(
+                    dades, socis, socis_map, carpeta,
+                    orden_alfabetic=orden_alfabetic, progreso=progreso
+                )
+            # Cada informe se genera en otro proceso: sus tiempos llegan en el resultado
+            for r in resultat['resultats']:
+                metricas.registrar_span(f"paquet.{r['informe']}", r['segons'] * 1000)
+                if r['ok']:
+                    contar_fichero('informes.bytes', r['ruta'])
+            return resultat
+
+        return self.tasks.submit(
+            work,
+            on_finished=on_done,
+            on_error=self.task_error.emit,
+            description="Generant paquet d'informes..."
+        )
+
+    def generar_remesa_sepa(self, filename, fecha_cobro=None, max_por_fichero=None, instantanea=None):
+        """
+        Genera la remesa SEPA a partir de los socios a domiciliar
         y los datos de configuración.
+
+        Los recibos se agrupan por tipo de secuencia (FRST/RCUR), fecha de
+        cobro y cuenta del acreedor, y se reparten en tantos ficheros como
+        haga falta según el límite de recibos por fichero.
+
+        Returns:
+            dict: Manifiesto de la remesa (ficheros y sumas de control),
+            o False si no se ha podido generar
+
+        Raises:
+            ErrorValidacion: Con todos los socios que tienen el IBAN o el BIC
+            incorrecto
         """
-        if not self.dades:
-            print("Error: No se han cargado los datos de configuración (G_Dades).")
+        copia = instantanea or self.instantanea()
+        if not copia.dades:
+            log.error("No se han cargado los datos de configuración (G_Dades).")
             return False
             
-        socios_a_domiciliar = [s for s in self.all_socis if s.FAMbPagamentDomiciliat and not s.bBaixa]
+        socios_a_domiciliar = [s for s in copia.socis if s.FAMbPagamentDomiciliat and not s.bBaixa]
         
         if not socios_a_domiciliar:
-            print("No hay socios para generar la remesa SEPA.")
+            log.warning("No hay socios para generar la remesa SEPA.")
             return False
             
         try:
-            generar_xml_sepa(self.dades, socios_a_domiciliar, filename)
-            print(f"Remesa SEPA generada correctamente en '{filename}'.")
-            return True
+            from utils.sepa_planner import planificar_remesa, generar_remesa
+
+            with span('sepa.remesa', nivel=logging.INFO, socis=len(socios_a_domiciliar)) as datos:
+                plan = planificar_remesa(
+                    copia.dades, socios_a_domiciliar,
+                    fecha_cobro=fecha_cobro, max_por_fichero=max_por_fichero
+                )
+                manifiesto = generar_remesa(copia.dades, plan, filename)
+                datos['fitxers'] = len(manifiesto['rutes'])
+                datos['bytes'] = sum(contar_fichero('sepa.bytes', ruta) for ruta in manifiesto['rutes'])
+            log.info("Remesa SEPA generada correctamente en '%s'.", filename)
+            return manifiesto
+        except ErrorValidacion as e:
+            # Se muestran todos los socios con datos incorrectos a la vez
+            log.warning("Remesa SEPA no generada: %s", e)
+            raise
         except Exception as e:
-            print(f"Error al generar la remesa SEPA: {e}")
+            log.exception("Error al generar la remesa SEPA: %s", e)
             return False
\ No newline at end of file
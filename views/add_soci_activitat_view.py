@@ -13,7 +13,7 @@ class AddSociActivitatView(QDialog):
         super().__init__(parent)
         self.viewmodel = viewmodel
         self.activitat = activitat
-        self.db_model = db_model
+        self.db_model = viewmodel.db_model
         
         self.setWindowTitle("Afegir Soci a l'Activitat")
         self.setMinimumWidth(400)
@@ -78,29 +78,16 @@ class AddSociActivitatView(QDialog):
     def load_socis(self):
         """Carga la lista de socios para el autocompletado"""
         try:
-            # CAMBIADO: Usar FAMID en lugar de codi
-            query = """
-                SELECT FAMID, Nom, Cognom1, Cognom2, NIF
-                FROM scazorla_sa.G_Socis
-                WHERE Actiu = 1
-                ORDER BY Cognom1, Cognom2, Nom
-            """
-            rows = self.db_model.execute_query(query)
+            # Solo socios activos y solo las columnas necesarias (filtrado en el servidor)
+            socis = self.db_model.query_socis(columns=('FAMID', 'FAMNom', 'FAMNIF'))
             
             self.socis_data = {}
             search_items = []
             
-            for row in rows:
-                famid = row[0]  # FAMID en lugar de codi
-                nom = row[1]
-                cognom1 = row[2]
-                cognom2 = row[3] if row[3] else ""
-                nif = row[4]
+            for soci in sorted(socis, key=lambda s: (s.FAMNom or "").lower()):
+                display_text = f"{(soci.FAMNom or '').strip()} - {soci.FAMNIF or ''}"
                 
-                cognoms = f"{cognom1} {cognom2}".strip()
-                display_text = f"{cognoms}, {nom} - {nif}"
-                
-                self.socis_data[display_text] = famid  # Guardar FAMID
+                self.socis_data[display_text] = soci.FAMID  # Guardar FAMID
                 search_items.append(display_text)
             
             self.completer.setModel(self.completer.model().__class__(search_items))
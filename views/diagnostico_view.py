@@ -0,0 +1,115 @@
+﻿from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QGroupBox)
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QDesktopServices
+from utils.instrumentacion import resumen
+
+
+class DiagnosticoView(QDialog):
+    """Panel de diagnóstico: tiempos, contadores y estado del pool de conexiones"""
+
+    def __init__(self, view_model, parent=None):
+        super().__init__(parent)
+        self.view_model = view_model
+
+        self.setWindowTitle("Diagnòstic de rendiment")
+        self.setMinimumSize(800, 600)
+
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        """Inicializa la interfaz"""
+        layout = QVBoxLayout()
+
+        self.info_label = QLabel()
+        layout.addWidget(self.info_label)
+
+        # Tiempos por span
+        spans_group = QGroupBox("Temps")
+        spans_layout = QVBoxLayout()
+        self.spans_table = self._create_table(
+            ["Operació", "Vegades", "Total (ms)", "Mitjana (ms)", "Màxim (ms)", "Última (ms)"]
+        )
+        spans_layout.addWidget(self.spans_table)
+        spans_group.setLayout(spans_layout)
+        layout.addWidget(spans_group, 3)
+
+        # Contadores y métricas del pool
+        counters_group = QGroupBox("Comptadors")
+        counters_layout = QVBoxLayout()
+        self.counters_table = self._create_table(["Comptador", "Valor"])
+        counters_layout.addWidget(self.counters_table)
+        counters_group.setLayout(counters_layout)
+        layout.addWidget(counters_group, 2)
+
+        buttons_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Actualitza")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.log_button = QPushButton("Obre el registre")
+        self.log_button.clicked.connect(self.open_log)
+        close_button = QPushButton("Tanca")
+        close_button.clicked.connect(self.accept)
+        buttons_layout.addWidget(self.refresh_button)
+        buttons_layout.addWidget(self.log_button)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(close_button)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+    @staticmethod
+    def _create_table(headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, len(headers)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row, col, item)
+
+    def refresh(self):
+        """Vuelve a leer las cifras acumuladas"""
+        dades = resumen()
+
+        spans = sorted(dades['spans'].items(), key=lambda item: -item[1]['total_ms'])
+        self._fill(self.spans_table, [
+            (nom, str(s['veces']), f"{s['total_ms']:.1f}", f"{s['total_ms'] / s['veces']:.1f}",
+             f"{s['max_ms']:.1f}", f"{s['ultimo_ms']:.1f}")
+            for nom, s in spans
+        ])
+
+        counters = [(nom, f"{valor:,}".replace(",", ".")) for nom, valor in sorted(dades['contadores'].items())]
+        pool = getattr(self.view_model.model, 'pool', None)
+        if pool is not None:
+            for nom, valor in sorted(pool.metrics().items()):
+                text = f"{valor:.3f}" if isinstance(valor, float) else str(valor)
+                counters.append((f"pool.{nom}", text))
+        self._fill(self.counters_table, counters)
+
+        estat = "sense connexió (només lectura)" if self.view_model.offline else "connectat"
+        self.info_label.setText(
+            f"Temps des de l'arrencada: {dades['segons']:.0f} s  ·  Servidor: {estat}  ·  "
+            f"Registre: {dades['log'] or 'no configurat'}"
+        )
+        self.log_button.setEnabled(bool(dades['log']))
+
+    def open_log(self):
+        """Abre el fichero de log con la aplicación del sistema"""
+        ruta = resumen()['log']
+        if ruta:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(ruta))
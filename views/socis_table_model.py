@@ -0,0 +1,133 @@
+﻿from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from .style_config import STYLE_CONFIG
+
+
+class SocisTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla de socios leído directamente del almacén del ViewModel.
+
+    No crea ningún objeto por celda: Qt pide los datos (data) solo de las
+    filas visibles, y los cambios de una fila se notifican con dataChanged.
+    """
+    COLUMNS = [
+        ("ID", "FAMID", 50),
+        ("Nom", "FAMNom", 300),
+        ("Adreça", "FAMAdressa", 300),
+        ("Cod.Pos.", "FAMCodPos", 50),
+        ("Poblacio", "FAMPoblacio", 150),
+        ("Telèfon", "FAMTelefon", 80),
+        ("Mòbil", "FAMMobil", 80),
+        ("Email", "FAMEmail", 180),
+        ("Soci Referencia/Parella", None, 300),
+    ]
+    PARTNER_COLUMN = 8
+
+    def __init__(self, view_model, parent=None):
+        super().__init__(parent)
+        self.view_model = view_model
+        store = view_model.store
+        # begin* antes de que el almacén cambie la lista, end* después
+        store.about_to_reset.connect(self.beginResetModel)
+        store.reset.connect(self.endResetModel)
+        store.row_about_to_be_inserted.connect(self._on_row_about_to_be_inserted)
+        store.row_inserted.connect(self._on_row_inserted)
+        store.row_updated.connect(self._on_row_updated)
+        store.row_about_to_be_removed.connect(self._on_row_about_to_be_removed)
+        store.row_removed.connect(self._on_row_removed)
+
+    # ------------------------------------------------------------------
+    # Sincronización con el almacén
+    # ------------------------------------------------------------------
+    def _on_row_about_to_be_inserted(self, row, famid):
+        self.beginInsertRows(QModelIndex(), row, row)
+
+    def _on_row_inserted(self, row, famid):
+        self.endInsertRows()
+        self._refresh_partner_column(famid)
+
+    def _on_row_updated(self, row, famid):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+        self._refresh_partner_column(famid)
+
+    def _on_row_about_to_be_removed(self, row, famid):
+        self.beginRemoveRows(QModelIndex(), row, row)
+
+    def _on_row_removed(self, row, famid):
+        self.endRemoveRows()
+        self._refresh_partner_column(famid)
+
+    def _refresh_partner_column(self, famid):
+        """Repinta el nombre de pareja de los socios que apuntan a este FAMID."""
+        store = self.view_model.store
+        for socio in store.referencing(famid):
+            row = store.row_of(socio.FAMID)
+            index = self.index(row, self.PARTNER_COLUMN)
+            self.dataChanged.emit(index, index)
+
+    # ------------------------------------------------------------------
+    # API de QAbstractTableModel
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.view_model.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section][0]
+        return None
+
+    def socio_at(self, row):
+        """Devuelve el socio de una fila del modelo (sin proxy)."""
+        socis = self.view_model.store.socis()
+        return socis[row] if 0 <= row < len(socis) else None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        socio = self.socio_at(index.row())
+        if socio is None:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() == self.PARTNER_COLUMN:
+                return self.view_model.get_socio_full_name(socio.FAMSociReferencia)
+            value = getattr(socio, self.COLUMNS[index.column()][1])
+            return "" if value is None else str(value)
+
+        # Si el socio está dado de baja, aplicar el estilo de color
+        if role == Qt.ItemDataRole.BackgroundRole and socio.bBaixa:
+            return STYLE_CONFIG["color_baixa_bg"]
+        if role == Qt.ItemDataRole.ForegroundRole and socio.bBaixa:
+            return STYLE_CONFIG["color_baixa_text"]
+
+        return None
+
+
+class SocisFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filtra y ordena la tabla de socios con los filtros del ViewModel.
+
+    Al cambiar un socio, el proxy vuelve a evaluar solo esa fila; al cambiar
+    el texto o las casillas de filtro se llama a refresh().
+    """
+
+    def __init__(self, view_model, parent=None):
+        super().__init__(parent)
+        self.view_model = view_model
+        self.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setDynamicSortFilter(True)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        socio = self.sourceModel().socio_at(source_row)
+        return socio is not None and self.view_model.accepts(socio)
+
+    def refresh(self):
+        """Vuelve a aplicar los filtros actuales."""
+        self.invalidateFilter()
+
+    def socio_at(self, proxy_row):
+        """Devuelve el socio mostrado en una fila de la vista."""
+        source = self.mapToSource(self.index(proxy_row, 0))
+        return self.sourceModel().socio_at(source.row()) if source.isValid() else None
@@ -1,27 +1,35 @@
 ﻿from PyQt6.QtWidgets import QFileDialog, QPlainTextEdit
 import os
+import logging
 import platform
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QLabel, QLineEdit, QFormLayout, QDialog, QMessageBox, QCheckBox, QGroupBox, QFileDialog, QDateEdit, QTextEdit, QCompleter, QScrollArea
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QLabel, QLineEdit, QFormLayout, QDialog, QMessageBox, QCheckBox, QGroupBox, QFileDialog, QDateEdit, QTextEdit, QCompleter, QScrollArea, QProgressBar
 from PyQt6.QtCore import Qt
 from PyQt6.QtCore import QSize, Qt, QTimer
-from PyQt6.QtGui import QColor, QFont, QDesktopServices
+from PyQt6.QtGui import QColor, QFont, QDesktopServices, QKeySequence, QShortcut
 from PyQt6.QtCore import QUrl
 from datetime import datetime
 from .style_config import STYLE_CONFIG
 import platform
-from views.activitats_view import ActivitatsView
+from viewmodels.report_pack import INFORMES
+from views.socis_table_model import SocisTableModel, SocisFilterProxyModel
 from models.model import Dades
+from models.socio import Socio, coerce_value
+
+log = logging.getLogger(__name__)
+
 
 class SocioDialog(QDialog):
     """Diálogo para agregar o editar un socio."""
-    def __init__(self, parent=None, socio=None, todos_socis=None):
+    def __init__(self, parent=None, socio=None, todos_socis=None, socis_store=None):
         super().__init__(parent)
         self.setWindowTitle("Edita Soci" if socio else "Afegeix Soci")
         self.setGeometry(100, 100, 1000, 650)  # Más ancho para 2 columnas
         self.socio_data = socio
         self.todos_socis = todos_socis if todos_socis else []
+        self.socis_store = socis_store  # Índice por FAMID compartido con el ViewModel
+        self._socis_index = None
         self.original_famid = socio[0].strip() if socio else None
 
         # Layout principal
@@ -347,14 +355,7 @@ class SocioDialog(QDialog):
             self.fields["FAMID"].setEnabled(True)
             self.fields["FAMID"].setReadOnly(False)
             
-            ordered_keys = [
-                "FAMID", "FAMNom", "FAMAdressa", "FAMPoblacio", "FAMCodPos",
-                "FAMTelefon", "FAMMobil", "FAMEmail", "FAMDataAlta", "FAMIBAN",
-                "FAMBIC", "bBaixa", "FAMObservacions", "FAMNIF", "FAMDataNaixement",
-                "FAMQuota", "FAMDataBaixa", "FAMSexe", "FAMSociReferencia",
-                "FAMbPagamentDomiciliat", "FAMbRebutCobrat", "FAMPagamentFinestreta",
-                "FAMTelefonEmergencia"
-            ]
+            ordered_keys = Socio._fields
 
             for i, key in enumerate(ordered_keys):
                 if key in self.fields and i < len(self.socio_data):
@@ -387,17 +388,9 @@ class SocioDialog(QDialog):
     
     def get_data(self):
         """Devuelve los datos del formulario como una tupla."""
-        from datetime import datetime
         data = []
         
-        ordered_keys = [
-            "FAMID", "FAMNom", "FAMAdressa", "FAMPoblacio", "FAMCodPos",
-            "FAMTelefon", "FAMMobil", "FAMEmail", "FAMDataAlta", "FAMIBAN",
-            "FAMBIC", "bBaixa", "FAMObservacions", "FAMNIF", "FAMDataNaixement",
-            "FAMQuota", "FAMDataBaixa", "FAMSexe", "FAMSociReferencia",
-            "FAMbPagamentDomiciliat", "FAMbRebutCobrat", "FAMPagamentFinestreta",
-            "FAMTelefonEmergencia"
-        ]
+        ordered_keys = Socio._fields
         
         for key in ordered_keys:
             if key in self.fields:
@@ -405,16 +398,8 @@ class SocioDialog(QDialog):
                 value = None
                 
                 if isinstance(widget, QLineEdit):
-                    value = widget.text().strip()
-                    if key in ["FAMDataAlta", "FAMDataNaixement", "FAMDataBaixa"]:
-                        value = datetime.strptime(value, '%Y-%m-%d') if value else None
-                    elif key == "FAMQuota":
-                        try:
-                            value = float(value.replace(',', '.')) if value else None
-                        except:
-                            value = None
-                    elif value == "":
-                        value = None
+                    # Fechas (YYYY-MM-DD) y quota (admite coma) se convierten al tipo del campo
+                    value = coerce_value(key, widget.text().strip(), blank_as_none=True)
                 elif isinstance(widget, QTextEdit):
                     value = widget.toPlainText().strip() or None
                 elif isinstance(widget, QCheckBox):
@@ -440,7 +425,7 @@ class SocioDialog(QDialog):
             self.fields["FAMSociReferencia"].textChanged.connect(self.actualizar_nombre_parella)
             id_parella = id_solo
         
-        socio_encontrado = next((s for s in self.todos_socis if s.FAMID.strip() == id_parella), None)
+        socio_encontrado = self.buscar_socio(id_parella)
         
         if socio_encontrado:
             self.label_parella_nom.setText(f"✓ {socio_encontrado.FAMNom}")
@@ -451,6 +436,14 @@ class SocioDialog(QDialog):
             self.label_parella_nom.setStyleSheet("QLabel { color: #cc0000; font-weight: bold; font-size: 10pt; padding: 2px; background-color: #ffebee; border-radius: 3px; }")
             self.btn_crear_parella.show()
     
+    def buscar_socio(self, famid):
+        """Busca un socio por FAMID en el índice (sin recorrer la lista)."""
+        if self.socis_store is not None:
+            return self.socis_store.get(famid)
+        if self._socis_index is None:
+            self._socis_index = {s.FAMID.strip(): s for s in self.todos_socis}
+        return self._socis_index.get((famid or "").strip())
+
     def crear_nuevo_socio_parella(self):
         """Abre diálogo para crear nuevo socio pareja."""
         id_propuesto = self.fields["FAMSociReferencia"].text().strip()
@@ -464,7 +457,7 @@ class SocioDialog(QDialog):
         if reply == QMessageBox.StandardButton.No:
             return
         
-        nuevo_socio_dialog = SocioDialog(self, None, self.todos_socis)
+        nuevo_socio_dialog = SocioDialog(self, None, self.todos_socis, self.socis_store)
         
         if id_propuesto and len(id_propuesto) <= 5:
             nuevo_socio_dialog.fields["FAMID"].setEnabled(True)
@@ -481,6 +474,7 @@ class SocioDialog(QDialog):
                 if success:
                     QMessageBox.information(self, "Èxit", f"Soci '{nuevo_socio_data[1]}' creat correctament.")
                     self.todos_socis = view_model.all_socis
+                    self._socis_index = None
                     
                     # Actualizar autocompletador
                     sugerencias = [f"{s.FAMID.strip()} - {s.FAMNom}" for s in self.todos_socis]
@@ -588,9 +582,13 @@ class MainWindow(QMainWindow):
         # Conectar señales del ViewModel a métodos de la Vista
         self.view_model.socis_changed.connect(self.update_socis_table)
         self.view_model.dades_changed.connect(self.update_ui_with_dades)
+        self.view_model.task_error.connect(self.on_task_error)
+        self.view_model.tasks.busy_changed.connect(self.on_busy_changed)
+        self.view_model.tasks.progress.connect(self.on_task_progress)
+        self.view_model.offline_changed.connect(self.on_offline_changed)
 
         self.init_ui()
-        self.view_model.load_data()
+        self.view_model.startup_async()
 
     def init_ui(self):
         """Inicializa la interfaz de usuario."""
@@ -627,6 +625,7 @@ class MainWindow(QMainWindow):
         self.print_general_button = QPushButton("Imprimeix Llistat General")
         self.print_banking_button = QPushButton("Imprimeix Dades Bancàries")
         self.print_etiquetes_button = QPushButton("Imprimeix Etiquetes")
+        self.report_pack_button = QPushButton("Genera Tots els Informes")
         
         reports_config_layout.addWidget(self.activitats_button)
         reports_config_layout.addWidget(self.config_button)
@@ -634,6 +633,7 @@ class MainWindow(QMainWindow):
         reports_config_layout.addWidget(self.print_general_button)
         reports_config_layout.addWidget(self.print_banking_button)
         reports_config_layout.addWidget(self.print_etiquetes_button)
+        reports_config_layout.addWidget(self.report_pack_button)
         
         top_functions_layout.addWidget(reports_config_group)
         
@@ -649,6 +649,9 @@ class MainWindow(QMainWindow):
         self.print_general_button.clicked.connect(self.print_general_report)
         self.print_banking_button.clicked.connect(self.print_banking_report)
         self.print_etiquetes_button.clicked.connect(self.print_etiquetas)
+        self.report_pack_button.clicked.connect(self.generate_report_pack)
+        # Panell de diagnòstic (temps, comptadors, pool): Ctrl+Maj+D
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.open_diagnostico)
         
         
         # Grupo para la información de la remesa
@@ -664,8 +667,15 @@ class MainWindow(QMainWindow):
         search_layout = QHBoxLayout()
         search_label = QLabel("Cercar Soci:")
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Cercar per ID o Nom...")
-        self.search_input.textChanged.connect(self.view_model.filter_socis)
+        self.search_input.setPlaceholderText("Cercar per ID, nom, NIF, adreça, telèfon o email...")
+        # Esperar a que l'usuari deixi d'escriure abans de filtrar
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(
+            lambda: self.view_model.filter_socis(self.search_input.text())
+        )
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         self.finestreta_checkbox = QCheckBox("Pagament per Finestreta")
         self.finestreta_checkbox.stateChanged.connect(self.view_model.toggle_finestreta_filter)
@@ -685,114 +695,170 @@ class MainWindow(QMainWindow):
         self.record_count_label.setFont(QFont(STYLE_CONFIG["font_family"], STYLE_CONFIG["font_size_bold"], QFont.Weight.Bold))
         main_layout.addWidget(self.record_count_label)
         
-        # Tabla de socios
-        self.socis_table = QTableWidget()
-        self.socis_table.setColumnCount(9) # Solo mostramos algunas columnas relevantes
-        self.socis_table.setColumnWidth(0,50)
-        self.socis_table.setColumnWidth(1,300)
-        self.socis_table.setColumnWidth(2,300)
-        self.socis_table.setColumnWidth(3,50)
-        self.socis_table.setColumnWidth(4,150)
-        self.socis_table.setColumnWidth(5,80)
-        self.socis_table.setColumnWidth(6,80)
-        self.socis_table.setColumnWidth(7,180)
-        self.socis_table.setColumnWidth(8,300)
-        
-        self.socis_table.setHorizontalHeaderLabels(["ID", "Nom", "Adreça", "Cod.Pos.", "Poblacio","Telèfon","Mòbil","Email","Soci Referencia/Parella"])
+        # Tabla de socios: modelo sobre el almacén del ViewModel + proxy de filtro
+        self.socis_model = SocisTableModel(self.view_model, self)
+        self.socis_proxy = SocisFilterProxyModel(self.view_model, self)
+        self.socis_proxy.setSourceModel(self.socis_model)
+        self.socis_proxy.rowsInserted.connect(self.update_record_count)
+        self.socis_proxy.rowsRemoved.connect(self.update_record_count)
+        self.socis_proxy.modelReset.connect(self.update_record_count)
+
+        self.socis_table = QTableView()
+        self.socis_table.setModel(self.socis_proxy)
+        for column, (_, _, width) in enumerate(SocisTableModel.COLUMNS):
+            self.socis_table.setColumnWidth(column, width)
         self.socis_table.horizontalHeader().setStretchLastSection(True)
+        self.socis_table.verticalHeader().setDefaultSectionSize(22)
         self.socis_table.setAlternatingRowColors(True)
-        self.socis_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.socis_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.socis_table.itemSelectionChanged.connect(self.on_socio_selected)
-        self.socis_table.itemDoubleClicked.connect(self.on_socio_double_clicked)
+        self.socis_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.socis_table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.socis_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.socis_table.setSortingEnabled(True)
+        self.socis_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.socis_table.selectionModel().selectionChanged.connect(self.on_socio_selected)
+        self.socis_table.doubleClicked.connect(self.on_socio_double_clicked)
         main_layout.addWidget(self.socis_table)
 
+        # Barra d'estat: progrés de les tasques en segon pla
+        self.task_label = QLabel("")
+        self.task_progress = QProgressBar()
+        self.task_progress.setRange(0, 100)
+        self.task_progress.setMaximumWidth(200)
+        self.task_cancel_button = QPushButton("Cancel·la")
+        self.task_cancel_button.clicked.connect(self.view_model.cancel_tasks)
+        # Avís de mode sense connexió (dades de la còpia local, només lectura)
+        self.offline_label = QLabel("⚠️ Sense connexió amb el servidor: mode només lectura")
+        self.offline_label.setStyleSheet("color: #b00020; font-weight: bold;")
+        self.offline_label.setVisible(False)
+        self.statusBar().addWidget(self.offline_label)
+        self.statusBar().addPermanentWidget(self.task_label)
+        self.statusBar().addPermanentWidget(self.task_progress)
+        self.statusBar().addPermanentWidget(self.task_cancel_button)
+
+        # Botons que escriuen o generen fitxers: es desactiven mentre hi ha una tasca
+        self.task_buttons = [
+            self.add_button, self.edit_button, self.delete_button, self.config_button,
+            self.sepa_button, self.print_general_button, self.print_banking_button,
+            self.print_etiquetes_button, self.report_pack_button
+        ]
+        # Botons que escriuen a la BD: també es desactiven sense connexió
+        self.write_buttons = [
+            self.add_button, self.edit_button, self.delete_button, self.config_button
+        ]
+        self.on_busy_changed(False)
+
+    def on_busy_changed(self, busy):
+        """Muestra u oculta el progreso y bloquea las acciones mientras hay tareas."""
+        self.task_label.setVisible(busy)
+        self.task_progress.setVisible(busy)
+        self.task_cancel_button.setVisible(busy)
+        self.update_buttons()
+        if not busy:
+            self.task_progress.setValue(0)
+            self.task_label.setText("")
+
+    def update_buttons(self):
+        """Activa els botons segons les tasques en curs i la connexió."""
+        busy = self.view_model.tasks.is_busy()
+        for button in self.task_buttons:
+            button.setEnabled(not busy)
+        if self.view_model.offline:
+            for button in self.write_buttons:
+                button.setEnabled(False)
+
+    def on_offline_changed(self, offline):
+        """Mostra l'avís de mode sense connexió i bloqueja les escriptures."""
+        if offline and self.view_model.cached_at:
+            self.offline_label.setText(
+                f"⚠️ Sense connexió amb el servidor: mode només lectura "
+                f"(dades desades el {self.view_model.cached_at.replace('T', ' ')})"
+            )
+        self.offline_label.setVisible(offline)
+        self.update_buttons()
+
+    def on_task_progress(self, percent, message):
+        """Actualiza la barra de estado con el progreso de la tarea."""
+        self.task_progress.setValue(percent)
+        if message:
+            self.task_label.setText(message)
+
+    def on_task_error(self, message):
+        """Muestra los errores de las tareas en segundo plano."""
+        QMessageBox.critical(self, "Error", f"S'ha produït un error:\n{message}")
+
+    def closeEvent(self, event):
+        """Cancela las tareas pendientes antes de cerrar."""
+        self.view_model.cancel_tasks()
+        self.view_model.tasks.wait_for_done(5000)
+        super().closeEvent(event)
+
     def update_socis_table(self):
-        """Actualiza la tabla de socios con los datos del ViewModel."""
-        socis_to_show = self.view_model.get_socis()
-        self.socis_table.setRowCount(len(socis_to_show))
-        
-        # Esta línea actualiza el contador de registros
-        self.record_count_label.setText(f"Total de registres: {len(socis_to_show)}")
-
-        for row, socio in enumerate(socis_to_show):
-            # Obtener el nombre del socio pareja
-            socio_pareja_nom = self.view_model.get_socio_full_name(socio.FAMSociReferencia)
-
-            # Crear y establecer los QTableWidgetItem para cada columna
-            id_item = QTableWidgetItem(socio.FAMID)
-            nom_item = QTableWidgetItem(socio.FAMNom)
-            adressa_item = QTableWidgetItem(socio.FAMAdressa)
-            cod_pos_item = QTableWidgetItem(socio.FAMCodPos)
-            poblacio_item = QTableWidgetItem(socio.FAMPoblacio)
-            telefon_item = QTableWidgetItem(socio.FAMTelefon)
-            mobil_item = QTableWidgetItem(socio.FAMMobil)
-            email_item = QTableWidgetItem(socio.FAMEmail)
-            socio_parella_item = QTableWidgetItem(socio_pareja_nom)
-
-            # Si el socio está dado de baja, aplicar el estilo de color
-            if socio.bBaixa:
-                for item in [id_item, nom_item, adressa_item, cod_pos_item, poblacio_item,
-                             telefon_item, mobil_item, email_item, socio_parella_item]:
-                    item.setBackground(STYLE_CONFIG["color_baixa_bg"])
-                    item.setForeground(STYLE_CONFIG["color_baixa_text"])
-
-            # Establecer los ítems en la tabla
-            self.socis_table.setItem(row, 0, id_item)
-            self.socis_table.setItem(row, 1, nom_item)
-            self.socis_table.setItem(row, 2, adressa_item)
-            self.socis_table.setItem(row, 3, cod_pos_item)
-            self.socis_table.setItem(row, 4, poblacio_item)
-            self.socis_table.setItem(row, 5, telefon_item)
-            self.socis_table.setItem(row, 6, mobil_item)
-            self.socis_table.setItem(row, 7, email_item)
-            self.socis_table.setItem(row, 8, socio_parella_item)
+        """Vuelve a aplicar los filtros del ViewModel a la tabla."""
+        self.socis_proxy.refresh()
+        self.update_record_count()
+
+    def update_record_count(self, *args):
+        """Actualiza el contador de registros visibles."""
+        self.record_count_label.setText(f"Total de registres: {self.socis_proxy.rowCount()}")
+
+    def current_socio(self):
+        """Devuelve el socio de la fila actual de la tabla, o None."""
+        index = self.socis_table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.socis_proxy.socio_at(index.row())
 
     def on_socio_selected(self):
         """Maneja la selección de un socio en la tabla."""
-        selected_rows = self.socis_table.selectedIndexes()
+        selected_rows = self.socis_table.selectionModel().selectedRows()
         if selected_rows:
-            row_index = selected_rows[0].row()
-            self.view_model.set_selected_socio(row_index)
+            self.view_model.set_selected_socio(self.socis_proxy.socio_at(selected_rows[0].row()))
         else:
             self.view_model.set_selected_socio(None)
     
-    def on_socio_double_clicked(self, item):
+    def on_socio_double_clicked(self, index):
         """Maneja el evento de doble clic para editar un socio."""
         self.edit_socio()
 
     def add_socio(self):
         """Abre el diálogo para agregar un nuevo socio."""
-        dialog = SocioDialog(self, socio=None, todos_socis=self.view_model.all_socis)
+        dialog = SocioDialog(self, socio=None, todos_socis=self.view_model.all_socis,
+                             socis_store=self.view_model.store)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_data = dialog.get_data()
-            if self.view_model.save_socio(new_data):
-                QMessageBox.information(self, "Èxit", "Soci afegit correctament.")
-            else:
-                QMessageBox.critical(self, "Error", "No s'ha pogut afegir el soci.")
+
+            def done(success):
+                if success:
+                    QMessageBox.information(self, "Èxit", "Soci afegit correctament.")
+                else:
+                    QMessageBox.critical(self, "Error", "No s'ha pogut afegir el soci.")
+
+            self.view_model.save_socio_async(new_data, on_done=done)
     
     def edit_socio(self):
         """Edita el socio seleccionado."""
-        selected_row = self.socis_table.currentRow()
-        if selected_row < 0:
+        socio = self.current_socio()
+        if socio is None:
             QMessageBox.warning(self, "Avís", "Si us plau, selecciona un soci.")
             return
     
-        self.view_model.set_selected_socio(selected_row)
+        self.view_model.set_selected_socio(socio)
         socio_data = self.view_model.get_selected_socio_data()
     
         if socio_data:
-            dialog = SocioDialog(self, socio_data, todos_socis=self.view_model.all_socis)
+            dialog = SocioDialog(self, socio_data, todos_socis=self.view_model.all_socis,
+                                 socis_store=self.view_model.store)
         
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 new_data = dialog.get_data()
-                success = self.view_model.save_socio(new_data, original_fam_id=dialog.original_famid)
-            
-                if success:
-                    QMessageBox.information(self, "Èxit", "Soci actualitzat correctament.")
-                    self.update_socis_table()
-                else:
-                    QMessageBox.critical(self, "Error", "No s'ha pogut actualitzar el soci.")
+
+                def done(success):
+                    if success:
+                        QMessageBox.information(self, "Èxit", "Soci actualitzat correctament.")
+                    else:
+                        QMessageBox.critical(self, "Error", "No s'ha pogut actualitzar el soci.")
+
+                self.view_model.save_socio_async(new_data, original_fam_id=dialog.original_famid, on_done=done)
                 
     def delete_socio(self):
         """Elimina el socio seleccionado."""
@@ -805,10 +871,13 @@ class MainWindow(QMainWindow):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
-            if self.view_model.delete_selected_socio():
-                QMessageBox.information(self, "Èxit", "Soci eliminat correctament.")
-            else:
-                QMessageBox.critical(self, "Error", "No s'ha pogut eliminar el soci.")
+            def done(success):
+                if success:
+                    QMessageBox.information(self, "Èxit", "Soci eliminat correctament.")
+                else:
+                    QMessageBox.critical(self, "Error", "No s'ha pogut eliminar el soci.")
+
+            self.view_model.delete_selected_socio_async(on_done=done)
                 
     def edit_dades(self):
         """Abre el diálogo para editar los datos de configuración."""
@@ -820,10 +889,14 @@ class MainWindow(QMainWindow):
         dialog = DadesDialog(self, self.view_model)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             updated_data = dialog.get_data()
-            if self.view_model.save_dades(updated_data):
-                QMessageBox.information(self, "Èxit", "Dades de configuració actualitzades.")
-            else:
-                QMessageBox.critical(self, "Error", "No s'han pogut actualitzar les dades de configuració.")
+
+            def done(success):
+                if success:
+                    QMessageBox.information(self, "Èxit", "Dades de configuració actualitzades.")
+                else:
+                    QMessageBox.critical(self, "Error", "No s'han pogut actualitzar les dades de configuració.")
+
+            self.view_model.save_dades_async(updated_data, on_done=done)
 
     def update_ui_with_dades(self):
         """Actualiza los elementos de la UI con los datos de configuración."""
@@ -835,18 +908,33 @@ class MainWindow(QMainWindow):
         """Llama a la lógica del viewmodel para generar la remesa SEPA."""
         filename, _ = QFileDialog.getSaveFileName(self, "Guardar remesa SEPA", "remesa_sepa.xml", "XML Files (*.xml)")
         if filename:
-            if self.view_model.generar_remesa_sepa(filename):
-                QMessageBox.information(self, "Remesa SEPA Generada", f"La remesa SEPA s'ha generat correctament a:\n{filename}")
-                self._open_file(filename)
-            else:
-                QMessageBox.critical(self, "Error", "No s'ha pogut generar la remesa SEPA.")
+            def done(manifest):
+                if manifest:
+                    fitxers = "\n".join(
+                        f"{f['fitxer']}: {f['NbOfTxs']} rebuts, {f['CtrlSum']} €"
+                        for f in manifest['fitxers']
+                    )
+                    QMessageBox.information(
+                        self, "Remesa SEPA Generada",
+                        f"La remesa SEPA s'ha generat correctament "
+                        f"({manifest['NbOfTxs']} rebuts, {manifest['CtrlSum']} €):\n\n"
+                        f"{fitxers}\n\nManifest: {manifest['ruta']}"
+                    )
+                    if len(manifest['rutes']) == 1:
+                        self._open_file(manifest['rutes'][0])
+                else:
+                    QMessageBox.critical(self, "Error", "No s'ha pogut generar la remesa SEPA.")
+
+            self.view_model.generate_report_async(
+                self.view_model.generar_remesa_sepa, filename,
+                on_done=done, description="Generant remesa SEPA..."
+            )
     
     def print_general_report(self):
         """Genera e imprime el listado general de socios."""
         from PyQt6.QtWidgets import QInputDialog
     
-        # Recargar todos los socios (por si había filtro activo)
-        self.view_model.load_data()
+        # all_socis ya contiene todos los socios (los filtros solo afectan a filtered_socis)
     
         # Preguntar orden
         orden_opciones = ["Ordre Alfabètic", "Ordre per Número de Soci"]
@@ -873,31 +961,42 @@ class MainWindow(QMainWindow):
         if filepath:
             # Pasar el orden elegido al viewmodel
             orden_alfabetic = (orden == "Ordre Alfabètic")
-        
-            resultado = self.view_model.generate_general_report(filepath, orden_alfabetic)
-            if resultado:
-                QMessageBox.information(
-                    self, 
-                    "Llistat Generat", 
-                    f"El llistat general s'ha generat a:\n{filepath}"
-                )
-                self._open_file(filepath)
-            else:
-                QMessageBox.critical(
-                    self, 
-                    "Error", 
-                    "No s'ha pogut generar el llistat general.\nMira la consola per a més detalls."
-                )
+
+            def done(resultado):
+                if resultado:
+                    QMessageBox.information(
+                        self, 
+                        "Llistat Generat", 
+                        f"El llistat general s'ha generat a:\n{filepath}"
+                    )
+                    self._open_file(filepath)
+                else:
+                    QMessageBox.critical(
+                        self, 
+                        "Error", 
+                        "No s'ha pogut generar el llistat general.\nMira la consola per a més detalls."
+                    )
+
+            self.view_model.generate_report_async(
+                self.view_model.generate_general_report, filepath, orden_alfabetic,
+                on_done=done, description="Generant llistat general..."
+            )
 
     def print_banking_report(self):
         """Genera e imprime el listado de datos bancarios."""
         filepath, _ = QFileDialog.getSaveFileName(self, "Guardar llistat de dades bancàries", "llistat_bancari.pdf", "PDF Files (*.pdf)")
         if filepath:
-            if self.view_model.generate_banking_report(filepath):
-                QMessageBox.information(self, "Llistat Generat", f"El llistat de dades bancàries s'ha generat a:\n{filepath}")
-                self._open_file(filepath)
-            else:
-                QMessageBox.critical(self, "Error", "No s'ha pogut generar el llistat bancari.")
+            def done(success):
+                if success:
+                    QMessageBox.information(self, "Llistat Generat", f"El llistat de dades bancàries s'ha generat a:\n{filepath}")
+                    self._open_file(filepath)
+                else:
+                    QMessageBox.critical(self, "Error", "No s'ha pogut generar el llistat bancari.")
+
+            self.view_model.generate_report_async(
+                self.view_model.generate_banking_report, filepath,
+                on_done=done, description="Generant llistat bancari..."
+            )
     
     def _open_file(self, filepath):
         """Abre un archivo con la aplicación predeterminada del sistema."""
@@ -909,7 +1008,7 @@ class MainWindow(QMainWindow):
             else:  # Linux y otros
                 os.system(f'xdg-open "{filepath}"')
         except Exception as e:
-            print(f"No se pudo abrir el archivo: {e}")
+            log.warning("No se pudo abrir el archivo %s: %s", filepath, e)
             # Alternativa usando QDesktopServices
             QDesktopServices.openUrl(QUrl.fromLocalFile(filepath))
             
@@ -928,21 +1027,75 @@ class MainWindow(QMainWindow):
             if not filepath.endswith('.pdf'):
                 filepath += '.pdf'
             
-            # Generar el PDF
-            if self.view_model.generate_etiquetas(filepath):
-                QMessageBox.information(
-                    self,
-                    "Èxit",
-                    f"Etiquetes generades correctament.\n\nArxiu: {filepath}"
-                )
-                # Abrir el PDF automáticamente
-                self._open_file(filepath)
+            def done(success):
+                if success:
+                    QMessageBox.information(
+                        self,
+                        "Èxit",
+                        f"Etiquetes generades correctament.\n\nArxiu: {filepath}"
+                    )
+                    # Abrir el PDF automáticamente
+                    self._open_file(filepath)
+                else:
+                    QMessageBox.critical(
+                        self,
+                        "Error",
+                        "No s'han pogut generar les etiquetes."
+                    )
+
+            # Generar el PDF en segundo plano
+            self.view_model.generate_report_async(
+                self.view_model.generate_etiquetas, filepath,
+                on_done=done, description="Generant etiquetes..."
+            )
+
+    def generate_report_pack(self):
+        """Genera tots els informes alhora en una carpeta."""
+        from PyQt6.QtWidgets import QInputDialog
+
+        orden_opciones = ["Ordre Alfabètic", "Ordre per Número de Soci"]
+        orden, ok = QInputDialog.getItem(
+            self,
+            "Ordenació del Llistat",
+            "Tria l'ordre del llistat general:",
+            orden_opciones,
+            0,
+            False
+        )
+        if not ok:
+            return
+
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta dels informes")
+        if not carpeta:
+            return
+
+        def done(paquet):
+            linies = []
+            errors = 0
+            for r in paquet['resultats']:
+                nom = INFORMES[r['informe']][0]
+                if r['ok']:
+                    linies.append(f"✓ {nom}: {r['segons']:.1f} s")
+                else:
+                    errors += 1
+                    linies.append(f"✗ {nom}: {r['error']}")
+            missatge = (
+                f"Informes generats a:\n{carpeta}\n\n" + "\n".join(linies) +
+                f"\n\nTemps total: {paquet['segons']:.1f} s"
+            )
+            if errors:
+                QMessageBox.warning(self, "Informes Generats amb Errors", missatge)
             else:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    "No s'han pogut generar les etiquetes."
-                )
+                QMessageBox.information(self, "Informes Generats", missatge)
+
+        self.view_model.generate_report_pack_async(
+            carpeta, orden == "Ordre Alfabètic", on_done=done
+        )
+
+    def open_diagnostico(self):
+        """Abre el panel de diagnóstico de rendimiento"""
+        from views.diagnostico_view import DiagnosticoView
+        DiagnosticoView(self.view_model, self).exec()
 
     def open_activitats(self):
         """Abre la ventana de gestión de actividades"""
@@ -954,6 +1107,9 @@ class MainWindow(QMainWindow):
             )
             return
         
+        # El mòdul d'activitats només es carrega quan s'obre
+        from views.activitats_view import ActivitatsView
+
         dialog = ActivitatsView(self.activitat_viewmodel)
         dialog.setModal(True)
         dialog.resize(1000, 700)